@@ -13,13 +13,21 @@ if str(PROJECT_ROOT) not in sys.path:
 load_dotenv()
 
 from src.bot.telegram_bot import BibleVerseBot  # noqa: E402
+from src.services.http_pool import http_pool  # noqa: E402
+from src.services.verse_history import verse_history  # noqa: E402
 
 
 async def _send_daily():
 	bot = BibleVerseBot()
-	# Optional: ensure bot connectivity before sending
-	await bot.test_connection()
-	await bot.send_daily_verse()
+	await http_pool.start()
+	try:
+		# Optional: ensure bot connectivity before sending
+		await bot.test_connection()
+		await bot.send_daily_verse()
+	finally:
+		# Write queued history before the function is frozen
+		await verse_history.flush()
+		await http_pool.close()
 
 
 def handler(request):
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the Bible reference parser.
+Reports references parsed per millisecond, cold (every reference new) and warm (cached).
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.bible_books import BOOKS
+from src.services.reference_parser import parse_references
+
+
+def make_references(count, seed=0):
+    """Generate a mix of reference styles over random real verses."""
+    rng = random.Random(seed)
+    references = []
+    for _ in range(count):
+        book = rng.choice(BOOKS)
+        chapter = rng.randint(1, book.chapter_count)
+        verse = rng.randint(1, book.verse_count(chapter))
+        name = rng.choice((book.name, book.key, *book.aliases) if book.aliases else (book.name, book.key))
+        style = rng.randrange(4)
+        if style == 0:
+            references.append(f"{name} {chapter}:{verse}")
+        elif style == 1:
+            end = min(verse + rng.randint(1, 5), book.verse_count(chapter))
+            references.append(f"{name} {chapter}:{verse}-{end}")
+        elif style == 2:
+            references.append(f"{name} {chapter}")
+        else:
+            references.append(f"{name} {chapter}:{verse}; {chapter}:{verse}")
+    return references
+
+
+def run(references, parse):
+    """Parse every reference and return references per millisecond."""
+    started = time.perf_counter()
+    for reference in references:
+        parse(reference)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return len(references) / elapsed_ms
+
+
+def main():
+    """Main function."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    references = make_references(count)
+
+    print(f"⏱️  Parsing {count:,} references...")
+    # Bypass the result cache to measure the parser itself
+    cold = run(references, parse_references.__wrapped__)
+    parse_references.cache_clear()
+    run(references[:4096], parse_references)
+    warm = run(references[:4096] * (count // 4096 or 1), parse_references)
+
+    print(f"Cold: {cold:,.0f} references/ms ({1000 / cold:.2f} µs each)")
+    print(f"Warm: {warm:,.0f} references/ms (repeated references served from cache)")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import complete Bible translations into the local corpus.
+Once imported, verses are served offline without per-verse HTTP requests.
+
+Imports are incremental: books whose checksum matches the last import are skipped, and
+the corpus is only re-written when something changed. USFM books are parsed in parallel.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.bible_api import BibleAPIService
+from src.services.corpus_import import CorpusImporter
+from src.utils.logger import setup_logger, get_logger
+
+# Setup logging
+setup_logger()
+logger = get_logger(__name__)
+
+
+async def import_from_api(versions, refresh):
+    """Download translations from the Bible API into the local corpus."""
+    async with BibleAPIService() as service:
+        targets = versions or service.available_bibles
+        print(f"📥 Importing {len(targets)} translation(s) into {service.corpus.corpus_dir}...")
+        for stats in await service.refresh_corpus(targets, refresh=refresh):
+            print(f"  {stats.summary()}")
+        print("✅ Import complete!")
+
+
+def import_from_files(kind, version, sources, workers):
+    """Import a translation from a local JSON dump or USFM files."""
+    service = BibleAPIService()
+    importer = CorpusImporter(service.corpus, workers)
+    print(f"📥 Importing {', '.join(sources)} as {version}...")
+    if kind == "json":
+        stats = importer.import_json(version, sources[0])
+    else:
+        stats = importer.import_usfm(version, sources)
+    if stats.written and service.database:
+        service.store_in_database(version)
+    print(f"  {stats.summary()}")
+    print("✅ Import complete!")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Import Bible translations into the local corpus.")
+    parser.add_argument("versions", nargs="*", help="Versions to download (default: all available)")
+    parser.add_argument("--json", nargs=2, metavar=("VERSION", "FILE"), help="Import a JSON dump")
+    parser.add_argument("--usfm", nargs="+", metavar="VERSION PATH", help="Import USFM files or directories")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Download books already imported again (re-written only if changed)")
+    args = parser.parse_args()
+
+    if args.json:
+        import_from_files("json", args.json[0], args.json[1:], args.workers)
+    elif args.usfm:
+        if len(args.usfm) < 2:
+            parser.error("--usfm needs a version and at least one file or directory")
+        import_from_files("usfm", args.usfm[0], args.usfm[1:], args.workers)
+    else:
+        asyncio.run(import_from_api(args.versions, args.refresh))
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
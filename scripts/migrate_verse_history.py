@@ -32,7 +32,7 @@ def migrate_old_history():
         with open(history_file, 'r') as f:
             old_data = json.load(f)
         
-        if 'sent_verses_by_year' in old_data:
+        if 'sent_verses_by_year' in old_data or 'sent_bitmaps_by_year' in old_data:
             print("✅ History file is already in new format. Migration not needed.")
             return
         
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Generate (or show) a year's daily verse plan.
+Plans are otherwise generated on the first daily verse of each year.
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add the project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.settings import get_settings
+from src.models.bible_books import format_reference
+from src.services.daily_plan import DAILY_TRANSLATIONS, DailyPlanner, corpus_texts
+from src.services.local_corpus import get_local_corpus
+from src.services.similarity import create_similarity_filter
+from src.utils.logger import setup_logger, get_logger
+
+# Setup logging
+setup_logger()
+logger = get_logger(__name__)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Plan a whole year of daily verses.")
+    parser.add_argument("year", nargs="?", type=int, default=date.today().year, help="Year to plan (default: this year)")
+    parser.add_argument("--regenerate", action="store_true", help="Replace the existing plan")
+    parser.add_argument("--show", action="store_true", help="Print every day of the plan")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    planner = DailyPlanner(
+        settings.daily_plan_dir, DAILY_TRANSLATIONS, settings.daily_verse_themes,
+        similarity=create_similarity_filter(settings.similarity_threshold, settings.similarity_window),
+        text_of=corpus_texts(get_local_corpus(settings.bible_corpus_dir))
+    )
+    plan = planner.get_plan(args.year, regenerate=args.regenerate)
+    print(f"📅 {len(plan)} days planned for {plan.year} in {planner.path_for(plan.year)}")
+
+    if args.show:
+        for entry in plan.entries():
+            print(f"{entry.day.isoformat()}  {entry.translation:<4} {format_reference(*entry.verse_range)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
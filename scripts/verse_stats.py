@@ -10,6 +10,7 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from src.models.bible_books import format_reference
 from src.services.verse_history import verse_history
 from src.services.bible_api import BibleAPIService
 from src.utils.logger import setup_logger, get_logger
@@ -50,9 +51,9 @@ def show_current_year_stats():
         print("-" * 40)
         # Show last 5 sent verses for current year
         current_year = verse_history.get_current_year()
-        sent_verses = list(verse_history.get_sent_verses_for_year(current_year))
-        for i, reference in enumerate(sent_verses[-5:], 1):
-            print(f"{i}. {reference}")
+        sent_verses = sorted(verse_history.get_sent_verses_for_year(current_year))
+        for i, verse_id in enumerate(sent_verses[-5:], 1):
+            print(f"{i}. {format_reference(verse_id)}")
         print()
     
     if stats['unused_verses'] > 0:
@@ -107,9 +108,9 @@ def show_detailed_year_stats(year: int):
     if stats['used_verses'] > 0:
         print(f"📋 All verses sent in {year}:")
         print("-" * 40)
-        sent_verses = list(verse_history.get_sent_verses_for_year(year))
-        for i, reference in enumerate(sent_verses, 1):
-            print(f"{i}. {reference}")
+        sent_verses = sorted(verse_history.get_sent_verses_for_year(year))
+        for i, verse_id in enumerate(sent_verses, 1):
+            print(f"{i}. {format_reference(verse_id)}")
         print()
     
     if stats['unused_verses'] > 0:
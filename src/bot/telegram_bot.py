@@ -7,14 +7,16 @@ import asyncio
 import schedule
 import time
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from telegram import Bot
 from telegram.error import TelegramError
 
 from src.config.settings import get_settings
-from src.models.verse import BibleVerse, VerseRequest
+from src.models.verse import BiblePassage, BibleVerse, VerseRequest
 from src.services.bible_api import BibleAPIService
+from src.services.chat_history import ChatHistory
+from src.services.verse_history import VerseHistoryService, verse_history
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,56 +25,48 @@ logger = get_logger(__name__)
 class BibleVerseBot:
     """Telegram bot for sending Bible verses."""
     
+    # Other verses tried for chats that already received the daily verse this year
+    REPEAT_ALTERNATIVES = 3
+    
     def __init__(self):
         self.settings = get_settings()
         self.bot = Bot(token=self.settings.telegram_bot_token)
         self.chat_id = self.settings.telegram_chat_id
         self.chat_ids = self.settings.telegram_chat_ids
         self.bible_service = BibleAPIService()
+        self.database = self.bible_service.database
+        self.chat_history = ChatHistory(self.settings.chat_history_dir)
+        self._scheduled_tasks = set()
+        
+        # Keep the configured chats in the database (when one is configured)
+        if self.database:
+            for cid in self.chat_ids:
+                self.database.upsert_chat(cid)
         
-    async def send_verse(self, verse: BibleVerse, chat_id: str = None) -> bool:
+    async def send_verse(self, verse: BibleVerse, chat_id: str = None, chat_ids: Optional[List[str]] = None) -> bool:
         """
         Send a Bible verse to a specific chat or all configured chats.
         
         Args:
             verse: Bible verse to send
             chat_id: Specific chat ID to send to (if None, sends to all configured chats)
+            chat_ids: Several specific chats to send to instead
             
         Returns:
             True if sent successfully to at least one chat, False otherwise
         """
         try:
-            # Format the message
-            message = self._format_verse_message(verse)
-            
             # Determine which chats to send to
-            target_chats = [chat_id] if chat_id else self.chat_ids
+            target_chats = [chat_id] if chat_id else chat_ids if chat_ids is not None else self.chat_ids
             
             if not target_chats:
                 logger.warning("No chat IDs configured")
                 return False
             
-            success_count = 0
-            total_chats = len(target_chats)
+            sent_chats = await self._send_to_chats(verse, target_chats)
             
-            # Send to each chat
-            for cid in target_chats:
-                try:
-                    await self.bot.send_message(
-                        chat_id=cid,
-                        text=message,
-                        parse_mode='HTML'
-                    )
-                    logger.info(f"Successfully sent verse to chat {cid}: {verse.reference}")
-                    success_count += 1
-                    
-                except TelegramError as e:
-                    logger.error(f"Failed to send verse to chat {cid}: {e}")
-                except Exception as e:
-                    logger.error(f"Unexpected error sending verse to chat {cid}: {e}")
-            
-            if success_count > 0:
-                logger.info(f"Sent verse to {success_count}/{total_chats} chats")
+            if sent_chats:
+                logger.info(f"Sent verse to {len(sent_chats)}/{len(target_chats)} chats")
                 return True
             else:
                 logger.error("Failed to send verse to any chat")
@@ -82,6 +76,42 @@ class BibleVerseBot:
             logger.error(f"Unexpected error in send_verse: {e}")
             return False
     
+    async def _send_to_chats(self, verse: BibleVerse, chat_ids: List[str]) -> List[str]:
+        """Send a verse to each chat, recording it in the chats' history; returns the chats reached."""
+        # Format the message
+        message = self._format_verse_message(verse)
+        sent_chats = []
+        
+        # Send to each chat
+        for cid in chat_ids:
+            try:
+                await self.bot.send_message(
+                    chat_id=cid,
+                    text=message,
+                    parse_mode='HTML'
+                )
+                logger.info(f"Successfully sent verse to chat {cid}: {verse.reference}")
+                sent_chats.append(str(cid))
+                
+            except TelegramError as e:
+                logger.error(f"Failed to send verse to chat {cid}: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error sending verse to chat {cid}: {e}")
+        
+        if sent_chats:
+            try:
+                # One bulk update for every chat that got the verse, written off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self._record_sends, verse, sent_chats)
+            except Exception as e:
+                logger.error(f"Error recording chat history: {e}")
+        return sent_chats
+    
+    def _record_sends(self, verse: BibleVerse, chat_ids: List[str]):
+        """Record deliveries in the chat history and the database (blocking; runs in a worker thread)."""
+        self.chat_history.mark_sent(datetime.now().year, VerseHistoryService.verse_ids(verse), chat_ids)
+        if self.database:
+            self.database.record_chat_sends(chat_ids)
+    
     def _format_verse_message(self, verse: BibleVerse) -> str:
         """
         Format a Bible verse for Telegram message.
@@ -92,11 +122,17 @@ class BibleVerseBot:
         Returns:
             Formatted message string
         """
+        # Passages number each verse so the reader can follow along
+        if isinstance(verse, BiblePassage) and verse.verses:
+            text = " ".join(f"<b>{part.verse}</b> {part.text}" for part in verse.verses)
+        else:
+            text = verse.text
+        
         # Create a beautiful formatted message
         message = f"""
 📖 <b>Daily Bible Verse</b>
 
-<i>"{verse.text}"</i>
+<i>"{text}"</i>
 
 <b>— {verse.reference} ({verse.translation})</b>
 
@@ -122,8 +158,34 @@ Have a blessed day! Mwaaaaah🙏
                 logger.error(f"Failed to get daily verse: {response.error}")
                 return False
             
-            # Send the verse
-            return await self.send_verse(response.verse)
+            if not self.chat_ids:
+                logger.warning("No chat IDs configured")
+                return False
+            
+            # Each chat only avoids its own repeats: chats that already had today's verse get another one
+            year = datetime.now().year
+            verse = response.verse
+            pending = [str(cid) for cid in self.chat_ids]
+            sent_count = 0
+            for attempt in range(self.REPEAT_ALTERNATIVES + 1):
+                fresh = self.chat_history.unsent_chats(year, VerseHistoryService.verse_ids(verse), pending)
+                if fresh:
+                    sent_count += len(await self._send_to_chats(verse, fresh))
+                    fresh_chats = set(fresh)
+                    pending = [cid for cid in pending if cid not in fresh_chats]
+                if not pending or attempt == self.REPEAT_ALTERNATIVES:
+                    break
+                
+                logger.info(f"{len(pending)} chats already had {verse.reference} this year, picking another verse")
+                response = await self.bible_service.get_verse(VerseRequest(random=True, translation=verse.translation))
+                if not response.success or not response.verse:
+                    break
+                verse = response.verse
+            
+            if pending:
+                logger.warning(f"No unsent verse found for {len(pending)} chats")
+            logger.info(f"Sent daily verse to {sent_count}/{len(self.chat_ids)} chats")
+            return sent_count > 0
             
         except Exception as e:
             logger.error(f"Error in send_daily_verse: {e}")
@@ -172,9 +234,14 @@ Have a blessed day! Mwaaaaah🙏
         logger.info(f"Scheduling daily verse for times: {schedule_times}")
 
         for t in schedule_times:
-            schedule.every().day.at(t).do(
-                lambda: asyncio.run(self.send_daily_verse())
-            )
+            schedule.every().day.at(t).do(self._start_daily_verse_task)
+    
+    def _start_daily_verse_task(self):
+        """Run send_daily_verse on the scheduler's event loop, where the shared HTTP pool lives."""
+        task = asyncio.get_running_loop().create_task(self.send_daily_verse())
+        # Keep a reference until the task finishes so it is not garbage collected
+        self._scheduled_tasks.add(task)
+        task.add_done_callback(self._scheduled_tasks.discard)
     
     async def run_scheduler(self):
         """Run the scheduler loop."""
@@ -234,10 +301,16 @@ Have a blessed day! Mwaaaaah🙏
 async def send_verse_to_telegram(verse: BibleVerse, chat_id: str = None) -> bool:
     """Convenience function to send a verse to Telegram."""
     bot = BibleVerseBot()
-    return await bot.send_verse(verse, chat_id)
+    try:
+        return await bot.send_verse(verse, chat_id)
+    finally:
+        await verse_history.flush()
 
 
 async def send_daily_verse_to_telegram() -> bool:
     """Convenience function to send daily verse to Telegram."""
     bot = BibleVerseBot()
-    return await bot.send_daily_verse() 
\ No newline at end of file
+    try:
+        return await bot.send_daily_verse()
+    finally:
+        await verse_history.flush() 
\ No newline at end of file
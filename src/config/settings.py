@@ -24,10 +24,65 @@ class Settings(BaseModel):
     verse_schedule_time: str = "09:00"
     verse_schedule_timezone: str = "UTC"
     verse_schedule_times: list[str] = []
+    # Weekly rotation of topics for daily verses (empty: any verse)
+    daily_verse_themes: list[str] = []
+    # Each year's daily verses are planned up front into one file per year here
+    daily_plan_dir: str = "data/plans"
+    # Near-duplicate filter: skip verses whose cosine similarity to one of the last N sent exceeds the threshold
+    similarity_threshold: float = 0.6
+    similarity_window: int = 7
+    # Sends journaled before the verse history file is compacted into a new snapshot
+    history_compact_every: int = 100
+    # Seconds history changes are collected before one background write
+    history_write_delay: float = 1.0
+    # Per-chat history: one verse x chat bitmap file per year
+    chat_history_dir: str = "data/chat_history"
     log_level: str = "INFO"
     
-    # Database/Storage
+    # Database/Storage: sqlite:///path enables the SQLite backend (corpus, full-text search, history, chats)
     database_url: Optional[str] = None
+    database_pool_size: int = 4
+    
+    # Bible Corpus
+    bible_corpus_dir: str = "data/corpus"
+    bible_network_fallback: bool = True
+    
+    # HTTP Response Cache
+    http_cache_file: str = "data/http_cache.json"
+    http_cache_max_entries: int = 5000
+    http_cache_max_age: int = 7 * 24 * 3600
+    http_negative_cache_max_entries: int = 2000
+    http_negative_cache_ttl: int = 24 * 3600
+    
+    # HTTP Connection Pool (timeouts in seconds; Bible API attempts use them too, capped by retry_deadline)
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 10
+    http_dns_cache_ttl: int = 300
+    http_keepalive_timeout: float = 60.0
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 10.0
+    http_total_timeout: float = 30.0
+    
+    # Hedged random-verse fetching: candidates raced in parallel, and seconds before launching the next
+    random_verse_hedge_fanout: int = 3
+    random_verse_hedge_delay: float = 0.2
+    
+    # Bible Providers: tried in tier order (local corpus first), remote ones ranked by EWMA latency/errors
+    bible_providers: list[str] = ["local", "cdn", "github"]
+    bible_custom_provider_url: Optional[str] = None
+    bible_custom_provider_verse_url: Optional[str] = None
+    provider_ewma_alpha: float = 0.3
+    provider_failure_threshold: int = 3
+    provider_cooldown: float = 60.0
+    
+    # Retry policy for Bible API requests (seconds): capped exponential backoff with full jitter
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.2
+    retry_max_delay: float = 2.0
+    retry_deadline: float = 10.0
+    
+    # Bible API: "chapter" fetches whole chapters and caches every verse, "verse" fetches one verse at a time
+    bible_api_fetch_mode: str = "chapter"
     
     @field_validator('verse_schedule_time')
     @classmethod
@@ -41,6 +96,14 @@ class Settings(BaseModel):
             raise ValueError('Time must be in HH:MM format')
         return v
     
+    @field_validator('bible_api_fetch_mode')
+    @classmethod
+    def validate_fetch_mode(cls, v):
+        """Validate Bible API fetch mode."""
+        if v.lower() not in ['chapter', 'verse']:
+            raise ValueError("Bible API fetch mode must be 'chapter' or 'verse'")
+        return v.lower()
+    
     @field_validator('log_level')
     @classmethod
     def validate_log_level(cls, v):
@@ -82,6 +145,21 @@ def get_settings() -> Settings:
     elif schedule_time:
         all_schedule_times = [schedule_time]
     
+    # Parse daily verse themes
+    themes_str = os.getenv('DAILY_VERSE_THEMES', '')
+    daily_verse_themes = [t.strip().lower() for t in themes_str.split(',') if t.strip()]
+    
+    # Parse Bible providers (a custom endpoint is added automatically when configured)
+    providers_str = os.getenv('BIBLE_PROVIDERS', 'local,cdn,github')
+    bible_providers = [p.strip().lower() for p in providers_str.split(',') if p.strip()]
+    custom_provider_url = os.getenv('BIBLE_CUSTOM_PROVIDER_URL')
+    if custom_provider_url and 'custom' not in bible_providers:
+        bible_providers.append('custom')
+    # The SQLite backend serves imported verses next to the local corpus
+    database_url = os.getenv('DATABASE_URL') or None
+    if database_url and 'database' not in bible_providers:
+        bible_providers.insert(0, 'database')
+    
     # Create settings from environment
     return Settings(
         telegram_bot_token=os.getenv('TELEGRAM_BOT_TOKEN', ''),
@@ -90,8 +168,43 @@ def get_settings() -> Settings:
         verse_schedule_time=schedule_time,
         verse_schedule_timezone=os.getenv('VERSE_SCHEDULE_TIMEZONE', 'UTC'),
         verse_schedule_times=all_schedule_times,
+        daily_verse_themes=daily_verse_themes,
+        daily_plan_dir=os.getenv('DAILY_PLAN_DIR', 'data/plans'),
+        similarity_threshold=float(os.getenv('SIMILARITY_THRESHOLD', '0.6')),
+        similarity_window=int(os.getenv('SIMILARITY_WINDOW', '7')),
+        history_compact_every=int(os.getenv('HISTORY_COMPACT_EVERY', '100')),
+        history_write_delay=float(os.getenv('HISTORY_WRITE_DELAY', '1')),
+        chat_history_dir=os.getenv('CHAT_HISTORY_DIR', 'data/chat_history'),
         log_level=os.getenv('LOG_LEVEL', 'INFO'),
-        database_url=os.getenv('DATABASE_URL')
+        database_url=database_url,
+        database_pool_size=int(os.getenv('DATABASE_POOL_SIZE', '4')),
+        bible_corpus_dir=os.getenv('BIBLE_CORPUS_DIR', 'data/corpus'),
+        bible_network_fallback=os.getenv('BIBLE_NETWORK_FALLBACK', 'true').lower() == 'true',
+        http_cache_file=os.getenv('HTTP_CACHE_FILE', 'data/http_cache.json'),
+        http_cache_max_entries=int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '5000')),
+        http_cache_max_age=int(os.getenv('HTTP_CACHE_MAX_AGE', str(7 * 24 * 3600))),
+        http_negative_cache_max_entries=int(os.getenv('HTTP_NEGATIVE_CACHE_MAX_ENTRIES', '2000')),
+        http_negative_cache_ttl=int(os.getenv('HTTP_NEGATIVE_CACHE_TTL', str(24 * 3600))),
+        bible_api_fetch_mode=os.getenv('BIBLE_API_FETCH_MODE', 'chapter'),
+        http_pool_limit=int(os.getenv('HTTP_POOL_LIMIT', '100')),
+        http_pool_limit_per_host=int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10')),
+        http_dns_cache_ttl=int(os.getenv('HTTP_DNS_CACHE_TTL', '300')),
+        http_keepalive_timeout=float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60')),
+        http_connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+        http_read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', '10')),
+        http_total_timeout=float(os.getenv('HTTP_TOTAL_TIMEOUT', '30')),
+        random_verse_hedge_fanout=int(os.getenv('RANDOM_VERSE_HEDGE_FANOUT', '3')),
+        random_verse_hedge_delay=float(os.getenv('RANDOM_VERSE_HEDGE_DELAY', '0.2')),
+        bible_providers=bible_providers,
+        bible_custom_provider_url=custom_provider_url,
+        bible_custom_provider_verse_url=os.getenv('BIBLE_CUSTOM_PROVIDER_VERSE_URL'),
+        provider_ewma_alpha=float(os.getenv('PROVIDER_EWMA_ALPHA', '0.3')),
+        provider_failure_threshold=int(os.getenv('PROVIDER_FAILURE_THRESHOLD', '3')),
+        provider_cooldown=float(os.getenv('PROVIDER_COOLDOWN', '60')),
+        retry_max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', '3')),
+        retry_base_delay=float(os.getenv('RETRY_BASE_DELAY', '0.2')),
+        retry_max_delay=float(os.getenv('RETRY_MAX_DELAY', '2')),
+        retry_deadline=float(os.getenv('RETRY_DEADLINE', '10'))
     )
 
 
@@ -10,6 +10,8 @@ from pathlib import Path
 
 from src.bot.telegram_bot import BibleVerseBot
 from src.config.settings import get_settings
+from src.services.http_pool import http_pool
+from src.services.verse_history import verse_history
 from src.utils.logger import setup_logger, get_logger
 
 # Setup logging
@@ -30,6 +32,9 @@ class BibleVerseBotApp:
         try:
             logger.info("Starting Bible Verse Bot...")
             
+            # Open the shared HTTP connection pool for all Bible API calls
+            await http_pool.start()
+            
             # Test connection
             if not await self.bot.test_connection():
                 logger.error("Failed to connect to Telegram. Please check your configuration.")
@@ -52,6 +57,8 @@ class BibleVerseBotApp:
         except Exception as e:
             logger.error(f"Error starting bot: {e}")
             return False
+        finally:
+            await self.stop()
         
         return True
     
@@ -59,11 +66,14 @@ class BibleVerseBotApp:
         """Stop the bot application."""
         logger.info("Stopping Bible Verse Bot...")
         self.running = False
+        await verse_history.flush()
+        await http_pool.close()
     
     async def send_test_verse(self):
         """Send a test verse immediately."""
         try:
             logger.info("Sending test verse...")
+            await http_pool.start()
             success = await self.bot.send_daily_verse()
             
             if success:
@@ -73,6 +83,9 @@ class BibleVerseBotApp:
                 
         except Exception as e:
             logger.error(f"Error sending test verse: {e}")
+        finally:
+            await verse_history.flush()
+            await http_pool.close()
 
 
 def signal_handler(signum, frame):
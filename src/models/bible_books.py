@@ -0,0 +1,363 @@
+"""
+Reference data for the books of the Bible.
+Verse counts per chapter follow the standard 66-book Protestant canon (KJV versification).
+
+Verses are identified by a packed integer ID, (book ordinal << 16) | (chapter << 8) | verse,
+so the same verse always has one key however its reference was spelled. IDs sort in
+canonical order and every KJV chapter and verse number fits in a byte.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# Verses per chapter for each book, keyed by API book name, in canonical order
+VERSE_COUNTS: Dict[str, Tuple[int, ...]] = {
+    "genesis": (31, 25, 24, 26, 32, 22, 24, 22, 29, 32, 32, 20, 18, 24, 21, 16, 27, 33, 38, 18, 34,
+                24, 20, 67, 34, 35, 46, 22, 35, 43, 55, 32, 20, 31, 29, 43, 36, 30, 23, 23, 57, 38,
+                34, 34, 28, 34, 31, 22, 33, 26),
+    "exodus": (22, 25, 22, 31, 23, 30, 25, 32, 35, 29, 10, 51, 22, 31, 27, 36, 16, 27, 25, 26, 36,
+               31, 33, 18, 40, 37, 21, 43, 46, 38, 18, 35, 23, 35, 35, 38, 29, 31, 43, 38),
+    "leviticus": (17, 16, 17, 35, 19, 30, 38, 36, 24, 20, 47, 8, 59, 57, 33, 34, 16, 30, 37, 27, 24,
+                  33, 44, 23, 55, 46, 34),
+    "numbers": (54, 34, 51, 49, 31, 27, 89, 26, 23, 36, 35, 16, 33, 45, 41, 50, 13, 32, 22, 29, 35,
+                41, 30, 25, 18, 65, 23, 31, 40, 16, 54, 42, 56, 29, 34, 13),
+    "deuteronomy": (46, 37, 29, 49, 33, 25, 26, 20, 29, 22, 32, 32, 18, 29, 23, 22, 20, 22, 21, 20,
+                    23, 30, 25, 22, 19, 19, 26, 68, 29, 20, 30, 52, 29, 12),
+    "joshua": (18, 24, 17, 24, 15, 27, 26, 35, 27, 43, 23, 24, 33, 15, 63, 10, 18, 28, 51, 9, 45,
+               34, 16, 33),
+    "judges": (36, 23, 31, 24, 31, 40, 25, 35, 57, 18, 40, 15, 25, 20, 20, 31, 13, 31, 30, 48, 25),
+    "ruth": (22, 23, 18, 22),
+    "1samuel": (28, 36, 21, 22, 12, 21, 17, 22, 27, 27, 15, 25, 23, 52, 35, 23, 58, 30, 24, 42, 15,
+                23, 29, 22, 44, 25, 12, 25, 11, 31, 13),
+    "2samuel": (27, 32, 39, 12, 25, 23, 29, 18, 13, 19, 27, 31, 39, 33, 37, 23, 29, 33, 43, 26, 22,
+                51, 39, 25),
+    "1kings": (53, 46, 28, 34, 18, 38, 51, 66, 28, 29, 43, 33, 34, 31, 34, 34, 24, 46, 21, 43, 29,
+               53),
+    "2kings": (18, 25, 27, 44, 27, 33, 20, 29, 37, 36, 21, 21, 25, 29, 38, 20, 41, 37, 37, 21, 26,
+               20, 37, 20, 30),
+    "1chronicles": (54, 55, 24, 43, 26, 81, 40, 40, 44, 14, 47, 40, 14, 17, 29, 43, 27, 17, 19, 8,
+                    30, 19, 32, 31, 31, 32, 34, 21, 30),
+    "2chronicles": (17, 18, 17, 22, 14, 42, 22, 18, 31, 19, 23, 16, 22, 15, 19, 14, 19, 34, 11, 37,
+                    20, 12, 21, 27, 28, 23, 9, 27, 36, 27, 21, 33, 25, 33, 27, 23),
+    "ezra": (11, 70, 13, 24, 17, 22, 28, 36, 15, 44),
+    "nehemiah": (11, 20, 32, 23, 19, 19, 73, 18, 38, 39, 36, 47, 31),
+    "esther": (22, 23, 15, 17, 14, 14, 10, 17, 32, 3),
+    "job": (22, 13, 26, 21, 27, 30, 21, 22, 35, 22, 20, 25, 28, 22, 35, 22, 16, 21, 29, 29, 34, 30,
+            17, 25, 6, 14, 23, 28, 25, 31, 40, 22, 33, 37, 16, 33, 24, 41, 30, 24, 34, 17),
+    "psalms": (6, 12, 8, 8, 12, 10, 17, 9, 20, 18, 7, 8, 6, 7, 5, 11, 15, 50, 14, 9, 13, 31, 6, 10,
+               22, 12, 14, 9, 11, 12, 24, 11, 22, 22, 28, 12, 40, 22, 13, 17, 13, 11, 5, 26, 17, 11,
+               9, 14, 20, 23, 19, 9, 6, 7, 23, 13, 11, 11, 17, 12, 8, 12, 11, 10, 13, 20, 7, 35, 36,
+               5, 24, 20, 28, 23, 10, 12, 20, 72, 13, 19, 16, 8, 18, 12, 13, 17, 7, 18, 52, 17, 16,
+               15, 5, 23, 11, 13, 12, 9, 9, 5, 8, 28, 22, 35, 45, 48, 43, 13, 31, 7, 10, 10, 9, 8,
+               18, 19, 2, 29, 176, 7, 8, 9, 4, 8, 5, 6, 5, 6, 8, 8, 3, 18, 3, 3, 21, 26, 9, 8, 24,
+               13, 10, 7, 12, 15, 21, 10, 20, 14, 9, 6),
+    "proverbs": (33, 22, 35, 27, 23, 35, 27, 36, 18, 32, 31, 28, 25, 35, 33, 33, 28, 24, 29, 30, 31,
+                 29, 35, 34, 28, 28, 27, 28, 27, 33, 31),
+    "ecclesiastes": (18, 26, 22, 16, 20, 12, 29, 17, 18, 20, 10, 14),
+    "songofsolomon": (17, 17, 11, 16, 16, 13, 13, 14),
+    "isaiah": (31, 22, 26, 6, 30, 13, 25, 22, 21, 34, 16, 6, 22, 32, 9, 14, 14, 7, 25, 6, 17, 25,
+               18, 23, 12, 21, 13, 29, 24, 33, 9, 20, 24, 17, 10, 22, 38, 22, 8, 31, 29, 25, 28, 28,
+               25, 13, 15, 22, 26, 11, 23, 15, 12, 17, 13, 12, 21, 14, 21, 22, 11, 12, 19, 12, 25,
+               24),
+    "jeremiah": (19, 37, 25, 31, 31, 30, 34, 22, 26, 25, 23, 17, 27, 22, 21, 21, 27, 23, 15, 18, 14,
+                 30, 40, 10, 38, 24, 22, 17, 32, 24, 40, 44, 26, 22, 19, 32, 21, 28, 18, 16, 18, 22,
+                 13, 30, 5, 28, 7, 47, 39, 46, 64, 34),
+    "lamentations": (22, 22, 66, 22, 22),
+    "ezekiel": (28, 10, 27, 17, 17, 14, 27, 18, 11, 22, 25, 28, 23, 23, 8, 63, 24, 32, 14, 49, 32,
+                31, 49, 27, 17, 21, 36, 26, 21, 26, 18, 32, 33, 31, 15, 38, 28, 23, 29, 49, 26, 20,
+                27, 31, 25, 24, 23, 35),
+    "daniel": (21, 49, 30, 37, 31, 28, 28, 27, 27, 21, 45, 13),
+    "hosea": (11, 23, 5, 19, 15, 11, 16, 14, 17, 15, 12, 14, 16, 9),
+    "joel": (20, 32, 21),
+    "amos": (15, 16, 15, 13, 27, 14, 17, 14, 15),
+    "obadiah": (21,),
+    "jonah": (17, 10, 10, 11),
+    "micah": (16, 13, 12, 13, 15, 16, 20),
+    "nahum": (15, 13, 19),
+    "habakkuk": (17, 20, 19),
+    "zephaniah": (18, 15, 20),
+    "haggai": (15, 23),
+    "zechariah": (21, 13, 10, 14, 11, 15, 14, 23, 17, 12, 17, 14, 9, 21),
+    "malachi": (14, 17, 18, 6),
+    "matthew": (25, 23, 17, 25, 48, 34, 29, 34, 38, 42, 30, 50, 58, 36, 39, 28, 27, 35, 30, 34, 46,
+                46, 39, 51, 46, 75, 66, 20),
+    "mark": (45, 28, 35, 41, 43, 56, 37, 38, 50, 52, 33, 44, 37, 72, 47, 20),
+    "luke": (80, 52, 38, 44, 39, 49, 50, 56, 62, 42, 54, 59, 35, 35, 32, 31, 37, 43, 48, 47, 38, 71,
+             56, 53),
+    "john": (51, 25, 36, 54, 47, 71, 53, 59, 41, 42, 57, 50, 38, 31, 27, 33, 26, 40, 42, 31, 25),
+    "acts": (26, 47, 26, 37, 42, 15, 60, 40, 43, 48, 30, 25, 52, 28, 41, 40, 34, 28, 41, 38, 40, 30,
+             35, 27, 27, 32, 44, 31),
+    "romans": (32, 29, 31, 25, 21, 23, 25, 39, 33, 21, 36, 21, 14, 23, 33, 27),
+    "1corinthians": (31, 16, 23, 21, 13, 20, 40, 13, 27, 33, 34, 31, 13, 40, 58, 24),
+    "2corinthians": (24, 17, 18, 18, 21, 18, 16, 24, 15, 18, 33, 21, 14),
+    "galatians": (24, 21, 29, 31, 26, 18),
+    "ephesians": (23, 22, 21, 32, 33, 24),
+    "philippians": (30, 30, 21, 23),
+    "colossians": (29, 23, 25, 18),
+    "1thessalonians": (10, 20, 13, 18, 28),
+    "2thessalonians": (12, 17, 18),
+    "1timothy": (20, 15, 16, 16, 25, 21),
+    "2timothy": (18, 26, 17, 22),
+    "titus": (16, 15, 15),
+    "philemon": (25,),
+    "hebrews": (14, 18, 19, 16, 14, 20, 28, 13, 28, 39, 40, 29, 25),
+    "james": (27, 26, 18, 17, 20),
+    "1peter": (25, 25, 22, 19, 14),
+    "2peter": (21, 22, 18),
+    "1john": (10, 29, 24, 21, 21),
+    "2john": (13,),
+    "3john": (14,),
+    "jude": (25,),
+    "revelation": (20, 29, 22, 11, 14, 17, 17, 13, 21, 11, 19, 17, 18, 20, 8, 21, 18, 24, 21, 15,
+                   27, 21),
+}
+
+# Display names for book keys that str.title() can't produce
+_DISPLAY_NAMES: Dict[str, str] = {
+    "1samuel": "1 Samuel", "2samuel": "2 Samuel", "1kings": "1 Kings", "2kings": "2 Kings",
+    "1chronicles": "1 Chronicles", "2chronicles": "2 Chronicles", "songofsolomon": "Song of Solomon",
+    "1corinthians": "1 Corinthians", "2corinthians": "2 Corinthians",
+    "1thessalonians": "1 Thessalonians", "2thessalonians": "2 Thessalonians",
+    "1timothy": "1 Timothy", "2timothy": "2 Timothy", "1peter": "1 Peter", "2peter": "2 Peter",
+    "1john": "1 John", "2john": "2 John", "3john": "3 John",
+}
+
+# Other spellings and common abbreviations for each book, normalized like book keys
+_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "genesis": ("gen", "ge", "gn"),
+    "exodus": ("exod", "exo", "ex"),
+    "leviticus": ("lev", "lv"),
+    "numbers": ("num", "nu", "nm"),
+    "deuteronomy": ("deut", "dt", "de"),
+    "joshua": ("josh", "jos"),
+    "judges": ("judg", "jdg", "jg"),
+    "ruth": ("rth", "ru"),
+    "1samuel": ("1sam", "1sa", "1sm"),
+    "2samuel": ("2sam", "2sa", "2sm"),
+    "1kings": ("1kgs", "1ki", "1kg"),
+    "2kings": ("2kgs", "2ki", "2kg"),
+    "1chronicles": ("1chron", "1chr", "1ch"),
+    "2chronicles": ("2chron", "2chr", "2ch"),
+    "ezra": ("ezr",),
+    "nehemiah": ("neh", "ne"),
+    "esther": ("esth", "est"),
+    "job": ("jb",),
+    "psalms": ("psalm", "psa", "pss", "ps"),
+    "proverbs": ("prov", "prv", "pr"),
+    "ecclesiastes": ("eccles", "eccl", "ecc", "qoh"),
+    "songofsolomon": ("songofsongs", "song", "canticles", "cant", "sos"),
+    "isaiah": ("isa", "is"),
+    "jeremiah": ("jer", "je"),
+    "lamentations": ("lam", "la"),
+    "ezekiel": ("ezek", "eze", "ezk"),
+    "daniel": ("dan", "dn"),
+    "hosea": ("hos",),
+    "joel": ("jl",),
+    "amos": ("am",),
+    "obadiah": ("obad", "ob"),
+    "jonah": ("jnh",),
+    "micah": ("mic",),
+    "nahum": ("nah", "na"),
+    "habakkuk": ("hab",),
+    "zephaniah": ("zeph", "zep"),
+    "haggai": ("hag",),
+    "zechariah": ("zech", "zec"),
+    "malachi": ("mal",),
+    "matthew": ("matt", "mt"),
+    "mark": ("mrk", "mk"),
+    "luke": ("luk", "lk"),
+    "john": ("jhn", "jn"),
+    "acts": ("ac",),
+    "romans": ("rom", "ro", "rm"),
+    "1corinthians": ("1cor", "1co"),
+    "2corinthians": ("2cor", "2co"),
+    "galatians": ("gal",),
+    "ephesians": ("eph",),
+    "philippians": ("phil", "php"),
+    "colossians": ("col",),
+    "1thessalonians": ("1thess", "1thes", "1th"),
+    "2thessalonians": ("2thess", "2thes", "2th"),
+    "1timothy": ("1tim", "1ti"),
+    "2timothy": ("2tim", "2ti"),
+    "titus": ("tit",),
+    "philemon": ("philem", "phlm", "phm"),
+    "hebrews": ("heb",),
+    "james": ("jas", "jm"),
+    "1peter": ("1pet", "1pe", "1pt"),
+    "2peter": ("2pet", "2pe", "2pt"),
+    "1john": ("1jhn", "1jn", "1jo"),
+    "2john": ("2jhn", "2jn", "2jo"),
+    "3john": ("3jhn", "3jn", "3jo"),
+    "jude": ("jud",),
+    "revelation": ("revelations", "rev", "re", "apocalypse"),
+}
+
+
+# USFM book identifiers (the \id marker), in canonical order
+_USFM_CODES = (
+    "GEN", "EXO", "LEV", "NUM", "DEU", "JOS", "JDG", "RUT", "1SA", "2SA", "1KI", "2KI", "1CH", "2CH",
+    "EZR", "NEH", "EST", "JOB", "PSA", "PRO", "ECC", "SNG", "ISA", "JER", "LAM", "EZK", "DAN", "HOS",
+    "JOL", "AMO", "OBA", "JON", "MIC", "NAM", "HAB", "ZEP", "HAG", "ZEC", "MAL",
+    "MAT", "MRK", "LUK", "JHN", "ACT", "ROM", "1CO", "2CO", "GAL", "EPH", "PHP", "COL", "1TH", "2TH",
+    "1TI", "2TI", "TIT", "PHM", "HEB", "JAS", "1PE", "2PE", "1JN", "2JN", "3JN", "JUD", "REV",
+)
+
+
+@dataclass(frozen=True)
+class BookInfo:
+    """Metadata for one book of the canon."""
+
+    ordinal: int
+    key: str
+    name: str
+    verse_counts: Tuple[int, ...]
+    aliases: Tuple[str, ...] = ()
+    usfm: str = ""
+
+    @property
+    def chapter_count(self) -> int:
+        """Number of chapters in the book."""
+        return len(self.verse_counts)
+
+    def verse_count(self, chapter: int) -> int:
+        """Number of verses in a chapter (0 if the chapter does not exist)."""
+        if 1 <= chapter <= len(self.verse_counts):
+            return self.verse_counts[chapter - 1]
+        return 0
+
+    def verse_id(self, chapter: int, verse: int) -> int:
+        """Packed ID of a verse in this book."""
+        return pack_verse_id(self.ordinal, chapter, verse)
+
+
+# The book table, in canonical order (ordinals start at 1 so no verse has ID 0)
+BOOKS: Tuple[BookInfo, ...] = tuple(
+    BookInfo(
+        ordinal=ordinal,
+        key=key,
+        name=_DISPLAY_NAMES.get(key, key.title()),
+        verse_counts=counts,
+        aliases=_ALIASES.get(key, ()),
+        usfm=usfm
+    )
+    for ordinal, ((key, counts), usfm) in enumerate(zip(VERSE_COUNTS.items(), _USFM_CODES), 1)
+)
+
+BOOKS_BY_KEY: Dict[str, BookInfo] = {book.key: book for book in BOOKS}
+BOOKS_BY_USFM: Dict[str, BookInfo] = {book.usfm: book for book in BOOKS}
+
+# Every accepted spelling (key, display name, aliases) normalized -> book
+_BOOKS_BY_NAME: Dict[str, BookInfo] = {}
+for _book in BOOKS:
+    for _name in (_book.key, _book.name, *_book.aliases):
+        _BOOKS_BY_NAME[_name.lower().replace(" ", "")] = _book
+
+
+def find_book(name: str) -> Optional[BookInfo]:
+    """
+    Look up a book by key, display name or alias.
+
+    Args:
+        name: Book name in any case and spacing (e.g., '1 Corinthians', 'Psalm', 'songofsolomon')
+
+    Returns:
+        Book metadata, or None if the name is unknown
+    """
+    return _BOOKS_BY_NAME.get(name.lower().replace(" ", "").replace(".", ""))
+
+
+def pack_verse_id(book: int, chapter: int, verse: int) -> int:
+    """Pack a book ordinal, chapter and verse into a verse ID."""
+    return (book << 16) | (chapter << 8) | verse
+
+
+def unpack_verse_id(verse_id: int) -> Tuple[int, int, int]:
+    """Split a verse ID into book ordinal, chapter and verse."""
+    return verse_id >> 16, (verse_id >> 8) & 0xFF, verse_id & 0xFF
+
+
+def book_of(verse_id: int) -> BookInfo:
+    """
+    Get the book a verse ID belongs to.
+
+    Raises:
+        KeyError: If the ID's book ordinal is not in the canon
+    """
+    ordinal = verse_id >> 16
+    if not 1 <= ordinal <= len(BOOKS):
+        raise KeyError(f"No book with ordinal {ordinal}")
+    return BOOKS[ordinal - 1]
+
+
+def verse_id_for(book: str, chapter: int, verse: int) -> Optional[int]:
+    """
+    Get the verse ID for a reference, validated against the canon.
+
+    Args:
+        book: Book name in any spelling find_book accepts
+        chapter: Chapter number
+        verse: Verse number
+
+    Returns:
+        Verse ID, or None if the book, chapter or verse does not exist
+    """
+    info = find_book(book)
+    if info is None or not 1 <= verse <= info.verse_count(chapter):
+        return None
+    return info.verse_id(chapter, verse)
+
+
+def format_reference(verse_id: int, end_id: Optional[int] = None) -> str:
+    """
+    Format a verse ID, or a range of them, for display.
+
+    Args:
+        verse_id: First verse
+        end_id: Last verse of a passage in the same book
+
+    Returns:
+        Reference such as 'John 3:16', 'Proverbs 3:5-6' or 'John 3:16-4:2'
+    """
+    _, chapter, verse = unpack_verse_id(verse_id)
+    reference = f"{book_of(verse_id).name} {chapter}:{verse}"
+    if end_id is not None and end_id != verse_id:
+        _, end_chapter, end_verse = unpack_verse_id(end_id)
+        reference += f"-{end_verse}" if end_chapter == chapter else f"-{end_chapter}:{end_verse}"
+    return reference
+
+
+def chapter_spans(start_id: int, end_id: int) -> List[Tuple[int, int, int]]:
+    """
+    Split a verse-ID range within one book into per-chapter pieces.
+
+    Returns:
+        (chapter, first verse, last verse) for each chapter the range touches
+    """
+    book = book_of(start_id)
+    _, chapter, verse = unpack_verse_id(start_id)
+    _, end_chapter, end_verse = unpack_verse_id(end_id)
+
+    spans = []
+    for current in range(chapter, end_chapter + 1):
+        first = verse if current == chapter else 1
+        last = end_verse if current == end_chapter else book.verse_count(current)
+        spans.append((current, first, last))
+    return spans
+
+
+def expand_range(start_id: int, end_id: int) -> List[int]:
+    """List every verse ID in a range within one book."""
+    book = book_of(start_id)
+    return [
+        book.verse_id(chapter, number)
+        for chapter, first, last in chapter_spans(start_id, end_id)
+        for number in range(first, last + 1)
+    ]
+
+
+# Chapters per book, derived from VERSE_COUNTS
+CHAPTER_COUNTS: Dict[str, int] = {book: len(chapters) for book, chapters in VERSE_COUNTS.items()}
+
+# Total number of verses in the canon (31,102 in the KJV)
+TOTAL_VERSES: int = sum(sum(chapters) for chapters in VERSE_COUNTS.values())
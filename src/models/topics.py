@@ -0,0 +1,59 @@
+"""
+Curated topics for themed verses.
+Each topic lists well-known references; passages are drawn whole.
+"""
+
+from typing import Dict, Tuple
+
+TOPIC_REFERENCES: Dict[str, Tuple[str, ...]] = {
+    "hope": (
+        "Jeremiah 29:11", "Romans 15:13", "Romans 5:3-5", "Isaiah 40:31", "Lamentations 3:22-23",
+        "Psalms 42:11", "Hebrews 11:1", "Romans 8:24-25", "1 Peter 1:3", "Psalms 31:24",
+        "Proverbs 23:18", "Hebrews 6:19", "Romans 12:12", "Micah 7:7",
+    ),
+    "love": (
+        "John 3:16", "1 Corinthians 13:4-7", "1 John 4:7-8", "1 John 4:19", "Romans 5:8",
+        "Romans 8:38-39", "John 15:12-13", "1 Peter 4:8", "Colossians 3:14", "Ephesians 3:17-19",
+        "Zephaniah 3:17", "Deuteronomy 6:5", "John 13:34-35", "Song of Solomon 8:7",
+    ),
+    "strength": (
+        "Philippians 4:13", "Isaiah 41:10", "Isaiah 40:29", "Joshua 1:9", "Psalms 46:1",
+        "2 Corinthians 12:9-10", "Nehemiah 8:10", "Psalms 28:7", "Ephesians 6:10", "Deuteronomy 31:6",
+        "Psalms 73:26", "Exodus 15:2", "Habakkuk 3:19", "2 Timothy 1:7",
+    ),
+    "peace": (
+        "John 14:27", "Philippians 4:6-7", "Isaiah 26:3", "John 16:33", "Romans 5:1",
+        "Numbers 6:24-26", "Colossians 3:15", "Psalms 4:8", "Matthew 5:9", "2 Thessalonians 3:16",
+        "Romans 12:18", "Psalms 29:11", "Isaiah 9:6", "Romans 15:13",
+    ),
+    "faith": (
+        "Hebrews 11:1", "Hebrews 11:6", "Mark 11:22-24", "Romans 10:17", "Ephesians 2:8-9",
+        "2 Corinthians 5:7", "James 2:17", "Galatians 2:20", "Proverbs 3:5-6", "Matthew 17:20",
+        "1 Peter 1:8-9", "Romans 1:17",
+    ),
+    "joy": (
+        "Nehemiah 8:10", "Psalms 16:11", "Psalms 30:5", "Psalms 118:24", "John 15:11",
+        "Romans 15:13", "Galatians 5:22-23", "James 1:2-3", "Philippians 4:4", "1 Thessalonians 5:16-18",
+        "Psalms 126:5", "Habakkuk 3:17-18",
+    ),
+    "comfort": (
+        "Psalms 23:4", "Matthew 5:4", "2 Corinthians 1:3-4", "Psalms 34:18", "Matthew 11:28-30",
+        "Revelation 21:4", "Psalms 147:3", "Isaiah 66:13", "John 14:1", "Psalms 94:19",
+        "Deuteronomy 31:8", "Psalms 119:50",
+    ),
+    "wisdom": (
+        "James 1:5", "Proverbs 9:10", "Proverbs 2:6", "Proverbs 3:13", "Colossians 3:16",
+        "Proverbs 4:7", "Psalms 90:12", "James 3:17", "Proverbs 1:7", "Ecclesiastes 7:12",
+        "Proverbs 16:16", "Psalms 111:10",
+    ),
+    "forgiveness": (
+        "1 John 1:9", "Ephesians 4:32", "Colossians 3:13", "Matthew 6:14-15", "Psalms 103:12",
+        "Isaiah 1:18", "Acts 3:19", "Micah 7:18-19", "Luke 6:37", "Psalms 32:1",
+        "Mark 11:25", "Isaiah 43:25",
+    ),
+    "gratitude": (
+        "1 Thessalonians 5:18", "Psalms 100:4-5", "Psalms 107:1", "Colossians 3:17", "Philippians 4:6",
+        "Psalms 136:1", "James 1:17", "Psalms 9:1", "Ephesians 5:20", "Psalms 118:1",
+        "2 Corinthians 9:15", "Hebrews 12:28",
+    ),
+}
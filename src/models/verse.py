@@ -39,15 +39,40 @@ class BibleVerse(BaseModel):
         }
 
 
+class BiblePassage(BibleVerse):
+    """Model representing a multi-verse passage; chapter and verse hold its first verse."""
+    
+    end_chapter: int = Field(..., description="Chapter of the last verse")
+    end_verse: int = Field(..., description="Number of the last verse")
+    verses: List[BibleVerse] = Field(default_factory=list, description="Individual verses, in order")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "reference": "Proverbs 3:5-6",
+                "text": "Trust in the LORD with all thine heart; ... and he shall direct thy paths.",
+                "translation": "KJV",
+                "book": "Proverbs",
+                "chapter": 3,
+                "verse": 5,
+                "end_chapter": 3,
+                "end_verse": 6
+            }
+        }
+
+
 class VerseRequest(BaseModel):
     """Model for verse requests."""
     
     reference: Optional[str] = Field(None, description="Specific verse reference")
     book: Optional[str] = Field(None, description="Book name")
     chapter: Optional[int] = Field(None, description="Chapter number")
-    verse: Optional[int] = Field(None, description="Verse number")
+    verse: Optional[int] = Field(None, description="Verse number (whole chapter if omitted)")
+    end_chapter: Optional[int] = Field(None, description="Last chapter of a passage")
+    end_verse: Optional[int] = Field(None, description="Last verse of a passage")
     translation: str = Field(default="NIV", description="Preferred translation")
     random: bool = Field(default=False, description="Request random verse")
+    tags: Optional[List[str]] = Field(None, description="Draw a random verse from any of these topics")
     
     class Config:
         schema_extra = {
@@ -55,7 +80,12 @@ class VerseRequest(BaseModel):
                 "reference": "John 3:16",
                 "translation": "NIV",
                 "random": False
-            }
+            },
+            "examples": [
+                {"book": "Proverbs", "chapter": 3, "verse": 5, "end_verse": 6, "translation": "KJV"},
+                {"tags": ["hope", "peace"], "translation": "KJV"},
+                {"book": "John", "chapter": 3, "verse": 16, "end_chapter": 4, "end_verse": 2}
+            ]
         }
 
 
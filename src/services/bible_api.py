@@ -5,15 +5,32 @@ Supports multiple Bible APIs with fallback mechanisms.
 
 import aiohttp
 import asyncio
-import json
 import random
-from typing import Optional, List
-from pathlib import Path
+import time
+from typing import Dict, Optional, List, Tuple
 
-from src.models.verse import BibleVerse, VerseRequest, VerseResponse
+from src.models.verse import BiblePassage, BibleVerse, VerseRequest, VerseResponse
 from src.config.settings import get_settings
 from src.utils.logger import get_logger
 from src.services.verse_history import verse_history
+from src.services.http_pool import http_pool, create_session
+from src.services.local_corpus import get_local_corpus
+from src.services.corpus_import import CorpusImporter, ImportStats
+from src.services.daily_plan import DAILY_TRANSLATIONS, DailyPlanner, corpus_texts
+from src.services.database import get_database
+from src.services.search_index import get_search_index
+from src.services.similarity import create_similarity_filter
+from src.services.topic_index import topic_index
+from src.services.response_cache import get_response_cache
+from src.services.single_flight import SingleFlight
+from src.services.retry import RetryPolicy
+from src.services.providers import (
+    BibleProvider, DatabaseProvider, HTTPProvider, LocalCorpusProvider, ProviderError, ProviderRegistry,
+    ProviderResponse, ProviderUnavailable, WldehProvider
+)
+from src.services.verse_index import VerseIndex, canonical_index
+from src.services.reference_parser import VerseRange, parse_reference, resolve_book
+from src.models.bible_books import BOOKS_BY_KEY, book_of, chapter_spans, format_reference, unpack_verse_id
 
 logger = get_logger(__name__)
 
@@ -23,10 +40,28 @@ class BibleAPIService:
     
     def __init__(self):
         self.settings = get_settings()
-        self.session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self.single_flight = SingleFlight()
+        self.retry_policy = RetryPolicy.from_settings(self.settings)
+        self.corpus = get_local_corpus(self.settings.bible_corpus_dir)
+        self.database = get_database(self.settings.database_url, self.settings.database_pool_size)
+        self.daily_planner = DailyPlanner(
+            self.settings.daily_plan_dir, DAILY_TRANSLATIONS, self.settings.daily_verse_themes,
+            similarity=create_similarity_filter(self.settings.similarity_threshold, self.settings.similarity_window),
+            text_of=corpus_texts(self.corpus)
+        )
+        self.response_cache = get_response_cache(
+            self.settings.http_cache_file,
+            self.settings.http_cache_max_entries,
+            self.settings.http_cache_max_age,
+            self.settings.http_negative_cache_max_entries,
+            self.settings.http_negative_cache_ttl
+        )
         
         # Bible API endpoints
         self.bible_api_base = "https://cdn.jsdelivr.net/gh/wldeh/bible-api"
+        self.bible_api_mirror = "https://raw.githubusercontent.com/wldeh/bible-api/main"
         self.available_bibles = [
             "en-kjv",    # King James Version
             "en-asv",    # American Standard Version
@@ -37,24 +72,6 @@ class BibleAPIService:
             "en-ylt"     # Young's Literal Translation
         ]
         
-        # Bible books with their chapter counts for randomization
-        self.bible_books = {
-            "genesis": 50, "exodus": 40, "leviticus": 27, "numbers": 36, "deuteronomy": 34,
-            "joshua": 24, "judges": 21, "ruth": 4, "1samuel": 31, "2samuel": 24,
-            "1kings": 22, "2kings": 25, "1chronicles": 29, "2chronicles": 36, "ezra": 10,
-            "nehemiah": 13, "esther": 10, "job": 42, "psalms": 150, "proverbs": 31,
-            "ecclesiastes": 12, "songofsolomon": 8, "isaiah": 66, "jeremiah": 52,
-            "lamentations": 5, "ezekiel": 48, "daniel": 12, "hosea": 14, "joel": 3,
-            "amos": 9, "obadiah": 1, "jonah": 4, "micah": 7, "nahum": 3,
-            "habakkuk": 3, "zephaniah": 3, "haggai": 2, "zechariah": 14, "malachi": 4,
-            "matthew": 28, "mark": 16, "luke": 24, "john": 21, "acts": 28,
-            "romans": 16, "1corinthians": 16, "2corinthians": 13, "galatians": 6,
-            "ephesians": 6, "philippians": 4, "colossians": 4, "1thessalonians": 5,
-            "2thessalonians": 3, "1timothy": 6, "2timothy": 4, "titus": 3,
-            "philemon": 1, "hebrews": 13, "james": 5, "1peter": 5, "2peter": 3,
-            "1john": 5, "2john": 1, "3john": 1, "jude": 1, "revelation": 22
-        }
-        
         # Popular Bible verses as fallback
         self.fallback_verses = [
             {
@@ -103,7 +120,9 @@ class BibleAPIService:
                 "translation": "NIV",
                 "book": "Proverbs",
                 "chapter": 3,
-                "verse": 5
+                "verse": 5,
+                "end_chapter": 3,
+                "end_verse": 6
             },
             {
                 "reference": "Isaiah 40:31",
@@ -119,7 +138,9 @@ class BibleAPIService:
                 "translation": "NIV",
                 "book": "Matthew",
                 "chapter": 28,
-                "verse": 19
+                "verse": 19,
+                "end_chapter": 28,
+                "end_verse": 20
             },
             {
                 "reference": "Galatians 5:22-23",
@@ -127,7 +148,9 @@ class BibleAPIService:
                 "translation": "NIV",
                 "book": "Galatians",
                 "chapter": 5,
-                "verse": 22
+                "verse": 22,
+                "end_chapter": 5,
+                "end_verse": 23
             },
             {
                 "reference": "Joshua 1:9",
@@ -139,19 +162,72 @@ class BibleAPIService:
             }
         ]
         
+        # Bible text providers, routed by health
+        self.provider_registry = self._create_provider_registry()
+        
         # Initialize verse history with fallback verses
-        fallback_verse_objects = [BibleVerse(**verse_data) for verse_data in self.fallback_verses]
+        fallback_verse_objects = [self._make_fallback_verse(verse_data) for verse_data in self.fallback_verses]
         verse_history.set_available_verses(fallback_verse_objects)
     
+    def _create_provider_registry(self) -> ProviderRegistry:
+        """Register the configured providers, in preference order."""
+        registry = ProviderRegistry(
+            alpha=self.settings.provider_ewma_alpha,
+            failure_threshold=self.settings.provider_failure_threshold,
+            cooldown=self.settings.provider_cooldown
+        )
+        
+        for name in self.settings.bible_providers:
+            if name == "local":
+                registry.register(LocalCorpusProvider(self.corpus))
+            elif name == "database":
+                if self.database:
+                    registry.register(DatabaseProvider(self.database))
+                else:
+                    logger.warning("Database provider enabled but DATABASE_URL is not usable")
+            elif name == "cdn":
+                registry.register(WldehProvider("cdn", self.bible_api_base))
+            elif name == "github":
+                registry.register(WldehProvider("github", self.bible_api_mirror))
+            elif name == "custom":
+                if self.settings.bible_custom_provider_url:
+                    registry.register(HTTPProvider(
+                        "custom",
+                        self.settings.bible_custom_provider_url,
+                        self.settings.bible_custom_provider_verse_url
+                    ))
+                else:
+                    logger.warning("Custom provider enabled but BIBLE_CUSTOM_PROVIDER_URL is not set")
+            else:
+                logger.warning(f"Unknown Bible provider: {name}")
+        
+        return registry
+    
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """The session used for API calls: our own if set, otherwise the shared connection pool."""
+        return self._session or http_pool.session
+    
+    @session.setter
+    def session(self, session: Optional[aiohttp.ClientSession]):
+        self._session = session
+    
     async def __aenter__(self):
-        """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        """Async context manager entry (reuses the shared connection pool when it is running)."""
+        if not self.session:
+            self._session = create_session(self.settings)
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        if self._owns_session and self._session:
+            await self._session.close()
+            self._session = None
+            self._owns_session = False
+        # Don't leave changes queued on a loop that may be about to close
+        await self.response_cache.save_async()
+        await verse_history.flush()
     
     async def get_verse(self, request: VerseRequest) -> VerseResponse:
         """
@@ -164,10 +240,14 @@ class BibleAPIService:
             VerseResponse with verse data or error
         """
         try:
-            if request.random:
+            if request.tags:
+                return await self._get_topic_verse(request.tags, request.translation)
+            elif request.random:
                 return await self._get_random_verse(request.translation)
             elif request.reference:
                 return await self._get_verse_by_reference(request.reference, request.translation)
+            elif request.book and request.chapter:
+                return await self._get_passage(request)
             else:
                 return await self._get_random_verse(request.translation)
                 
@@ -180,10 +260,9 @@ class BibleAPIService:
             )
     
     async def _get_verse_by_reference(self, reference: str, translation: str = "NIV") -> VerseResponse:
-        """Get verse by reference using Bible API."""
+        """Get verse by reference through the provider registry (local corpus first, then remote APIs)."""
         try:
-            # Try Bible API first
-            verse = await self._fetch_from_bible_api(reference, translation)
+            verse = await self._fetch_from_providers(reference, translation)
             if verse:
                 return VerseResponse(success=True, verse=verse)
             
@@ -194,41 +273,108 @@ class BibleAPIService:
             logger.error(f"Error fetching from Bible API: {e}")
             return self._get_fallback_verse()
     
+    async def _get_passage(self, request: VerseRequest) -> VerseResponse:
+        """Get a verse or passage described by the request's book/chapter/verse fields."""
+        book = resolve_book(request.book)
+        if book is None:
+            return VerseResponse(success=False, error=f"Unknown book: {request.book}")
+        
+        # No verse means whole chapters; no end means a single verse (or chapter)
+        end_chapter = request.end_chapter or request.chapter
+        if request.end_verse:
+            end_verse = request.end_verse
+        elif request.verse and not request.end_chapter:
+            end_verse = request.verse
+        else:
+            end_verse = book.verse_count(end_chapter)
+        
+        first = (request.chapter, request.verse or 1)
+        last = (end_chapter, end_verse)
+        # Verses past the end of a chapter would pack into another verse's ID
+        if not all(1 <= verse <= book.verse_count(chapter) for chapter, verse in (first, last)) or last < first:
+            return VerseResponse(success=False, error=f"Invalid passage: {book.name} {first[0]}:{first[1]}-{last[0]}:{last[1]}")
+        
+        verse = await self._fetch_passage(VerseRange(book.verse_id(*first), book.verse_id(*last)), request.translation)
+        if verse:
+            return VerseResponse(success=True, verse=verse)
+        return self._get_fallback_verse()
+    
+    async def _get_topic_verse(self, tags: List[str], translation: str = "NIV") -> VerseResponse:
+        """Get a random verse or passage from one or more topics."""
+        try:
+            verse_range = topic_index.random_passage(tags)
+        except ValueError as e:
+            return VerseResponse(success=False, error=str(e))
+        
+        verse = await self._fetch_passage(verse_range, translation)
+        if verse:
+            logger.info(f"Picked {verse.reference} for topics {', '.join(tags)}")
+            return VerseResponse(success=True, verse=verse)
+        return self._get_fallback_verse()
+    
+    def _get_verse_index(self, bible_version: str) -> VerseIndex:
+        """Get the verse index for a version: built from the local corpus if imported, otherwise the shipped one."""
+        if self.corpus.has_version(bible_version):
+            index = self.corpus.verse_index(bible_version)
+            if index and index.total:
+                return index
+        return canonical_index
+    
     async def _get_random_verse(self, translation: str = "NIV") -> VerseResponse:
-        """Get a truly random verse from the Bible API."""
-        if not self.session:
+        """Get a truly random verse from the local corpus or the Bible API."""
+        bible_version = self._map_translation_to_version(translation)
+        index = self._get_verse_index(bible_version)
+        
+        if index is not canonical_index:
+            # Picks come from the stored versification; if one lands on a gap in a chapter,
+            # walk forward to the next stored verse instead of re-rolling
+            start = random.randrange(index.total)
+            for offset in range(index.total):
+                book, chapter, verse_num = index.locate((start + offset) % index.total)
+                text = self.corpus.get_text(bible_version, book, chapter, verse_num)
+                if text:
+                    reference = f"{self._format_book_name(book)} {chapter}:{verse_num}"
+                    logger.info(f"Picked random verse from local corpus: {reference}")
+                    return VerseResponse(
+                        success=True,
+                        verse=self._build_verse(reference, text, bible_version, book, chapter, verse_num, "local_corpus")
+                    )
+        
+        if not self.session or not self.settings.bible_network_fallback:
             return self._get_fallback_verse()
         
         try:
-            # Map translation to available Bible version
-            bible_version = self._map_translation_to_version(translation)
+            fanout = self.settings.random_verse_hedge_fanout
+            if fanout > 1:
+                # Hedged mode: race several candidates so one slow request can't stall the pick
+                references = [self._pick_network_reference(index, bible_version) for _ in range(fanout)]
+                references = [reference for reference in references if reference is not None]
+                if not references:
+                    logger.warning("Every random pick is known to be missing, using fallback")
+                    return self._get_fallback_verse()
+                
+                logger.info(f"Attempting hedged random verse fetch: {', '.join(references)}")
+                verse = await self._fetch_hedged(references, translation)
+                if verse:
+                    logger.info(f"Successfully fetched random verse: {verse.reference}")
+                    return VerseResponse(success=True, verse=verse)
+                
+                logger.warning(f"All {fanout} hedged random verse candidates failed, using fallback")
+                return self._get_fallback_verse()
             
-            # Try up to 5 random attempts to get a working verse
+            # Picks are always real verses, so retries only cover network failures
             for attempt in range(5):
                 try:
-                    # Pick a random book
-                    book = random.choice(list(self.bible_books.keys()))
-                    max_chapters = self.bible_books[book]
-                    
-                    # Pick a random chapter (avoid chapter 1 for variety)
-                    chapter = random.randint(2, max_chapters) if max_chapters > 1 else 1
-                    
-                    # For books with many chapters, try to get a verse from the middle
-                    if max_chapters > 20:
-                        # Estimate verses per chapter (roughly 20-30 for most books)
-                        estimated_verses = random.randint(15, 35)
-                        verse_num = random.randint(1, min(estimated_verses, 50))
-                    else:
-                        # For shorter books, use a reasonable verse range
-                        verse_num = random.randint(1, 30)
-                    
-                    # Construct reference
-                    reference = f"{self._format_book_name(book)} {chapter}:{verse_num}"
+                    # Pick a verse uniformly over the whole Bible
+                    reference = self._pick_network_reference(index, bible_version)
+                    if reference is None:
+                        logger.debug(f"Attempt {attempt + 1}: every pick is known to be missing")
+                        continue
                     
                     logger.info(f"Attempting random verse: {reference} (attempt {attempt + 1})")
                     
                     # Try to fetch this verse
-                    verse = await self._fetch_from_bible_api(reference, translation)
+                    verse = await self._fetch_from_providers(reference, translation)
                     if verse:
                         logger.info(f"Successfully fetched random verse: {reference}")
                         return VerseResponse(success=True, verse=verse)
@@ -244,133 +390,359 @@ class BibleAPIService:
             logger.error(f"Error fetching random verse from Bible API: {e}")
             return self._get_fallback_verse()
     
+    def _pick_network_reference(self, index: VerseIndex, bible_version: str) -> Optional[str]:
+        """
+        Pick a random reference, re-rolling any the API is known not to have in this version.
+        
+        Returns:
+            The reference, or None if every roll was known to be missing
+        """
+        for _ in range(10):
+            book, chapter, verse_num = index.random_reference()
+            if not self.response_cache.is_missing(bible_version, book, chapter, verse_num):
+                return f"{self._format_book_name(book)} {chapter}:{verse_num}"
+        return None
+    
+    async def _fetch_hedged(self, references: List[str], translation: str = "NIV") -> Optional[BibleVerse]:
+        """
+        Fetch candidate references concurrently and return the first verse that succeeds.
+        
+        A new candidate is launched whenever the hedge delay passes without a result, or as
+        soon as an in-flight candidate fails. Remaining requests are cancelled once one wins.
+        
+        Args:
+            references: Candidate references, in launch order
+            translation: Bible translation
+            
+        Returns:
+            First successfully fetched verse, or None if every candidate failed
+        """
+        delay = self.settings.random_verse_hedge_delay
+        remaining = list(references)
+        pending = set()
+        
+        try:
+            while remaining or pending:
+                if remaining:
+                    pending.add(asyncio.create_task(self._fetch_from_providers(remaining.pop(0), translation)))
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result():
+                        return task.result()
+            
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+    
     def _format_book_name(self, book: str) -> str:
         """Format book name for display (e.g., '1corinthians' -> '1 Corinthians')."""
-        if book.startswith('1') or book.startswith('2') or book.startswith('3'):
-            # Handle numbered books
-            number = book[0]
-            name = book[1:].title()
-            return f"{number} {name}"
-        elif book == "songofsolomon":
-            return "Song of Solomon"
-        else:
-            return book.title()
+        info = BOOKS_BY_KEY.get(book)
+        return info.name if info else book.title()
     
-    async def _fetch_from_bible_api(self, reference: str, translation: str = "NIV") -> Optional[BibleVerse]:
-        """Fetch verse from Bible API using wldeh/bible-api."""
+    def _build_verse(self, reference: str, text: str, bible_version: str, book: str,
+                     chapter: int, verse_num: int, source: str) -> BibleVerse:
+        """Create a BibleVerse from looked-up verse data, tagged with its topics."""
+        info = BOOKS_BY_KEY.get(book)
+        return BibleVerse(
+            reference=reference,
+            text=text,
+            translation=bible_version.upper(),
+            book=self._format_book_name(book),
+            chapter=chapter,
+            verse=verse_num,
+            tags=topic_index.tags_for(info.verse_id(chapter, verse_num)) if info else [],
+            source=source
+        )
+    
+    async def refresh_corpus(self, versions: Optional[List[str]] = None, refresh: bool = True) -> List[ImportStats]:
+        """
+        Download complete translations from the Bible API into the local corpus.
+        
+        Args:
+            versions: Bible versions to refresh (defaults to all available versions)
+            refresh: Download books already imported too (only changed ones are re-written)
+            
+        Returns:
+            Import statistics per version
+        """
         if not self.session:
+            raise RuntimeError("refresh_corpus requires an open session (use 'async with BibleAPIService()')")
+        
+        importer = CorpusImporter(self.corpus)
+        results = []
+        for version in versions or self.available_bibles:
+            logger.info(f"Refreshing local corpus for {version}...")
+            stats = await importer.import_api(self.session, version, self.bible_api_base, refresh=refresh)
+            if stats.written or (self.database and not self.database.has_version(version)):
+                self.store_in_database(version)
+            results.append(stats)
+        return results
+    
+    def store_in_database(self, version: str) -> int:
+        """
+        Copy a local corpus translation into the SQLite backend (if one is configured).
+        
+        Returns:
+            Number of verses stored
+        """
+        index = self.corpus.verse_index(version)
+        if self.database is None or index is None:
+            return 0
+        
+        def canonical_verses():
+            for ordinal in range(index.total):
+                book, _, _ = index.locate(ordinal)
+                if book in BOOKS_BY_KEY:
+                    yield index.verse_id(ordinal), self.corpus.text_at(version, ordinal)
+        
+        return self.database.import_version(version, canonical_verses())
+    
+    async def _fetch_from_providers(self, reference: str, translation: str = "NIV") -> Optional[BibleVerse]:
+        """Fetch verse (or passage) by reference through the provider registry, caching remote answers."""
+        # Parse reference (e.g., "Proverbs 3:5-6" -> Proverbs 3:5 through 3:6)
+        verse_range = parse_reference(reference)
+        if not verse_range:
+            logger.warning(f"Could not parse reference: {reference}")
             return None
+        return await self._fetch_passage(verse_range, translation)
+    
+    async def _fetch_passage(self, verse_range: VerseRange, translation: str = "NIV") -> Optional[BibleVerse]:
+        """
+        Fetch every verse of a range, requesting all the chapters it spans concurrently.
         
+        Args:
+            verse_range: First and last verse ID (same book, may span chapters)
+            translation: Bible translation
+            
+        Returns:
+            BibleVerse for a single verse, BiblePassage for several, or None if any verse is unavailable
+        """
         try:
-            # Parse reference (e.g., "John 3:16" -> book="john", chapter=3, verse=16)
-            parsed = self._parse_reference(reference)
-            if not parsed:
-                logger.warning(f"Could not parse reference: {reference}")
-                return None
+            book = book_of(verse_range.start)
+            bible_version = self._map_translation_to_version(translation)
+            spans = chapter_spans(verse_range.start, verse_range.end)
             
-            book, chapter, verse_num = parsed
+            # Don't go back to the network for verses the API already told us don't exist
+            for chapter, first, last in spans:
+                if any(self.response_cache.is_missing(bible_version, book.key, chapter, number)
+                       for number in range(first, last + 1)):
+                    logger.debug(f"Skipping known-missing reference: {format_reference(*verse_range)}")
+                    return None
             
-            # Map translation to available Bible version
-            bible_version = self._map_translation_to_version(translation)
+            try:
+                results = await asyncio.gather(*[
+                    self._fetch_verses(bible_version, book.key, chapter, list(range(first, last + 1)))
+                    for chapter, first, last in spans
+                ])
+            finally:
+                self.response_cache.schedule_save()
             
-            # Construct API URL
-            url = f"{self.bible_api_base}/bibles/{bible_version}/books/{book}/chapters/{chapter}/verses/{verse_num}.json"
+            verses = []
+            for (chapter, first, last), (texts, source) in zip(spans, results):
+                for number in range(first, last + 1):
+                    if number not in texts:
+                        return None
+                    verses.append(self._build_verse(
+                        format_reference(book.verse_id(chapter, number)), texts[number],
+                        bible_version, book.key, chapter, number, source
+                    ))
             
-            logger.info(f"Fetching verse from: {url}")
+            if len(verses) == 1:
+                return verses[0]
             
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Create BibleVerse object
-                    verse = BibleVerse(
-                        reference=reference,
-                        text=data.get("text", ""),
-                        translation=bible_version.upper(),
-                        book=book.title(),
-                        chapter=chapter,
-                        verse=verse_num
-                    )
-                    
-                    logger.info(f"Successfully fetched verse: {reference}")
-                    return verse
-                else:
-                    logger.warning(f"API returned status {response.status} for {url}")
-                    return None
+            first_verse, last_verse = verses[0], verses[-1]
+            return BiblePassage(
+                reference=format_reference(*verse_range),
+                text=" ".join(verse.text for verse in verses),
+                translation=first_verse.translation,
+                book=first_verse.book,
+                chapter=first_verse.chapter,
+                verse=first_verse.verse,
+                end_chapter=last_verse.chapter,
+                end_verse=last_verse.verse,
+                tags=topic_index.tags_for(verse_range.start),
+                source=first_verse.source,
+                verses=verses
+            )
                     
         except Exception as e:
-            logger.error(f"Error fetching verse from Bible API: {e}")
+            logger.error(f"Error fetching verse from providers: {e}")
             return None
     
-    def _parse_reference(self, reference: str) -> Optional[tuple]:
-        """Parse Bible reference into book, chapter, and verse."""
-        try:
-            # Remove any extra spaces and split
-            parts = reference.strip().split()
+    async def _fetch_verses(self, bible_version: str, book: str, chapter: int,
+                            wanted: List[int]) -> Tuple[Dict[int, str], str]:
+        """
+        Fetch verses from the response cache, or from providers on a miss.
+        
+        In chapter fetch mode one whole-chapter request covers every wanted verse and fans
+        the rest of the chapter out into the cache; in verse mode the missing verses are
+        requested concurrently. The caller saves the response cache.
+        
+        Args:
+            bible_version: Bible version (e.g., 'en-kjv')
+            book: Normalized book name
+            chapter: Chapter number
+            wanted: Verse numbers the caller needs
+            
+        Returns:
+            Mapping of verse number -> text for the wanted verses found, and the source name
+        """
+        cached = {number: self.response_cache.get(bible_version, book, chapter, number) for number in wanted}
+        texts = {
+            number: entry['text'] for number, entry in cached.items()
+            if entry and self.response_cache.is_fresh(entry)
+        }
+        source = "response_cache"
+        if len(texts) == len(wanted):
+            return texts, source
+        
+        if self.settings.bible_api_fetch_mode == "chapter":
+            targets = [None]
+        else:
+            targets = [number for number in wanted if number not in texts]
+        
+        async def request(verse_num: Optional[int]):
+            numbers = wanted if verse_num is None else [verse_num]
+            entries = [cached[number] for number in numbers]
+            # Every verse of a chapter shares the chapter response's validators
+            validator_entry = entries[0] if all(entries) else None
             
-            if len(parts) < 2:
-                return None
+            # Concurrent callers for the same chapter (verse 0) or verse share one request
+            key = self.response_cache.make_key(bible_version, book, chapter, verse_num or 0)
+            return await self.single_flight.do(
+                key,
+                lambda: self._request_from_providers(bible_version, book, chapter, verse_num, validator_entry)
+            )
+        
+        answers = await asyncio.gather(*[request(verse_num) for verse_num in targets])
+        
+        for verse_num, answer in zip(targets, answers):
+            numbers = wanted if verse_num is None else [verse_num]
+            if answer is None or answer[1].status == 304:
+                # Unchanged, or no provider could answer: the cached copy is the best we have
+                for number in numbers:
+                    if cached[number]:
+                        texts[number] = cached[number]['text']
+                continue
             
-            # Handle books with multiple words (e.g., "Song of Solomon")
-            if len(parts) >= 4 and parts[0].lower() in ["song", "1", "2", "3"]:
-                # Handle "Song of Solomon" or numbered books
-                if parts[0].lower() in ["1", "2", "3"]:
-                    book = f"{parts[0]}{parts[1].title()}"
-                    chapter_verse = parts[2]
+            provider, response = answer
+            source = provider.name
+            for number in numbers:
+                if number in response.verses:
+                    texts[number] = response.verses[number]
+                elif provider.remote:
+                    # The provider answered authoritatively without this verse
+                    self.response_cache.mark_missing(bible_version, book, chapter, number)
+        
+        return texts, source
+    
+    async def _request_from_providers(self, bible_version: str, book: str, chapter: int,
+                                      verse_num: Optional[int],
+                                      validator_entry: Optional[dict]) -> Optional[Tuple[BibleProvider, ProviderResponse]]:
+        """
+        Ask providers in routing order until one answers, recording health and caching remote answers.
+        
+        Returns:
+            The answering provider and its response, or None if none could answer
+        """
+        headers = self.response_cache.validators(validator_entry)
+        providers = self.provider_registry.ranked(bible_version, include_remote=self.settings.bible_network_fallback)
+        # One time budget covers retries and fail-over across every provider
+        deadline = self.retry_policy.start_deadline()
+        
+        for provider in providers:
+            started = time.perf_counter()
+            try:
+                if provider.remote:
+                    response = await self.retry_policy.run(
+                        lambda timeout, provider=provider: provider.fetch(
+                            self.session, bible_version, book, chapter, verse_num, headers, timeout
+                        ),
+                        deadline=deadline
+                    )
                 else:
-                    book = f"{parts[0].title()} {parts[1]} {parts[2].title()}"
-                    chapter_verse = parts[3]
-            elif len(parts) >= 3 and parts[1].lower() in ["of", "the"]:
-                # Handle "Book of Name" format
-                book = f"{parts[0].title()} {parts[1]} {parts[2].title()}"
-                chapter_verse = parts[3] if len(parts) > 3 else "1:1"
-            else:
-                # Simple format like "John 3:16"
-                book = parts[0].title()
-                chapter_verse = parts[1]
+                    response = await provider.fetch(self.session, bible_version, book, chapter, verse_num, headers)
+            except ProviderUnavailable as e:
+                logger.debug(str(e))
+                continue
+            except (ProviderError, asyncio.TimeoutError) as e:
+                self.provider_registry.record_failure(provider, time.perf_counter() - started)
+                logger.warning(f"Provider {provider.name} failed: {e}")
+                continue
             
-            # Parse chapter:verse
-            if ":" in chapter_verse:
-                chapter, verse = chapter_verse.split(":")
-                chapter = int(chapter)
-                verse = int(verse)
-            else:
-                # Just chapter, use verse 1
-                chapter = int(chapter_verse)
-                verse = 1
+            self.provider_registry.record_success(provider, time.perf_counter() - started)
             
-            # Normalize book name for API
-            book = self._normalize_book_name(book)
+            if provider.remote:
+                if response.status == 304:
+                    numbers = [verse_num] if verse_num is not None else range(1, canonical_index.verse_count(book, chapter) + 1)
+                    for number in numbers:
+                        self.response_cache.mark_revalidated(bible_version, book, chapter, number)
+                elif response.status == 200:
+                    self.response_cache.put_many(
+                        bible_version, book, chapter, response.verses,
+                        etag=response.etag, last_modified=response.last_modified
+                    )
+                    logger.info(f"Cached {len(response.verses)} verses from {book} {chapter} ({provider.name})")
             
-            return (book, chapter, verse)
+            return provider, response
+        
+        logger.warning(f"No provider could serve {bible_version} {book} {chapter}")
+        return None
+    
+    def search(self, query: str, translation: str = "KJV", limit: int = 10) -> List[BibleVerse]:
+        """
+        Search the local corpus for verses matching a query.
+        
+        Args:
+            query: Words to look for; "quoted phrases" must match word for word
+            translation: Bible translation to search
+            limit: Maximum number of results
             
-        except (ValueError, IndexError) as e:
-            logger.error(f"Error parsing reference '{reference}': {e}")
-            return None
+        Returns:
+            Matching verses, most relevant first (empty if the translation is not imported)
+        """
+        bible_version = self._map_translation_to_version(translation)
+        if self.database and self.database.has_version(bible_version):
+            return self._search_database(query, bible_version, limit)
+        
+        index = get_search_index(self.corpus, bible_version)
+        if index is None:
+            logger.warning(f"Cannot search {bible_version}: not in the local corpus")
+            return []
+        
+        verse_index = self.corpus.verse_index(bible_version)
+        results = []
+        for ordinal, score in index.search(query, limit):
+            book, chapter, verse_num = verse_index.locate(ordinal)
+            text = self.corpus.text_at(bible_version, ordinal)
+            reference = f"{self._format_book_name(book)} {chapter}:{verse_num}"
+            results.append(self._build_verse(reference, text, bible_version, book, chapter, verse_num, "search"))
+        return results
+    
+    def _search_database(self, query: str, bible_version: str, limit: int) -> List[BibleVerse]:
+        """Search a translation through the database's FTS5 index."""
+        results = []
+        for verse_id, text, score in self.database.search(bible_version, query, limit):
+            book = book_of(verse_id).key
+            _, chapter, verse_num = unpack_verse_id(verse_id)
+            reference = f"{self._format_book_name(book)} {chapter}:{verse_num}"
+            results.append(self._build_verse(reference, text, bible_version, book, chapter, verse_num, "search"))
+        return results
     
-    def _normalize_book_name(self, book: str) -> str:
-        """Normalize book names for the API."""
-        # Convert to lowercase and remove spaces for API compatibility
-        book = book.lower().replace(" ", "")
-        
-        # Handle special cases
-        book_mappings = {
-            "1corinthians": "1corinthians",
-            "2corinthians": "2corinthians",
-            "1thessalonians": "1thessalonians",
-            "2thessalonians": "2thessalonians",
-            "1timothy": "1timothy",
-            "2timothy": "2timothy",
-            "1peter": "1peter",
-            "2peter": "2peter",
-            "1john": "1john",
-            "2john": "2john",
-            "3john": "3john",
-            "songofsolomon": "songofsolomon",
-            "revelation": "revelation"
+    def get_stats(self) -> dict:
+        """Get counters for the response cache, request coalescing, providers and retries."""
+        return {
+            'response_cache': self.response_cache.get_stats(),
+            'single_flight': self.single_flight.get_stats(),
+            'providers': self.provider_registry.get_stats(),
+            'retries': self.retry_policy.get_stats()
         }
-        
-        return book_mappings.get(book, book)
     
     def _map_translation_to_version(self, translation: str) -> str:
         """Map translation names to available Bible versions."""
@@ -390,6 +762,13 @@ class BibleAPIService:
         
         return translation_mappings.get(translation, "en-kjv")  # Default to KJV
     
+    @staticmethod
+    def _make_fallback_verse(verse_data: dict) -> BibleVerse:
+        """Create a fallback verse, as a passage if it spans several verses."""
+        if "end_verse" in verse_data:
+            return BiblePassage(**verse_data)
+        return BibleVerse(**verse_data)
+    
     def _get_fallback_verse(self) -> VerseResponse:
         """Get a verse from the fallback list using history tracking."""
         verse = verse_history.get_next_verse()
@@ -402,8 +781,7 @@ class BibleAPIService:
             )
         else:
             # Fallback to random selection if history service fails
-            verse_data = random.choice(self.fallback_verses)
-            verse = BibleVerse(**verse_data)
+            verse = self._make_fallback_verse(random.choice(self.fallback_verses))
             logger.warning(f"History service failed, using random verse: {verse.reference}")
             return VerseResponse(
                 success=True,
@@ -411,29 +789,22 @@ class BibleAPIService:
             )
     
     async def get_daily_verse(self) -> VerseResponse:
-        """Get a verse for daily posting with rotation and variety."""
+        """Get today's verse from the year's precomputed plan (see daily_plan)."""
         try:
-            # Rotate through different translations for variety
-            translations = ["KJV", "ASV", "BBE", "DBY", "WBT", "WEB", "YLT"]
+            entry = self.daily_planner.entry_for()
+            logger.info(f"Daily plan for {entry.day}: {format_reference(*entry.verse_range)} ({entry.translation})")
             
-            # Use date-based rotation to ensure variety
-            import datetime
-            today = datetime.date.today()
-            day_of_year = today.timetuple().tm_yday
-            
-            # Rotate translation every week
-            translation_index = (day_of_year // 7) % len(translations)
-            selected_translation = translations[translation_index]
-            
-            logger.info(f"Using translation: {selected_translation} for day {day_of_year}")
+            verse = await self._fetch_passage(entry.verse_range, entry.translation)
+            if verse:
+                return VerseResponse(success=True, verse=verse)
             
-            # Get a random verse with the selected translation
-            request = VerseRequest(random=True, translation=selected_translation)
+            logger.warning(f"Planned verse {format_reference(*entry.verse_range)} is unavailable, using a random verse")
+            request = VerseRequest(random=True, translation=entry.translation)
             return await self.get_verse(request)
             
         except Exception as e:
             logger.error(f"Error in get_daily_verse: {e}")
-            # Fallback to KJV if rotation fails
+            # Fallback to KJV if the plan is unavailable
             request = VerseRequest(random=True, translation="KJV")
             return await self.get_verse(request)
 
@@ -0,0 +1,255 @@
+"""
+Per-chat verse history, so each chat is only protected from its own repeats.
+
+Every chat gets a stable slot number (kept in chats.json). Each year is one memory-mapped
+file holding, for every verse ordinal of the canon (see VerseIndex), a row with one bit per
+chat slot:
+
+    magic (8 bytes) | verse count (u32) | row length in bytes (u32) | rows
+
+This is the chats x verses bitmap stored verse by verse, so sending one verse to N chats
+rewrites a single row of N bits. The file is created sparse and only rows of verses actually
+sent take disk space; when more chats arrive than a row holds, the rows are widened
+(doubling, so rarely) by copying the non-empty ones.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.services.verse_index import VerseIndex, canonical_index
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChatBitmaps:
+    """One year's verse x chat bitmap in a memory-mapped file."""
+
+    MAGIC = b"BVCHAT1\0"
+    _HEADER = struct.Struct("<II")
+    _DATA_START = len(MAGIC) + _HEADER.size
+    # Smallest row: 64 chats
+    MIN_ROW_BYTES = 8
+
+    def __init__(self, path: Path, verse_count: int):
+        """
+        Args:
+            path: Year file (created if missing)
+            verse_count: Rows (verses in the canon)
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            self._create(self.path, verse_count, self.MIN_ROW_BYTES)
+        self._open()
+        if self.verse_count != verse_count:
+            self.close()
+            raise ValueError(f"{self.path} has {self.verse_count} verses, expected {verse_count}")
+
+    def _open(self):
+        with open(self.path, 'r+b') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0)
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a chat history file")
+        self.verse_count, self.row_bytes = self._HEADER.unpack_from(self._mmap, len(self.MAGIC))
+
+    @classmethod
+    def _create(cls, path: Path, verse_count: int, row_bytes: int, source: Optional["ChatBitmaps"] = None):
+        """Write an empty (sparse) file atomically, copying the non-empty rows of a narrower one."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.MAGIC + cls._HEADER.pack(verse_count, row_bytes))
+            if source is not None:
+                empty = bytes(source.row_bytes)
+                for ordinal in range(verse_count):
+                    row = source.row(ordinal)
+                    if row != empty:
+                        f.seek(cls._DATA_START + ordinal * row_bytes)
+                        f.write(row)
+            f.truncate(cls._DATA_START + verse_count * row_bytes)
+        tmp_path.replace(path)
+
+    @property
+    def capacity(self) -> int:
+        """Chat slots a row holds."""
+        return self.row_bytes * 8
+
+    def ensure_capacity(self, slots: int):
+        """Widen the rows (doubling) until they hold this many chat slots."""
+        if slots <= self.capacity:
+            return
+        row_bytes = self.row_bytes
+        while row_bytes * 8 < slots:
+            row_bytes *= 2
+        self._create(self.path, self.verse_count, row_bytes, source=self)
+        self._mmap.close()
+        self._open()
+        logger.info(f"Widened {self.path} to {self.capacity} chats")
+
+    def row(self, ordinal: int) -> bytes:
+        """Get the chat bits of one verse."""
+        start = self._DATA_START + ordinal * self.row_bytes
+        return self._mmap[start:start + self.row_bytes]
+
+    def set_slots(self, ordinal: int, slots: Iterable[int]):
+        """Set several chats' bits of one verse with a single row write."""
+        start = self._DATA_START + ordinal * self.row_bytes
+        row = bytearray(self._mmap[start:start + self.row_bytes])
+        for slot in slots:
+            row[slot >> 3] |= 1 << (slot & 7)
+        self._mmap[start:start + self.row_bytes] = bytes(row)
+
+    def count(self, slot: int) -> int:
+        """Count the verses a chat slot has bits for (reads one byte per row)."""
+        if slot >= self.capacity:
+            return 0
+        offset, mask = self._DATA_START + (slot >> 3), 1 << (slot & 7)
+        return sum(1 for position in range(offset, offset + self.verse_count * self.row_bytes, self.row_bytes)
+                   if self._mmap[position] & mask)
+
+    def flush(self):
+        """Write dirty pages back to the file."""
+        self._mmap.flush()
+
+    def close(self):
+        self._mmap.close()
+
+
+class ChatHistory:
+    """Which verses each chat received per year, as one verse x chat bitmap per year."""
+
+    def __init__(self, directory: str = "data/chat_history", index: VerseIndex = canonical_index):
+        """
+        Args:
+            directory: Holds chats.json (chat slots) and one <year>.bits file per year
+            index: Verse index mapping verse IDs to rows
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self._slots_file = self.directory / "chats.json"
+        self.slots: Dict[str, int] = self._load_slots()
+        self._years: Dict[int, ChatBitmaps] = {}
+        # Writes may run in a worker thread while the event loop reads
+        self._lock = threading.Lock()
+
+    def _load_slots(self) -> Dict[str, int]:
+        try:
+            with open(self._slots_file, 'r') as f:
+                return json.load(f)['slots']
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading chat slots: {e}")
+            return {}
+
+    def _save_slots(self):
+        tmp_file = self._slots_file.with_name(self._slots_file.name + ".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump({'slots': self.slots}, f, separators=(',', ':'))
+        tmp_file.replace(self._slots_file)
+
+    def _slots_for(self, chat_ids: Iterable[str], create: bool = False) -> List[Optional[int]]:
+        """Map chats to slots, giving new chats the next free slots if create is set."""
+        slots = []
+        added = False
+        for chat_id in map(str, chat_ids):
+            slot = self.slots.get(chat_id)
+            if slot is None and create:
+                slot = self.slots[chat_id] = len(self.slots)
+                added = True
+            slots.append(slot)
+        if added:
+            self._save_slots()
+        return slots
+
+    def _year(self, year: int) -> ChatBitmaps:
+        bitmaps = self._years.get(year)
+        if bitmaps is None:
+            bitmaps = self._years[year] = ChatBitmaps(self.directory / f"{year}.bits", self.index.total)
+        return bitmaps
+
+    def _ordinals(self, verse_ids: Iterable[int]) -> List[int]:
+        return [ordinal for ordinal in map(self.index.ordinal_of, verse_ids) if ordinal is not None]
+
+    def mark_sent(self, year: int, verse_ids: Iterable[int], chat_ids: Iterable[str]):
+        """
+        Record that verses went to several chats (one row write per verse, however many chats).
+
+        Args:
+            year: Year of the send
+            verse_ids: Verses sent (every verse of a passage)
+            chat_ids: Chats that received them
+        """
+        with self._lock:
+            slots = self._slots_for(chat_ids, create=True)
+            if not slots:
+                return
+            bitmaps = self._year(year)
+            bitmaps.ensure_capacity(max(slots) + 1)
+            for ordinal in self._ordinals(verse_ids):
+                bitmaps.set_slots(ordinal, slots)
+            bitmaps.flush()
+
+    def unsent_chats(self, year: int, verse_ids: Iterable[int], chat_ids: Iterable[str]) -> List[str]:
+        """Get the chats that have received none of the verses this year."""
+        chat_ids = [str(chat_id) for chat_id in chat_ids]
+        ordinals = self._ordinals(verse_ids)
+        if not ordinals or not (self.directory / f"{year}.bits").exists():
+            return chat_ids
+
+        with self._lock:
+            bitmaps = self._year(year)
+            rows = [bitmaps.row(ordinal) for ordinal in ordinals]
+            capacity = bitmaps.capacity
+            slots = self._slots_for(chat_ids)
+        unsent = []
+        for chat_id, slot in zip(chat_ids, slots):
+            if slot is None or slot >= capacity or not any(row[slot >> 3] >> (slot & 7) & 1 for row in rows):
+                unsent.append(chat_id)
+        return unsent
+
+    def was_sent(self, year: int, verse_id: int, chat_id: str) -> bool:
+        """Check whether a chat received a verse in a year."""
+        return not self.unsent_chats(year, [verse_id], [chat_id])
+
+    def sent_count(self, year: int, chat_id: str) -> int:
+        """Count the verses a chat received in a year."""
+        slot = self.slots.get(str(chat_id))
+        if slot is None or not (self.directory / f"{year}.bits").exists():
+            return 0
+        with self._lock:
+            return self._year(year).count(slot)
+
+    def years(self) -> List[int]:
+        """List the years with history files."""
+        return sorted(int(path.stem) for path in self.directory.glob("*.bits") if path.stem.isdigit())
+
+    def delete_year(self, year: int):
+        """Forget every chat's history for a year."""
+        bitmaps = self._years.pop(year, None)
+        if bitmaps is not None:
+            bitmaps.close()
+        try:
+            os.remove(self.directory / f"{year}.bits")
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self, before: int):
+        """Forget the years before the given one."""
+        for year in self.years():
+            if year < before:
+                self.delete_year(year)
+                logger.info(f"Removed chat history for year {year}")
+
+    def close(self):
+        """Unmap every open year."""
+        for bitmaps in self._years.values():
+            bitmaps.flush()
+            bitmaps.close()
+        self._years.clear()
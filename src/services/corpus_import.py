@@ -0,0 +1,278 @@
+"""
+Incremental, parallel import of complete translations into the local corpus.
+
+Sources are the Bible API, JSON dumps and USFM files (one book per file). Every book gets a
+checksum, kept in a per-version manifest next to the corpus file; a run only re-parses and
+re-writes when some book changed, and unchanged books are copied from the existing corpus.
+USFM files are parsed in a process pool, one book per task.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from src.models.bible_books import BOOKS_BY_USFM, CHAPTER_COUNTS
+from src.services.local_corpus import LocalCorpus, fetch_books, load_json_dump
+from src.services.search_index import get_search_index
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# chapter -> verse -> text
+Chapters = Dict[int, Dict[int, str]]
+
+# Footnotes, endnotes and cross references, with their content
+_USFM_NOTE = re.compile(r"\\(f|fe|x)\s.*?\\\1\*", re.DOTALL)
+# \w word|strong="H7225"\w* keeps just the word
+_USFM_WORD = re.compile(r"\\\+?w\s+([^|\\]*)(?:\|[^\\]*)?\\\+?w\*")
+# Paragraph-level markers whose line is not verse text (titles, headings, running headers...)
+_USFM_SKIPPED_LINE = re.compile(r"^\\(id|ide|h|toc\d*|mt\d*|ms\d*|mr|s\d*|sr|r|d|sp|cl|cp|rem|sts|usfm)\b")
+_USFM_CHAPTER_OR_VERSE = re.compile(r"\\(c|v)\s+(\d+)\S*")
+# Remaining markers: closing ones ("\\add*") hug the text, opening ones separate words
+_USFM_MARKER = re.compile(r"\\\+?[a-z]+\d*(\*)?")
+
+
+@dataclass
+class ImportStats:
+    """What an import did and how fast."""
+
+    version: str
+    books: int = 0
+    skipped: int = 0
+    verses: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    written: bool = False
+    # Books left out because some chapters failed to download (retried on the next run)
+    incomplete: int = 0
+
+    def summary(self) -> str:
+        """One-line throughput report."""
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"{self.version}: {self.books} books imported, {self.skipped} unchanged, "
+            f"{self.verses:,} verses, {self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s "
+            f"({self.verses / seconds:,.0f} verses/s, {self.bytes / 1e6 / seconds:.1f} MB/s)"
+            + ("" if self.written else " - corpus already up to date")
+            + (f", {self.incomplete} books incomplete (retried next run)" if self.incomplete else "")
+        )
+
+
+def checksum(data: bytes) -> str:
+    """Content checksum used to detect changed books."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def book_checksum(chapters: Chapters) -> str:
+    """Checksum of a parsed book."""
+    return checksum(json.dumps(chapters, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+
+
+def usfm_book(text: str) -> Optional[str]:
+    """Get the book key named by a USFM file's \\id marker (None if missing or unknown)."""
+    match = re.search(r"\\id\s+(\w{3})", text)
+    if match is None:
+        return None
+    book = BOOKS_BY_USFM.get(match.group(1).upper())
+    return book.key if book else None
+
+
+def parse_usfm(text: str) -> Tuple[Optional[str], Chapters]:
+    """
+    Parse one USFM book.
+
+    Notes and cross references are dropped, word-level markup keeps only the words, and
+    headings are not part of any verse. Combined verses ("\\v 1-2") are stored under the first.
+
+    Returns:
+        (book key, chapter -> verse -> text)
+    """
+    book = usfm_book(text)
+    text = _USFM_NOTE.sub("", text)
+    text = _USFM_WORD.sub(r"\1", text)
+    text = "\n".join(line for line in text.splitlines() if not _USFM_SKIPPED_LINE.match(line.lstrip()))
+
+    chapters: Chapters = {}
+    chapter, verse, start = 0, 0, 0
+
+    def flush(end: int):
+        if chapter and verse:
+            content = " ".join(_USFM_MARKER.sub(lambda m: "" if m.group(1) else " ", text[start:end]).split())
+            if content:
+                chapters.setdefault(chapter, {})[verse] = content
+
+    for match in _USFM_CHAPTER_OR_VERSE.finditer(text):
+        flush(match.start())
+        if match.group(1) == "c":
+            chapter, verse = int(match.group(2)), 0
+        else:
+            verse = int(match.group(2))
+        start = match.end()
+    flush(len(text))
+    return book, chapters
+
+
+def _parse_usfm_file(path: str) -> Tuple[Optional[str], Chapters]:
+    """Process-pool task: parse one USFM file."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return parse_usfm(f.read())
+
+
+class CorpusImporter:
+    """Imports translations into a local corpus, skipping books whose content is unchanged."""
+
+    MANIFEST_SUFFIX = ".manifest.json"
+
+    def __init__(self, corpus: LocalCorpus, workers: Optional[int] = None):
+        """
+        Args:
+            corpus: Corpus to write
+            workers: Processes for parsing (defaults to the CPU count)
+        """
+        self.corpus = corpus
+        self.workers = workers or os.cpu_count() or 1
+
+    def manifest_path(self, version: str) -> Path:
+        """Get the checksum manifest path for a version."""
+        return self.corpus.corpus_dir / f"{version}{self.MANIFEST_SUFFIX}"
+
+    def load_manifest(self, version: str) -> Dict[str, str]:
+        """Get the book -> checksum map of the last import (empty if there is none)."""
+        if not self.corpus.has_version(version):
+            return {}
+        try:
+            with open(self.manifest_path(version), 'r') as f:
+                return json.load(f).get('books', {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest for {version}: {e}")
+            return {}
+
+    def _save_manifest(self, version: str, checksums: Dict[str, str]):
+        path = self.manifest_path(version)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': version, 'books': checksums}, f, indent=2, sort_keys=True)
+        tmp_path.replace(path)
+
+    def _commit(self, version: str, parsed: Dict[str, Chapters], checksums: Dict[str, str],
+                stats: ImportStats) -> ImportStats:
+        """
+        Write a version if any book changed (or was added or removed).
+
+        Args:
+            version: Bible version
+            parsed: Books that were (re)parsed
+            checksums: Checksum of every book in the new version, parsed or not
+            stats: Stats to complete
+        """
+        previous = self.load_manifest(version)
+        changed = {book for book, value in checksums.items() if previous.get(book) != value}
+        stats.skipped = len(checksums) - len(changed)
+        stats.books = len(changed)
+        stats.verses = sum(len(verses) for book in changed for verses in parsed[book].values())
+
+        if changed or set(previous) != set(checksums):
+            books = {
+                book: parsed[book] if book in changed else self.corpus.get_book(version, book)
+                for book in checksums
+            }
+            self.corpus.write_version(version, books)
+            self._save_manifest(version, checksums)
+            # Build the search index now rather than on the first search
+            get_search_index(self.corpus, version)
+            stats.written = True
+        return stats
+
+    @staticmethod
+    def _finish(stats: ImportStats, started: float) -> ImportStats:
+        stats.seconds = time.perf_counter() - started
+        logger.info(stats.summary())
+        return stats
+
+    def import_usfm(self, version: str, paths: Sequence[str]) -> ImportStats:
+        """
+        Import a translation from USFM files (a directory is expanded to its *.usfm / *.sfm files).
+
+        Files are checksummed first; only changed ones are parsed, in parallel.
+        """
+        started = time.perf_counter()
+        stats = ImportStats(version)
+        files: List[Path] = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files += sorted(p for p in path.iterdir() if p.suffix.lower() in (".usfm", ".sfm"))
+            else:
+                files.append(path)
+
+        previous = self.load_manifest(version)
+        checksums: Dict[str, str] = {}
+        to_parse: List[Path] = []
+        for path in files:
+            data = path.read_bytes()
+            book = usfm_book(data[:4096].decode('utf-8-sig', errors='replace'))
+            if book is None:
+                logger.warning(f"Skipping {path}: no known \\id book code")
+                continue
+            checksums[book] = checksum(data)
+            stats.bytes += len(data)
+            if previous.get(book) != checksums[book]:
+                to_parse.append(path)
+
+        parsed: Dict[str, Chapters] = {}
+        if to_parse:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(to_parse))) as pool:
+                for book, chapters in pool.map(_parse_usfm_file, map(str, to_parse)):
+                    parsed[book] = chapters
+
+        self._commit(version, parsed, checksums, stats)
+        return self._finish(stats, started)
+
+    def import_json(self, version: str, source: str) -> ImportStats:
+        """Import a translation from a JSON dump (see load_json_dump)."""
+        started = time.perf_counter()
+        stats = ImportStats(version, bytes=Path(source).stat().st_size)
+        parsed = load_json_dump(source)
+        checksums = {book: book_checksum(chapters) for book, chapters in parsed.items()}
+        self._commit(version, parsed, checksums, stats)
+        return self._finish(stats, started)
+
+    async def import_api(self, session: aiohttp.ClientSession, version: str, base_url: str,
+                         refresh: bool = False, concurrency: int = 16) -> ImportStats:
+        """
+        Import a translation from the Bible API, one request per chapter.
+
+        Books already imported are not downloaded again unless refresh is set; refreshed
+        books are only re-written if their text changed. A book with any chapter that failed
+        to download is left out of the manifest (keeping its previous import, if any), so the
+        next run fetches it again.
+        """
+        started = time.perf_counter()
+        stats = ImportStats(version)
+        previous = self.load_manifest(version)
+        wanted = {
+            book: chapter_count for book, chapter_count in CHAPTER_COUNTS.items()
+            if refresh or book not in previous
+        }
+
+        parsed, missing = await fetch_books(session, version, base_url, wanted, concurrency) if wanted else ({}, {})
+        for book, chapters in missing.items():
+            parsed.pop(book, None)
+            logger.warning(f"Leaving out {book} ({version}): chapters {chapters} failed to download")
+        stats.incomplete = len(missing)
+        stats.bytes = sum(len(text.encode('utf-8')) for chapters in parsed.values()
+                          for verses in chapters.values() for text in verses.values())
+        checksums = {book: value for book, value in previous.items() if book not in parsed}
+        checksums.update({book: book_checksum(chapters) for book, chapters in parsed.items()})
+
+        self._commit(version, parsed, checksums, stats)
+        return self._finish(stats, started)
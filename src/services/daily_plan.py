@@ -0,0 +1,340 @@
+"""
+Precomputed daily verse plans.
+
+A plan fixes a whole year's schedule up front: for every date, the verse (or passage) and
+the translation to send. It is generated from a seed derived from the year, so the same
+settings always give the same plan, and no verse appears twice in it. Verses are drawn by
+walking seeded permutations (see verse_selector) and, when their texts are available, a
+candidate too similar to the previous days is passed over (see similarity). Daily delivery
+is then a lookup by day of year, with no state shared between runs.
+
+Each plan is one small file per year:
+
+    magic (8 bytes) | header length (u32) | JSON header | one record per day
+    (first verse ID u32, last verse ID u32, translation index u8)
+"""
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.models.bible_books import expand_range
+from src.services.local_corpus import LocalCorpus
+from src.services.reference_parser import VerseRange
+from src.services.similarity import SimilarityFilter
+from src.services.topic_index import TopicIndex, topic_index
+from src.services.verse_index import VerseIndex, canonical_index
+from src.services.verse_selector import permutation, pool_fingerprint
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Translations rotated weekly through the year
+DAILY_TRANSLATIONS = ["KJV", "ASV", "BBE", "DBY", "WBT", "WEB", "YLT"]
+
+# Candidates scored against the previous days per batch, and at most per pick
+SIMILARITY_BATCH = 16
+SIMILARITY_SCAN_LIMIT = 1024
+
+# Text of a verse range, or None if it is not available
+TextSource = Callable[[VerseRange], Optional[str]]
+
+
+@dataclass(frozen=True)
+class PlanEntry:
+    """What to send on one day."""
+
+    day: date
+    verse_range: VerseRange
+    translation: str
+
+
+class DailyPlan:
+    """One year's schedule: day of year -> verse range and translation."""
+
+    MAGIC = b"BVPLAN1\0"
+    _HEADER_LENGTH = struct.Struct("<I")
+    _RECORD = struct.Struct("<IIB")
+
+    def __init__(self, year: int, translations: Sequence[str], themes: Sequence[str],
+                 ranges: Sequence[VerseRange], translation_indexes: Sequence[int],
+                 similarity: Optional[Sequence[float]] = None):
+        """
+        Args:
+            year: Calendar year planned
+            translations: Translations the days refer to by index
+            themes: Weekly themes the plan was drawn from (empty: any verse)
+            ranges: One verse range per day of the year
+            translation_indexes: One translation index per day of the year
+            similarity: Near-duplicate threshold and window the plan was checked with (None: unchecked)
+        """
+        self.year = year
+        self.translations = list(translations)
+        self.themes = list(themes)
+        self.ranges = list(ranges)
+        self.translation_indexes = list(translation_indexes)
+        self.similarity = list(similarity) if similarity is not None else None
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def matches(self, translations: Sequence[str], themes: Sequence[str],
+                similarity: Optional[Sequence[float]] = None) -> bool:
+        """Check the plan was generated for these translations, themes and similarity settings."""
+        return (self.translations == list(translations) and self.themes == list(themes)
+                and self.similarity == (list(similarity) if similarity is not None else None))
+
+    def entry(self, day: date) -> PlanEntry:
+        """
+        Get the entry for a date of the planned year.
+
+        Raises:
+            ValueError: If the date is in another year
+        """
+        if day.year != self.year:
+            raise ValueError(f"{day.isoformat()} is not in the {self.year} plan")
+        position = day.timetuple().tm_yday - 1
+        return PlanEntry(day, self.ranges[position], self.translations[self.translation_indexes[position]])
+
+    def entries(self) -> List[PlanEntry]:
+        """Get every day's entry in date order."""
+        first = date(self.year, 1, 1).toordinal()
+        return [self.entry(date.fromordinal(first + position)) for position in range(len(self))]
+
+    def save(self, path: Path):
+        """Write the plan atomically."""
+        header = json.dumps({
+            'year': self.year,
+            'translations': self.translations,
+            'themes': self.themes,
+            'similarity': self.similarity,
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }, separators=(',', ':')).encode('utf-8')
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC + self._HEADER_LENGTH.pack(len(header)) + header)
+            for verse_range, translation_index in zip(self.ranges, self.translation_indexes):
+                f.write(self._RECORD.pack(verse_range.start, verse_range.end, translation_index))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "DailyPlan":
+        """
+        Read a plan file.
+
+        Raises:
+            ValueError: If the file is not a plan
+        """
+        data = path.read_bytes()
+        if data[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError(f"{path} is not a daily plan file")
+
+        position = len(cls.MAGIC)
+        (header_length,) = cls._HEADER_LENGTH.unpack_from(data, position)
+        position += cls._HEADER_LENGTH.size
+        header = json.loads(data[position:position + header_length].decode('utf-8'))
+        position += header_length
+
+        ranges, translation_indexes = [], []
+        for start, end, translation_index in cls._RECORD.iter_unpack(data[position:]):
+            ranges.append(VerseRange(start, end))
+            translation_indexes.append(translation_index)
+        return cls(header['year'], header['translations'], header['themes'], ranges, translation_indexes,
+                   header.get('similarity'))
+
+
+def plan_seed(year: int, translations: Sequence[str], themes: Sequence[str]) -> int:
+    """Seed a year's plan from its settings, so regenerating it gives the same plan."""
+    return zlib.crc32(json.dumps([year, list(translations), list(themes)]).encode('utf-8'))
+
+
+def similarity_settings(similarity: Optional[SimilarityFilter]) -> Optional[List[float]]:
+    """The settings a plan records for its near-duplicate check (None when there is none)."""
+    return [similarity.threshold, similarity.window] if similarity is not None else None
+
+
+def corpus_texts(corpus: LocalCorpus, version: str = "en-kjv") -> TextSource:
+    """Read planned ranges' texts from a local corpus version (None while it is not imported)."""
+    def text_of(verse_range: VerseRange) -> Optional[str]:
+        index = corpus.verse_index(version)
+        if index is None:
+            return None
+        texts = [
+            corpus.text_at(version, ordinal)
+            for ordinal in map(index.ordinal_of, expand_range(*verse_range)) if ordinal is not None
+        ]
+        return " ".join(text for text in texts if text) or None
+    return text_of
+
+
+def generate_plan(year: int, translations: Sequence[str] = DAILY_TRANSLATIONS, themes: Sequence[str] = (),
+                  index: VerseIndex = canonical_index, topics: TopicIndex = topic_index,
+                  similarity: Optional[SimilarityFilter] = None, text_of: Optional[TextSource] = None) -> DailyPlan:
+    """
+    Plan a whole year without repeating any verse.
+
+    Translations rotate weekly. With themes, each week draws passages from its theme; once a
+    theme has no passage left that avoids the verses already planned, its days fall back to
+    random verses. Themes and random days each walk their own seeded permutation, like the
+    verse history does. With a similarity filter and texts, candidates too similar to the
+    previous days are passed over (and left for later) unless none of the next few is distinct.
+
+    Args:
+        year: Calendar year to plan
+        translations: Translations to rotate through
+        themes: Weekly themes (empty: a random verse every day)
+        index: Verses random days are drawn from
+        topics: Topic index themed days are drawn from
+        similarity: Near-duplicate filter (None: no check); its candidates are replaced
+        text_of: Source of the texts compared (None: no check)
+    """
+    check = similarity if text_of is not None else None
+    used: Set[int] = set()
+    recent: List[str] = []
+    days = date(year + 1, 1, 1).toordinal() - date(year, 1, 1).toordinal()
+
+    # Each pool: its candidates in permutation order, and a cursor before which all are used
+    pools: Dict[Optional[str], Tuple[Callable[[int], VerseRange], Sequence[int]]] = {}
+    for theme in themes:
+        passages = topics.passages(theme)
+        order = permutation(len(passages), year, 0, pool_fingerprint(f"{start}-{end}" for start, end in passages))
+        pools[theme] = (passages.__getitem__, order)
+    pools[None] = (
+        lambda ordinal: VerseRange(index.verse_id(ordinal), index.verse_id(ordinal)),
+        permutation(index.total, year, 0, plan_seed(year, translations, themes))
+    )
+    cursors = dict.fromkeys(pools, 0)
+
+    ranges, translation_indexes = [], []
+    for day_of_year in range(1, days + 1):
+        week = day_of_year // 7
+        verse_range = None
+        for pool in ([themes[week % len(themes)]] if themes else []) + [None]:
+            candidate, order = pools[pool]
+            verse_range, cursors[pool] = _draw(candidate, order, cursors[pool], used, check, text_of, recent)
+            if verse_range is not None:
+                break
+
+        used.update(expand_range(*verse_range))
+        ranges.append(verse_range)
+        translation_indexes.append(week % len(translations))
+        if check is not None:
+            text = text_of(verse_range)
+            if text:
+                recent = (recent + [text])[-check.window:]
+
+    logger.info(f"Planned {days} daily verses for {year}")
+    return DailyPlan(year, translations, themes, ranges, translation_indexes, similarity_settings(check))
+
+
+def _draw(candidate: Callable[[int], VerseRange], order: Sequence[int], cursor: int, used: Set[int],
+          similarity: Optional[SimilarityFilter], text_of: Optional[TextSource],
+          recent: List[str]) -> Tuple[Optional[VerseRange], int]:
+    """
+    Pick the first unused candidate from the cursor that is not a near duplicate of a recent day.
+
+    Returns:
+        The pick (None if the pool is used up) and the new cursor
+    """
+    def unused(position: int) -> bool:
+        return used.isdisjoint(expand_range(*candidate(order[position])))
+
+    # Every position before the cursor is used, so it only moves forward
+    while cursor < len(order) and not unused(cursor):
+        cursor += 1
+    if cursor == len(order):
+        return None, cursor
+    if similarity is None or not recent:
+        return candidate(order[cursor]), cursor
+
+    first = candidate(order[cursor])
+    # The first candidate usually passes, so it is scored alone before whole batches
+    position, scanned, batch = cursor, 0, 1
+    while position < len(order) and scanned < SIMILARITY_SCAN_LIMIT:
+        choices = []
+        while position < len(order) and len(choices) < batch:
+            if unused(position):
+                choices.append(candidate(order[position]))
+            position += 1
+        scanned += len(choices)
+        batch = SIMILARITY_BATCH
+        # One pass scores a batch against the recent days (a missing text counts as distinct)
+        similarity.set_candidates([text_of(choice) or "" for choice in choices])
+        for choice, allowed in zip(choices, similarity.allowed(recent)):
+            if allowed:
+                return choice, cursor
+    logger.info("No distinct candidate left nearby, ignoring similarity for this day")
+    return first, cursor
+
+
+class DailyPlanner:
+    """Loads each year's plan from disk, generating and saving it on first use."""
+
+    def __init__(self, plan_dir: str = "data/plans", translations: Sequence[str] = DAILY_TRANSLATIONS,
+                 themes: Sequence[str] = (), similarity: Optional[SimilarityFilter] = None,
+                 text_of: Optional[TextSource] = None):
+        """
+        Args:
+            plan_dir: Directory holding one plan file per year
+            translations: Translations to rotate through
+            themes: Weekly themes (empty: any verse)
+            similarity: Near-duplicate filter applied while planning (used only by the planner)
+            text_of: Source of the texts the filter compares
+        """
+        self.plan_dir = Path(plan_dir)
+        self.translations = list(translations)
+        self.themes = list(themes)
+        self.similarity = similarity
+        self.text_of = text_of
+        self._plans: Dict[int, DailyPlan] = {}
+
+    def path_for(self, year: int) -> Path:
+        """Get the plan file path for a year."""
+        return self.plan_dir / f"{year}.plan"
+
+    def get_plan(self, year: int, regenerate: bool = False) -> DailyPlan:
+        """
+        Get a year's plan, generating it if there is none or the settings changed since.
+
+        A plan that cannot be saved (e.g. on a read-only filesystem) is still returned;
+        generation is deterministic, so the next run rebuilds the same plan.
+        """
+        plan = None
+        if not regenerate:
+            plan = self._plans.get(year) or self._load(year)
+        if plan is None:
+            plan = generate_plan(year, self.translations, self.themes,
+                                 similarity=self.similarity, text_of=self.text_of)
+            try:
+                plan.save(self.path_for(year))
+            except OSError as e:
+                logger.warning(f"Could not save the {year} daily plan: {e}")
+        self._plans[year] = plan
+        return plan
+
+    def _similarity_settings(self) -> Optional[List[float]]:
+        return similarity_settings(self.similarity if self.text_of is not None else None)
+
+    def _load(self, year: int) -> Optional[DailyPlan]:
+        try:
+            plan = DailyPlan.load(self.path_for(year))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable daily plan for {year}: {e}")
+            return None
+        if plan.year != year or not plan.matches(self.translations, self.themes, self._similarity_settings()):
+            logger.info(f"Daily plan for {year} was made with other settings, regenerating")
+            return None
+        return plan
+
+    def entry_for(self, day: Optional[date] = None) -> PlanEntry:
+        """Get the entry for a date (today by default)."""
+        day = day or date.today()
+        return self.get_plan(day.year).entry(day)
@@ -0,0 +1,423 @@
+"""
+SQLite storage backend, enabled by DATABASE_URL (e.g. sqlite:///data/bible_bot.db).
+
+Holds the verse corpus (with an FTS5 full-text index), sent-verse history and chats, so
+point lookups, keyword search and history queries are indexed queries. The database runs
+in WAL mode, so readers never block the writer, and connections come from a small pool.
+"""
+
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verses (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL,
+    verse_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (version, verse_id)
+);
+
+-- External-content FTS5 index over verses.text, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS verses_fts USING fts5(
+    text, content='verses', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS verses_after_insert AFTER INSERT ON verses BEGIN
+    INSERT INTO verses_fts (rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS verses_after_delete AFTER DELETE ON verses BEGIN
+    INSERT INTO verses_fts (verses_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS verses_after_update AFTER UPDATE ON verses BEGIN
+    INSERT INTO verses_fts (verses_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO verses_fts (rowid, text) VALUES (new.id, new.text);
+END;
+
+-- Sent verses per year; chat_id '' is the bot-wide history
+CREATE TABLE IF NOT EXISTS history (
+    year INTEGER NOT NULL,
+    chat_id TEXT NOT NULL DEFAULT '',
+    verse_id INTEGER NOT NULL,
+    sent_at TEXT NOT NULL,
+    PRIMARY KEY (year, chat_id, verse_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_history_chat ON history (chat_id, year);
+
+-- Progress of each year's non-repeating selection (see verse_selector)
+CREATE TABLE IF NOT EXISTS selection_cursors (
+    year INTEGER NOT NULL,
+    chat_id TEXT NOT NULL DEFAULT '',
+    cycle INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    pool INTEGER NOT NULL,
+    PRIMARY KEY (year, chat_id)
+) WITHOUT ROWID;
+
+-- Texts of the last few sent verses, for the near-duplicate filter
+CREATE TABLE IF NOT EXISTS recent_verses (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    sent_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id TEXT PRIMARY KEY,
+    title TEXT,
+    added_at TEXT NOT NULL,
+    last_sent_at TEXT,
+    active INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+_QUERY_WORD = re.compile(r"[\w']+")
+
+
+def sqlite_path(database_url: str) -> Path:
+    """
+    Get the database file of a sqlite:/// URL.
+
+    'sqlite:///data/bot.db' is relative to the working directory, 'sqlite:////var/bot.db' absolute.
+
+    Raises:
+        ValueError: If the URL is not a file-backed SQLite URL
+    """
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix) or database_url[len(prefix):] in ("", ":memory:"):
+        raise ValueError(f"Unsupported DATABASE_URL '{database_url}' (expected sqlite:///path/to/file.db)")
+    return Path(database_url[len(prefix):])
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Translate a search query into FTS5 syntax.
+
+    "Quoted phrases" are required; free words are alternatives ranked by bm25, like the
+    in-memory search index. Every word is quoted, so user input never hits FTS5 operators.
+
+    Returns:
+        The FTS5 query, or None if the query has no words
+    """
+    phrases = []
+    for phrase in re.findall(r'"([^"]*)"', query):
+        words = _QUERY_WORD.findall(phrase)
+        if words:
+            phrases.append('"' + " ".join(words) + '"')
+    words = [f'"{word}"' for word in _QUERY_WORD.findall(re.sub(r'"[^"]*"', " ", query))]
+
+    parts = list(phrases)
+    if words:
+        parts.append("(" + " OR ".join(words) + ")" if phrases else " OR ".join(words))
+    return " AND ".join(parts) if parts else None
+
+
+class ConnectionPool:
+    """Small pool of SQLite connections to one database file, each in WAL mode."""
+
+    def __init__(self, path: Path, size: int = 4, timeout: float = 5.0):
+        self.path = path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL makes NORMAL durable across application crashes, only an OS crash can lose the last commits
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; the block runs as one transaction (committed unless it raises)."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                connection = self._idle.get(timeout=self.timeout)
+
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            with self._lock:
+                self._created -= 1
+
+
+class Database:
+    """Verses, full-text search, history and chats in one SQLite file."""
+
+    def __init__(self, path: Path, pool_size: int = 4):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = ConnectionPool(self.path, pool_size)
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+        logger.info(f"Opened database {self.path}")
+
+    def close(self):
+        """Close the pooled connections."""
+        self.pool.close()
+
+    # Verses
+
+    def import_version(self, version: str, verses: Iterable[Tuple[int, str]]) -> int:
+        """
+        Replace the stored text of a Bible version.
+
+        Args:
+            version: Bible version (e.g., 'en-kjv')
+            verses: (verse ID, text) pairs
+
+        Returns:
+            Number of verses stored
+        """
+        with self.pool.connection() as connection:
+            connection.execute("DELETE FROM verses WHERE version = ?", (version,))
+            cursor = connection.executemany(
+                "INSERT INTO verses (version, verse_id, text) VALUES (?, ?, ?)",
+                ((version, verse_id, text) for verse_id, text in verses if text)
+            )
+            count = cursor.rowcount
+        logger.info(f"Stored {count} verses of {version} in {self.path}")
+        return count
+
+    def has_version(self, version: str) -> bool:
+        """Check whether a Bible version has been imported."""
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT 1 FROM verses WHERE version = ? LIMIT 1", (version,)).fetchone()
+        return row is not None
+
+    def get_text(self, version: str, verse_id: int) -> Optional[str]:
+        """Look up the text of one verse (None if not stored)."""
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "SELECT text FROM verses WHERE version = ? AND verse_id = ?", (version, verse_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_range(self, version: str, start_id: int, end_id: int) -> Dict[int, str]:
+        """Get the stored verses with IDs in [start_id, end_id], as verse ID -> text."""
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT verse_id, text FROM verses WHERE version = ? AND verse_id BETWEEN ? AND ? "
+                "ORDER BY verse_id",
+                (version, start_id, end_id)
+            ).fetchall()
+        return dict(rows)
+
+    def search(self, version: str, query: str, limit: int = 10) -> List[Tuple[int, str, float]]:
+        """
+        Full-text search one version, best matches first.
+
+        Returns:
+            (verse ID, text, bm25 score) triples; lower scores are better matches
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        with self.pool.connection() as connection:
+            return connection.execute(
+                "SELECT verses.verse_id, verses.text, bm25(verses_fts) AS score "
+                "FROM verses_fts JOIN verses ON verses.id = verses_fts.rowid "
+                "WHERE verses_fts MATCH ? AND verses.version = ? "
+                "ORDER BY score LIMIT ?",
+                (match, version, limit)
+            ).fetchall()
+
+    # History
+
+    def mark_sent(self, year: int, verse_ids: Iterable[int], chat_id: str = ""):
+        """Record verses as sent in a year."""
+        sent_at = datetime.now().isoformat()
+        with self.pool.connection() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO history (year, chat_id, verse_id, sent_at) VALUES (?, ?, ?, ?)",
+                ((year, chat_id, verse_id, sent_at) for verse_id in verse_ids)
+            )
+
+    def sent_verse_ids(self, year: int, chat_id: str = "") -> Set[int]:
+        """Get the IDs of verses sent in a year."""
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT verse_id FROM history WHERE year = ? AND chat_id = ?", (year, chat_id)
+            ).fetchall()
+        return {verse_id for (verse_id,) in rows}
+
+    def was_sent(self, year: int, verse_id: int, chat_id: str = "") -> bool:
+        """Check whether a verse was sent in a year."""
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM history WHERE year = ? AND chat_id = ? AND verse_id = ?",
+                (year, chat_id, verse_id)
+            ).fetchone()
+        return row is not None
+
+    def history_years(self, chat_id: str = "") -> List[int]:
+        """List the years with sent verses."""
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT year FROM history WHERE chat_id = ? ORDER BY year", (chat_id,)
+            ).fetchall()
+        return [year for (year,) in rows]
+
+    def load_history(self, chat_id: str = "") -> Dict[int, Set[int]]:
+        """Get every year's sent verse IDs."""
+        history: Dict[int, Set[int]] = {}
+        with self.pool.connection() as connection:
+            for year, verse_id in connection.execute(
+                    "SELECT year, verse_id FROM history WHERE chat_id = ?", (chat_id,)):
+                history.setdefault(year, set()).add(verse_id)
+        return history
+
+    def delete_history(self, year: Optional[int] = None, before: Optional[int] = None, chat_id: str = ""):
+        """
+        Delete sent-verse history.
+
+        Args:
+            year: Only this year
+            before: Only years before this one
+            chat_id: Chat whose history to delete
+
+        Selection cursors of the deleted years go with them.
+        """
+        where, params = "WHERE chat_id = ?", [chat_id]
+        if year is not None:
+            where, params = where + " AND year = ?", params + [year]
+        if before is not None:
+            where, params = where + " AND year < ?", params + [before]
+        with self.pool.connection() as connection:
+            connection.execute("DELETE FROM history " + where, params)
+            connection.execute("DELETE FROM selection_cursors " + where, params)
+
+    def set_cursor(self, year: int, cycle: int, position: int, pool: int, chat_id: str = ""):
+        """Store a year's selection cursor."""
+        with self.pool.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO selection_cursors (year, chat_id, cycle, position, pool) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (year, chat_id, cycle, position, pool)
+            )
+
+    def load_cursors(self, chat_id: str = "") -> Dict[int, Tuple[int, int, int]]:
+        """Get every year's selection cursor as (cycle, position, pool)."""
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT year, cycle, position, pool FROM selection_cursors WHERE chat_id = ?", (chat_id,)
+            ).fetchall()
+        return {year: (cycle, position, pool) for year, cycle, position, pool in rows}
+
+    def add_recent_text(self, text: str, keep: int):
+        """Record a sent verse's text, keeping only the newest entries."""
+        with self.pool.connection() as connection:
+            cursor = connection.execute(
+                "INSERT INTO recent_verses (text, sent_at) VALUES (?, ?)", (text, datetime.now().isoformat())
+            )
+            connection.execute("DELETE FROM recent_verses WHERE id <= ?", (cursor.lastrowid - keep,))
+
+    def recent_texts(self, limit: int) -> List[str]:
+        """Get the texts of the most recently sent verses, oldest first."""
+        if limit <= 0:
+            return []
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT text FROM recent_verses ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [text for (text,) in reversed(rows)]
+
+    # Chats
+
+    def upsert_chat(self, chat_id: str, title: Optional[str] = None):
+        """Register a chat, or re-activate it (keeping its title unless a new one is given)."""
+        with self.pool.connection() as connection:
+            connection.execute(
+                "INSERT INTO chats (chat_id, title, added_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (chat_id) DO UPDATE SET title = COALESCE(excluded.title, title), active = 1",
+                (chat_id, title, datetime.now().isoformat())
+            )
+
+    def record_chat_sends(self, chat_ids: Iterable[str]):
+        """Record a successful delivery to several chats (one transaction)."""
+        now = datetime.now().isoformat()
+        with self.pool.connection() as connection:
+            connection.executemany(
+                "INSERT INTO chats (chat_id, added_at, last_sent_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (chat_id) DO UPDATE SET last_sent_at = excluded.last_sent_at",
+                [(chat_id, now, now) for chat_id in chat_ids]
+            )
+
+    def deactivate_chat(self, chat_id: str):
+        """Stop treating a chat as active (e.g. the bot was removed from it)."""
+        with self.pool.connection() as connection:
+            connection.execute("UPDATE chats SET active = 0 WHERE chat_id = ?", (chat_id,))
+
+    def get_chats(self, active_only: bool = True) -> List[dict]:
+        """List registered chats."""
+        sql = "SELECT chat_id, title, added_at, last_sent_at, active FROM chats"
+        if active_only:
+            sql += " WHERE active = 1"
+        with self.pool.connection() as connection:
+            rows = connection.execute(sql + " ORDER BY added_at").fetchall()
+        return [
+            {'chat_id': chat_id, 'title': title, 'added_at': added_at,
+             'last_sent_at': last_sent_at, 'active': bool(active)}
+            for chat_id, title, added_at, last_sent_at, active in rows
+        ]
+
+
+_databases: Dict[str, Database] = {}
+
+
+def get_database(database_url: Optional[str], pool_size: int = 4) -> Optional[Database]:
+    """
+    Get the shared database for a DATABASE_URL.
+
+    Returns:
+        The database, or None if no URL is configured or it cannot be opened
+    """
+    if not database_url:
+        return None
+    if database_url not in _databases:
+        try:
+            _databases[database_url] = Database(sqlite_path(database_url), pool_size)
+        except Exception as e:
+            logger.error(f"Cannot open database {database_url}: {e}")
+            return None
+    return _databases[database_url]
@@ -0,0 +1,71 @@
+"""
+Append-only journal of verse history changes.
+
+Each change is one JSON line carrying an increasing sequence number. The history service
+appends a line per sent verse and periodically compacts: it writes a full snapshot that
+records the last sequence number it includes, then truncates the journal. On startup the
+snapshot is loaded and every journal line past its sequence number is replayed, so a crash
+between the two compaction steps never applies a change twice. A line cut short by a crash
+is skipped.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterator, List
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HistoryJournal:
+    """JSON-lines journal next to a history snapshot file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Records appended since the last truncation
+        self.length = 0
+
+    def append(self, record: dict):
+        """Append one record (a single small write)."""
+        self.extend([record])
+
+    def extend(self, records: List[dict]):
+        """Append several records with one write, synced to disk."""
+        data = "".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records).encode('utf-8')
+        with open(self.path, 'a+b') as f:
+            # Never continue a line left unfinished by a crash
+            if f.tell() > 0:
+                f.seek(-1, 2)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.length += len(records)
+
+    def records(self) -> List[dict]:
+        """Read every complete record, in order."""
+        records = list(self._read())
+        self.length = len(records)
+        return records
+
+    def _read(self) -> Iterator[dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping damaged line {number} of {self.path}")
+        except FileNotFoundError:
+            return
+
+    def truncate(self):
+        """Drop every record (after they were compacted into a snapshot)."""
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+        self.length = 0
@@ -0,0 +1,107 @@
+"""
+Background persistence for history changes.
+
+Changes are recorded in memory right away and the write is left to a HistoryWriter: the
+first change starts a short timer, every change made before it fires rides along, and the
+write then runs in a worker thread, so the event loop delivering messages never waits on
+the disk. Outside an event loop (scripts, tests) writes happen immediately. flush() writes
+whatever is pending and should be awaited on shutdown; changes left behind by a loop that
+ended first are written at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import os
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HistoryWriter:
+    """Coalesces writes requested within a short window into one write off the event loop."""
+
+    def __init__(self, write: Callable[[], None], delay: float = 1.0):
+        """
+        Args:
+            write: Blocking function writing every pending change (must be safe to call from a thread)
+            delay: Seconds to wait for more changes before writing
+        """
+        self.write = write
+        self.delay = delay
+        # Timer collecting changes for the next write, and every write task not finished yet
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._exit_hook = False
+
+    def schedule(self):
+        """Request a write: soon (batched with other requests) in a loop, immediately otherwise."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.write_now()
+            return
+        if not self._exit_hook:
+            # The loop may end before the timer fires (asyncio.run in scripts)
+            atexit.register(self.write_now)
+            self._exit_hook = True
+        # A timer left by a loop that has ended will never fire
+        if self._timer is not None and (self._timer.done() or self._timer.get_loop() is not loop):
+            self._tasks.discard(self._timer)
+            self._timer = None
+        if self._timer is None:
+            self._timer = loop.create_task(self._write_later())
+            self._tasks.add(self._timer)
+            self._timer.add_done_callback(self._tasks.discard)
+
+    async def _write_later(self):
+        await asyncio.sleep(self.delay)
+        # Changes made from now on are not covered by this write and start a new timer
+        self._timer = None
+        await asyncio.get_running_loop().run_in_executor(None, self.write_now)
+
+    def write_now(self):
+        """Write every pending change in the calling thread (errors are logged)."""
+        try:
+            self.write()
+        except Exception as e:
+            logger.error(f"Error writing history: {e}")
+
+    async def flush(self):
+        """Write every pending change now (waiting for a write already in progress)."""
+        loop = asyncio.get_running_loop()
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        # Let writes already running finish, then write whatever they did not cover
+        running = [task for task in self._tasks if not task.done() and task.get_loop() is loop]
+        self._tasks.difference_update([task for task in self._tasks if task.get_loop() is not loop])
+        await asyncio.gather(*running, return_exceptions=True)
+        await loop.run_in_executor(None, self.write_now)
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Replace a file's content atomically and durably: write a temp file, fsync it, rename it
+    over the file, then fsync the directory so the rename itself survives a crash.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_path.replace(path)
+    _fsync_directory(path.parent)
+
+
+def _fsync_directory(directory: Path):
+    """Flush a directory's entries to disk (POSIX only; Windows cannot open directories)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
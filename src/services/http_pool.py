@@ -0,0 +1,80 @@
+"""
+Shared HTTP connection pool for outbound API calls.
+One long-lived aiohttp session per process, so TLS handshakes and DNS lookups are paid once.
+"""
+
+from typing import Optional
+
+import aiohttp
+
+from src.config.settings import Settings, get_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def create_session(settings: Optional[Settings] = None) -> aiohttp.ClientSession:
+    """
+    Create an aiohttp session with keep-alive, DNS caching and explicit timeouts.
+
+    Args:
+        settings: Settings to read pool limits and timeouts from
+
+    Returns:
+        New client session (the caller owns it and must close it)
+    """
+    settings = settings or get_settings()
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_pool_limit,
+        limit_per_host=settings.http_pool_limit_per_host,
+        ttl_dns_cache=settings.http_dns_cache_ttl,
+        keepalive_timeout=settings.http_keepalive_timeout,
+        enable_cleanup_closed=True
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.http_total_timeout,
+        connect=settings.http_connect_timeout,
+        sock_read=settings.http_read_timeout
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+class HTTPConnectionPool:
+    """Application-scoped aiohttp session shared by every Bible API call."""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """The shared session, or None if the pool is not running."""
+        if self._session and not self._session.closed:
+            return self._session
+        return None
+
+    @property
+    def is_open(self) -> bool:
+        """Check whether the pool is running."""
+        return self.session is not None
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the shared session (no-op if already open)."""
+        if not self.is_open:
+            settings = get_settings()
+            self._session = create_session(settings)
+            logger.info(
+                f"HTTP connection pool started "
+                f"(limit {settings.http_pool_limit}, {settings.http_pool_limit_per_host} per host)"
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared session and release its connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("HTTP connection pool closed")
+        self._session = None
+
+
+# Global instance
+http_pool = HTTPConnectionPool()
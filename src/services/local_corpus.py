@@ -0,0 +1,412 @@
+"""
+Local Bible corpus for offline verse lookups.
+Stores complete translations on disk so verses can be served without network access.
+
+Each translation is one packed file, memory-mapped on first use:
+
+    magic (8 bytes) | header length (u32) | JSON header | padding to 4 bytes
+    | verse offsets ((total + 1) x u32) | UTF-8 text blob
+
+The header holds the per-chapter verse counts, which give every verse a dense ordinal
+(see VerseIndex); verse i is blob[offsets[i]:offsets[i + 1]], empty for gaps.
+"""
+
+import asyncio
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from src.models.bible_books import VERSE_COUNTS
+from src.services.verse_index import VerseIndex
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PackedVersion:
+    """One memory-mapped translation; lookups slice the mapping instead of loading the text."""
+
+    MAGIC = b"BVPACK1\0"
+    _HEADER_LENGTH = struct.Struct("<I")
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError(f"{path} is not a packed corpus file")
+
+            position = len(self.MAGIC)
+            (header_length,) = self._HEADER_LENGTH.unpack_from(self._mmap, position)
+            position += self._HEADER_LENGTH.size
+            header = json.loads(self._mmap[position:position + header_length].decode('utf-8'))
+            position = _align(position + header_length)
+
+            self.version: str = header['version']
+            self.index = VerseIndex(header['books'])
+
+            self._view = memoryview(self._mmap)
+            offsets_end = position + 4 * (self.index.total + 1)
+            if sys.byteorder == 'little':
+                self._offsets = self._view[position:offsets_end].cast('I')
+            else:
+                self._offsets = array('I', self._view[position:offsets_end])
+                self._offsets.byteswap()
+            self._blob = self._view[offsets_end:]
+        except Exception:
+            self.close()
+            raise
+
+    def text_at(self, ordinal: int) -> Optional[str]:
+        """Get the text stored at a verse ordinal (None for gaps)."""
+        start, end = self._offsets[ordinal], self._offsets[ordinal + 1]
+        if start == end:
+            return None
+        return str(self._blob[start:end], 'utf-8')
+
+    def close(self):
+        """Release the mapping (views must be released first)."""
+        for name in ('_blob', '_offsets', '_view'):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    @classmethod
+    def write(cls, path: Path, version: str, verse_counts: Dict[str, List[int]],
+              texts: List[str]):
+        """
+        Write a packed translation file atomically.
+
+        Args:
+            path: Destination file
+            version: Bible version stored in the header
+            verse_counts: Book -> verses per chapter, in canonical order
+            texts: One text per verse ordinal ("" for gaps)
+        """
+        header = json.dumps({'version': version, 'books': verse_counts}, separators=(',', ':')).encode('utf-8')
+        encoded = [text.encode('utf-8') for text in texts]
+
+        offsets = array('I', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        prefix = cls.MAGIC + cls._HEADER_LENGTH.pack(len(header)) + header
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(prefix)
+            f.write(b"\0" * (_align(len(prefix)) - len(prefix)))
+            f.write(offsets.tobytes())
+            for data in encoded:
+                f.write(data)
+        tmp_path.replace(path)
+
+
+def _align(position: int, boundary: int = 4) -> int:
+    """Round a file position up so the offset array is word-aligned."""
+    return (position + boundary - 1) // boundary * boundary
+
+
+class LocalCorpus:
+    """On-disk store of complete Bible translations."""
+
+    FILE_SUFFIX = ".bible"
+
+    def __init__(self, corpus_dir: str = "data/corpus"):
+        self.corpus_dir = Path(corpus_dir)
+        self._versions: Dict[str, PackedVersion] = {}
+
+    def path_for(self, version: str) -> Path:
+        """Get the store file path for a Bible version."""
+        return self.corpus_dir / f"{version}{self.FILE_SUFFIX}"
+
+    def has_version(self, version: str) -> bool:
+        """Check whether a Bible version has been imported."""
+        return version in self._versions or self.path_for(version).exists()
+
+    def available_versions(self) -> List[str]:
+        """List all imported Bible versions."""
+        if not self.corpus_dir.exists():
+            return []
+        return sorted(
+            path.name[:-len(self.FILE_SUFFIX)]
+            for path in self.corpus_dir.glob(f"*{self.FILE_SUFFIX}")
+        )
+
+    def _load(self, version: str) -> Optional[PackedVersion]:
+        """Map a Bible version on first use (only the header is parsed up front)."""
+        packed = self._versions.get(version)
+        if packed is not None:
+            return packed
+
+        path = self.path_for(version)
+        if not path.exists():
+            return None
+
+        try:
+            packed = PackedVersion(path)
+            self._versions[version] = packed
+            logger.info(f"Mapped local corpus {version} ({packed.index.total} verses)")
+            return packed
+        except Exception as e:
+            logger.error(f"Error loading local corpus {version}: {e}")
+            return None
+
+    def close(self):
+        """Unmap every loaded version."""
+        for packed in self._versions.values():
+            packed.close()
+        self._versions.clear()
+
+    def get_text(self, version: str, book: str, chapter: int, verse: int) -> Optional[str]:
+        """
+        Look up the text of a single verse.
+
+        Args:
+            version: Bible version (e.g., 'en-kjv')
+            book: Normalized book name (e.g., 'john')
+            chapter: Chapter number
+            verse: Verse number
+
+        Returns:
+            Verse text, or None if the verse is not in the corpus
+        """
+        packed = self._load(version)
+        if packed is None:
+            return None
+
+        ordinal = packed.index.ordinal(book, chapter, verse)
+        if ordinal is None:
+            return None
+        return packed.text_at(ordinal)
+
+    def get_chapter(self, version: str, book: str, chapter: int) -> Dict[int, str]:
+        """Get all verses of a chapter as a verse-number -> text mapping."""
+        packed = self._load(version)
+        if packed is None:
+            return {}
+
+        first = packed.index.ordinal(book, chapter, 1)
+        if first is None:
+            return {}
+
+        verses = {}
+        for number in range(1, packed.index.verse_count(book, chapter) + 1):
+            text = packed.text_at(first + number - 1)
+            if text:
+                verses[number] = text
+        return verses
+
+    def get_book(self, version: str, book: str) -> Dict[int, Dict[int, str]]:
+        """Get every stored verse of a book as chapter -> verse -> text."""
+        packed = self._load(version)
+        if packed is None:
+            return {}
+        chapters = {}
+        for chapter in range(1, packed.index.chapter_count(book) + 1):
+            verses = self.get_chapter(version, book, chapter)
+            if verses:
+                chapters[chapter] = verses
+        return chapters
+
+    def text_at(self, version: str, ordinal: int) -> Optional[str]:
+        """Get the text stored at a dense verse ordinal of a version (None for gaps)."""
+        packed = self._load(version)
+        if packed is None or not 0 <= ordinal < packed.index.total:
+            return None
+        return packed.text_at(ordinal)
+
+    def verse_index(self, version: str) -> Optional[VerseIndex]:
+        """Get the verse-count index stored with a version."""
+        packed = self._load(version)
+        return packed.index if packed is not None else None
+
+    def write_version(self, version: str, books: Dict[str, Dict[int, Dict[int, str]]]):
+        """
+        Write a complete Bible version to the store.
+
+        Args:
+            version: Bible version (e.g., 'en-kjv')
+            books: Mapping of book -> chapter -> verse -> text
+        """
+        # Canonical book order first, so a complete translation shares the canonical ordinals
+        order = [book for book in VERSE_COUNTS if book in books]
+        order += sorted(book for book in books if book not in VERSE_COUNTS)
+
+        verse_counts: Dict[str, List[int]] = {}
+        texts: List[str] = []
+        for book in order:
+            chapters = books[book]
+            if not chapters:
+                continue
+            counts = []
+            for chapter in range(1, max(chapters) + 1):
+                verses = chapters.get(chapter, {})
+                last_verse = max(verses) if verses else 0
+                counts.append(last_verse)
+                texts.extend(verses.get(n, "") for n in range(1, last_verse + 1))
+            verse_counts[book] = counts
+
+        self.corpus_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(version)
+
+        # Unmap the old file before it is replaced
+        old = self._versions.pop(version, None)
+        if old is not None:
+            old.close()
+
+        PackedVersion.write(path, version, verse_counts, texts)
+        logger.info(f"Wrote local corpus {version} ({len(verse_counts)} books, {len(texts)} verses) to {path}")
+
+    def import_from_json(self, version: str, source: str):
+        """
+        Import a Bible version from a JSON dump (see load_json_dump for the accepted layouts).
+
+        Args:
+            version: Bible version to store the dump under
+            source: Path to the JSON file
+        """
+        self.write_version(version, load_json_dump(source))
+
+    async def import_from_api(
+        self,
+        session: aiohttp.ClientSession,
+        version: str,
+        base_url: str,
+        book_chapters: Dict[str, int],
+        concurrency: int = 8
+    ):
+        """
+        Import a complete Bible version from the wldeh/bible-api CDN.
+
+        Args:
+            session: Open aiohttp session
+            version: Bible version (e.g., 'en-kjv')
+            base_url: API base URL
+            book_chapters: Mapping of book -> chapter count
+            concurrency: Maximum number of chapter downloads in flight
+        """
+        books, missing = await fetch_books(session, version, base_url, book_chapters, concurrency)
+        if missing:
+            logger.warning(f"Imported {version} without {sum(map(len, missing.values()))} chapters that failed to download")
+        self.write_version(version, books)
+
+
+async def fetch_books(
+    session: aiohttp.ClientSession,
+    version: str,
+    base_url: str,
+    book_chapters: Dict[str, int],
+    concurrency: int = 8
+) -> Tuple[Dict[str, Dict[int, Dict[int, str]]], Dict[str, List[int]]]:
+    """
+    Download books from the wldeh/bible-api CDN, all chapters concurrently.
+
+    A chapter that fails (error status, network error or empty payload) is reported rather
+    than aborting the other downloads.
+
+    Returns:
+        Mapping of book -> chapter -> verse -> text, and of book -> chapters that failed
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    books: Dict[str, Dict[int, Dict[int, str]]] = {}
+    missing: Dict[str, List[int]] = {}
+
+    async def fetch_chapter(book: str, chapter: int):
+        url = f"{base_url}/bibles/{version}/books/{book}/chapters/{chapter}.json"
+        try:
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        logger.warning(f"API returned status {response.status} for {url}")
+                        data = None
+                    else:
+                        data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Error downloading {url}: {e}")
+            data = None
+
+        verses = parse_chapter_payload(data) if data is not None else {}
+        if not verses:
+            missing.setdefault(book, []).append(chapter)
+            return
+        books.setdefault(book, {}).setdefault(chapter, {}).update(verses)
+
+    await asyncio.gather(*[
+        fetch_chapter(book, chapter)
+        for book, chapter_count in book_chapters.items()
+        for chapter in range(1, chapter_count + 1)
+    ])
+
+    for chapters in missing.values():
+        chapters.sort()
+    return books, missing
+
+
+def load_json_dump(source: str) -> Dict[str, Dict[int, Dict[int, str]]]:
+    """
+    Read a JSON Bible dump.
+
+    Accepts either a nested {book: {chapter: {verse: text}}} mapping or a flat
+    list of {"book", "chapter", "verse", "text"} records.
+
+    Returns:
+        Mapping of book -> chapter -> verse -> text
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    books: Dict[str, Dict[int, Dict[int, str]]] = {}
+    if isinstance(data, dict):
+        data = data.get('books', data)
+
+    if isinstance(data, dict):
+        for book, chapters in data.items():
+            for chapter, verses in chapters.items():
+                for verse, text in verses.items():
+                    books.setdefault(normalize_book_key(book), {}).setdefault(int(chapter), {})[int(verse)] = text
+    else:
+        for record in data:
+            book = normalize_book_key(record['book'])
+            books.setdefault(book, {}).setdefault(int(record['chapter']), {})[int(record['verse'])] = record['text']
+    return books
+
+
+def normalize_book_key(book: str) -> str:
+    """Normalize a book name to the API book key (e.g., '1 Corinthians' -> '1corinthians')."""
+    return book.lower().replace(" ", "")
+
+
+def parse_chapter_payload(data) -> Dict[int, str]:
+    """Extract verse-number -> text pairs from a wldeh/bible-api chapter payload."""
+    records = data.get('data', []) if isinstance(data, dict) else data
+    verses: Dict[int, str] = {}
+    for record in records or []:
+        try:
+            number = int(record['verse'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        text = (record.get('text') or "").strip()
+        if text and number not in verses:
+            verses[number] = text
+    return verses
+
+
+_corpora: Dict[str, LocalCorpus] = {}
+
+
+def get_local_corpus(corpus_dir: str = "data/corpus") -> LocalCorpus:
+    """Get the shared corpus instance for a directory."""
+    key = str(Path(corpus_dir))
+    if key not in _corpora:
+        _corpora[key] = LocalCorpus(corpus_dir)
+    return _corpora[key]
@@ -0,0 +1,316 @@
+"""
+Bible text providers and latency-aware routing between them.
+Each provider serves verses from one source; the registry picks the healthiest one per request.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from src.models.bible_books import BOOKS_BY_KEY, unpack_verse_id
+from src.services.database import Database
+from src.services.local_corpus import LocalCorpus, parse_chapter_payload
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProviderError(Exception):
+    """A provider failed to answer (transport error, timeout, 5xx...)."""
+
+    def __init__(self, message: str, transient: bool = True):
+        super().__init__(message)
+        # Transient failures (timeouts, resets, 5xx, 429) are worth retrying
+        self.transient = transient
+
+
+class ProviderUnavailable(Exception):
+    """A provider cannot serve this request (e.g. version not imported) but is not unhealthy."""
+
+
+class ProviderResponse:
+    """Verses returned by a provider, with HTTP status and cache validators."""
+
+    def __init__(self, status: int, verses: Optional[Dict[int, str]] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.status = status
+        self.verses = verses or {}
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class BibleProvider(ABC):
+    """Source of Bible text."""
+
+    name: str = "provider"
+    # Remote providers need an HTTP session and their answers are worth caching
+    remote: bool = True
+    # Lower tiers are always tried first; providers within a tier are ranked by health
+    tier: int = 1
+
+    def supports(self, version: str) -> bool:
+        """Check whether this provider can serve a Bible version."""
+        return True
+
+    @abstractmethod
+    async def fetch(self, session: Optional[aiohttp.ClientSession], version: str, book: str,
+                    chapter: int, verse: Optional[int] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    timeout: Optional[aiohttp.ClientTimeout] = None) -> ProviderResponse:
+        """
+        Fetch a whole chapter, or a single verse.
+
+        Args:
+            session: HTTP session (None for local providers)
+            version: Bible version (e.g., 'en-kjv')
+            book: Normalized book name
+            chapter: Chapter number
+            verse: Verse number, or None for the whole chapter
+            headers: Conditional request headers
+            timeout: Timeouts for this attempt
+
+        Returns:
+            ProviderResponse (status 200, 304 or 404)
+
+        Raises:
+            ProviderError: If the provider failed
+            ProviderUnavailable: If the provider cannot serve this request
+        """
+
+
+class HTTPProvider(BibleProvider):
+    """Provider for any HTTP endpoint serving wldeh/bible-api style JSON."""
+
+    def __init__(self, name: str, chapter_url: str, verse_url: Optional[str] = None):
+        """
+        Args:
+            name: Provider name
+            chapter_url: URL template with {version}, {book} and {chapter}
+            verse_url: URL template that also has {verse} (whole chapters are fetched if omitted)
+        """
+        self.name = name
+        self.chapter_url = chapter_url
+        self.verse_url = verse_url
+
+    async def fetch(self, session, version, book, chapter, verse=None, headers=None, timeout=None) -> ProviderResponse:
+        if session is None:
+            raise ProviderUnavailable(f"{self.name} needs an HTTP session")
+
+        single_verse = verse is not None and self.verse_url is not None
+        template = self.verse_url if single_verse else self.chapter_url
+        url = template.format(version=version, book=book, chapter=chapter, verse=verse)
+        logger.info(f"Fetching from {self.name}: {url}")
+
+        try:
+            async with session.get(url, headers=headers or {}, timeout=timeout) as response:
+                if response.status in (304, 404):
+                    return ProviderResponse(response.status)
+                if response.status != 200:
+                    raise ProviderError(
+                        f"{self.name} returned status {response.status} for {url}",
+                        transient=response.status >= 500 or response.status == 429
+                    )
+
+                data = await response.json(content_type=None)
+                if single_verse:
+                    verses = {verse: data.get("text", "")}
+                else:
+                    verses = parse_chapter_payload(data)
+                return ProviderResponse(
+                    200, verses,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"{self.name} request failed: {e}") from e
+
+
+class WldehProvider(HTTPProvider):
+    """wldeh/bible-api, served from any base URL that mirrors its layout."""
+
+    def __init__(self, name: str, base_url: str):
+        super().__init__(
+            name,
+            f"{base_url}/bibles/{{version}}/books/{{book}}/chapters/{{chapter}}.json",
+            f"{base_url}/bibles/{{version}}/books/{{book}}/chapters/{{chapter}}/verses/{{verse}}.json"
+        )
+        self.base_url = base_url
+
+
+class LocalCorpusProvider(BibleProvider):
+    """Serves verses from the imported local corpus."""
+
+    name = "local"
+    remote = False
+    tier = 0
+
+    def __init__(self, corpus: LocalCorpus):
+        self.corpus = corpus
+
+    def supports(self, version: str) -> bool:
+        return self.corpus.has_version(version)
+
+    async def fetch(self, session, version, book, chapter, verse=None, headers=None, timeout=None) -> ProviderResponse:
+        if verse is None:
+            verses = self.corpus.get_chapter(version, book, chapter)
+        else:
+            text = self.corpus.get_text(version, book, chapter, verse)
+            verses = {verse: text} if text else {}
+
+        if not verses:
+            # A gap in the corpus is not proof the verse doesn't exist; let remote providers answer
+            raise ProviderUnavailable(f"{book} {chapter} not in local corpus {version}")
+        return ProviderResponse(200, verses)
+
+
+class DatabaseProvider(BibleProvider):
+    """Serves verses imported into the SQLite backend (indexed point and range lookups)."""
+
+    name = "database"
+    remote = False
+    tier = 0
+
+    def __init__(self, database: Database):
+        self.database = database
+        # Versions known to be imported (misses are re-checked, a version may be imported later)
+        self._versions: set = set()
+
+    def supports(self, version: str) -> bool:
+        if version not in self._versions and self.database.has_version(version):
+            self._versions.add(version)
+        return version in self._versions
+
+    async def fetch(self, session, version, book, chapter, verse=None, headers=None, timeout=None) -> ProviderResponse:
+        info = BOOKS_BY_KEY.get(book)
+        if info is None:
+            raise ProviderUnavailable(f"{book} is not a canonical book")
+
+        # SQLite queries block, so keep them off the event loop
+        verses = await asyncio.get_running_loop().run_in_executor(
+            None, self._lookup, version, info, chapter, verse
+        )
+        if not verses:
+            raise ProviderUnavailable(f"{book} {chapter} not in database {version}")
+        return ProviderResponse(200, verses)
+
+    def _lookup(self, version, info, chapter, verse) -> Dict[int, str]:
+        """Read a chapter (verse None) or one verse: verse number -> text."""
+        if verse is None:
+            rows = self.database.get_range(version, info.verse_id(chapter, 1), info.verse_id(chapter, 0xFF))
+            return {unpack_verse_id(verse_id)[2]: text for verse_id, text in rows.items()}
+        text = self.database.get_text(version, info.verse_id(chapter, verse))
+        return {verse: text} if text else {}
+
+
+class ProviderHealth:
+    """Rolling latency/error statistics and circuit-breaker state for one provider."""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        # Circuit: closed while 0; open until this time; half-open once it has passed
+        self.open_until = 0.0
+        # When the half-open circuit last let a trial request through
+        self.trial_at = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def score(self) -> float:
+        """Lower is better: EWMA latency inflated by the EWMA error rate."""
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+
+class ProviderRegistry:
+    """Registered providers with EWMA latency/error routing and a circuit breaker."""
+
+    def __init__(self, alpha: float = 0.3, failure_threshold: int = 3, cooldown: float = 60.0):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.providers: List[BibleProvider] = []
+        self.health: Dict[str, ProviderHealth] = {}
+
+    def register(self, provider: BibleProvider):
+        """Add a provider (registration order breaks ties between equally healthy providers)."""
+        self.providers.append(provider)
+        self.health[provider.name] = ProviderHealth()
+
+    def ranked(self, version: str, include_remote: bool = True) -> List[BibleProvider]:
+        """
+        Get the providers to try for a version, best first.
+
+        Providers whose circuit is open are skipped until their cool-down ends; after that a
+        single trial request is let through (half-open) until it succeeds or fails.
+        """
+        now = time.monotonic()
+        candidates = [
+            provider for provider in self.providers
+            if provider.supports(version)
+            and (include_remote or not provider.remote)
+            and self._admits(self.health[provider.name], now)
+        ]
+        return sorted(candidates, key=lambda provider: (provider.tier, self.health[provider.name].score()))
+
+    def _admits(self, health: ProviderHealth, now: float) -> bool:
+        """Check whether a provider's circuit lets a request through (claiming the half-open trial)."""
+        if not health.open_until:
+            return True
+        if health.open_until > now:
+            return False
+        # Half-open: one trial at a time; a trial that was never reported is retried after a cool-down
+        if health.trial_at + self.cooldown > now:
+            return False
+        health.trial_at = now
+        return True
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else self.alpha * sample + (1 - self.alpha) * current
+
+    def record_success(self, provider: BibleProvider, latency: float):
+        """Record a successful answer."""
+        health = self.health[provider.name]
+        health.requests += 1
+        health.latency = self._ewma(health.latency, latency)
+        health.error_rate = (1 - self.alpha) * health.error_rate
+        # Closes the circuit, including after a successful half-open trial
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+        health.trial_at = 0.0
+
+    def record_failure(self, provider: BibleProvider, latency: float):
+        """Record a failed answer, opening the circuit after repeated failures (or a failed trial)."""
+        health = self.health[provider.name]
+        health.requests += 1
+        health.failures += 1
+        health.latency = self._ewma(health.latency, latency)
+        health.error_rate = self.alpha + (1 - self.alpha) * health.error_rate
+        health.consecutive_failures += 1
+
+        if health.open_until or health.consecutive_failures >= self.failure_threshold:
+            health.open_until = time.monotonic() + self.cooldown
+            health.trial_at = 0.0
+            logger.warning(
+                f"Provider {provider.name} failed {health.consecutive_failures} times in a row, "
+                f"ejecting it for {self.cooldown:.0f}s"
+            )
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Get per-provider health counters."""
+        now = time.monotonic()
+        return {
+            name: {
+                'requests': health.requests,
+                'failures': health.failures,
+                'latency_ms': round(health.latency * 1000, 2) if health.latency is not None else None,
+                'error_rate': round(health.error_rate, 3),
+                'circuit_open': health.open_until > now,
+                'circuit_half_open': 0 < health.open_until <= now
+            }
+            for name, health in self.health.items()
+        }
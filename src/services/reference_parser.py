@@ -0,0 +1,240 @@
+"""
+Bible reference parsing.
+Turns free-form references such as "John 3:16", "1 Cor 13:4-7" or "Rom 8:28; 12:1-2" into
+canonical verse-ID ranges.
+
+Book names are resolved through a prefix trie of every book name, key and alias, so any
+unambiguous abbreviation works ("Gen", "Phm", "Zeph"). The rest of the grammar is one
+compiled regular expression applied segment by segment; separators carry context forward:
+after ";" a bare number is a chapter of the same book, after "," it is a verse of the same chapter.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.models.bible_books import BOOKS, BookInfo
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReferenceParseError(ValueError):
+    """A reference could not be parsed."""
+
+
+class VerseRange(NamedTuple):
+    """Inclusive range of canonical verse IDs (may span chapters)."""
+
+    start: int
+    end: int
+
+
+class _TrieNode:
+    """One character step in the book trie."""
+
+    __slots__ = ("children", "book", "prefix_book", "ambiguous")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Book whose name or alias ends exactly here
+        self.book: Optional[BookInfo] = None
+        # The single book every name through this node belongs to (unless ambiguous)
+        self.prefix_book: Optional[BookInfo] = None
+        self.ambiguous = False
+
+
+class BookTrie:
+    """Prefix trie mapping book names, aliases and unambiguous abbreviations to books."""
+
+    def __init__(self, min_prefix: int = 2):
+        """
+        Args:
+            min_prefix: Letters an abbreviation needs before a unique prefix counts as a match
+        """
+        self.min_prefix = min_prefix
+        self._root = _TrieNode()
+
+    def insert(self, name: str, book: BookInfo):
+        """Add a normalized name (e.g. '1corinthians') for a book."""
+        node = self._root
+        for char in name:
+            node = node.children.setdefault(char, _TrieNode())
+            if node.prefix_book is None and not node.ambiguous:
+                node.prefix_book = book
+            elif node.prefix_book is not book:
+                node.prefix_book = None
+                node.ambiguous = True
+        node.book = book
+
+    def lookup(self, name: str) -> Optional[BookInfo]:
+        """
+        Find the book for a normalized name.
+
+        Exact names and aliases win; otherwise a prefix shared by only one book's names
+        matches that book (e.g. 'zeph' -> Zephaniah, but 'ph' is ambiguous).
+        """
+        node = self._root
+        for char in name:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        if node.book is not None:
+            return node.book
+        if len(name.lstrip("123")) >= self.min_prefix:
+            return node.prefix_book
+        return None
+
+
+def _build_trie() -> BookTrie:
+    """Index every book by key, display name and aliases."""
+    trie = BookTrie()
+    for book in BOOKS:
+        for name in (book.key, book.name, *book.aliases):
+            trie.insert(name.lower().replace(" ", ""), book)
+    return trie
+
+
+book_trie = _build_trie()
+
+# Spelled-out book numbers ("II Kings", "First John")
+_ORDINAL_WORDS = {
+    "i": "1", "ii": "2", "iii": "3",
+    "first": "1", "second": "2", "third": "3",
+    "1st": "1", "2nd": "2", "3rd": "3",
+}
+
+# One reference segment: optional book, chapter, optional verse, optional range end, separator.
+# Numbered books ("1 Cor", "II Kings", "First John") are sorted out by resolve_book.
+_SEGMENT = re.compile(r"""
+    \s*(?P<book>[1-3]?\s*[a-zA-Z][a-zA-Z.\s]*)?
+    (?P<chapter>\d+)
+    (?:\s*[:.]\s*(?P<verse>\d+))?
+    (?:\s*[-–—]\s*(?:(?P<end_chapter>\d+)\s*[:.]\s*)?(?P<end>\d+))?
+    \s*(?:(?P<separator>[;,])|$)
+""", re.VERBOSE)
+
+# Largest chapter or verse number a verse ID can hold
+_MAX_NUMBER = 0xFF
+
+
+@lru_cache(maxsize=1024)
+def resolve_book(name: str) -> Optional[BookInfo]:
+    """
+    Resolve a book name as written in a reference.
+
+    Args:
+        name: Book name, alias or abbreviation in any case (e.g., 'II Kings', '1 Cor', 'Jn.')
+
+    Returns:
+        Book metadata, or None if the name is unknown or ambiguous
+    """
+    words = name.lower().replace(".", " ").split()
+    if len(words) > 1 and words[0] in _ORDINAL_WORDS:
+        words[0] = _ORDINAL_WORDS[words[0]]
+    return book_trie.lookup("".join(words))
+
+
+@lru_cache(maxsize=4096)
+def parse_references(text: str) -> Tuple[VerseRange, ...]:
+    """
+    Parse one or more references into verse-ID ranges.
+
+    Supports verse and chapter ranges ("Proverbs 3:5-6", "John 3:16-4:2", "Psalms 1-2"),
+    whole chapters ("John 3"), single-chapter books ("Jude 3"), and lists separated by ";"
+    or "," ("Rom 8:28; 12:1-2", "John 3:16, 18").
+
+    Args:
+        text: Reference text
+
+    Returns:
+        Ranges in the order written
+
+    Raises:
+        ReferenceParseError: If any part of the text is not a valid reference
+    """
+    ranges = []
+    book: Optional[BookInfo] = None
+    chapter = 0
+    after_verse = False
+    separator = None
+    position = 0
+    length = len(text)
+    match_segment = _SEGMENT.match
+
+    while position < length or not ranges:
+        match = match_segment(text, position)
+        if match is None:
+            raise ReferenceParseError(f"Cannot parse reference '{text}' at position {position}")
+        position = match.end()
+        book_name, number, verse, end_chapter, end, next_separator = match.groups()
+        number = int(number)
+
+        if book_name:
+            book = resolve_book(book_name)
+            if book is None:
+                raise ReferenceParseError(f"Unknown book '{book_name.strip()}' in '{text}'")
+        elif book is None:
+            raise ReferenceParseError(f"Reference '{text}' does not name a book")
+        elif separator == "," and after_verse and verse is None and end_chapter is None:
+            # "John 3:16, 18": a bare number after a verse is another verse of that chapter
+            number, verse = chapter, number
+
+        if verse is None and end_chapter is None and book.chapter_count == 1:
+            # "Jude 3" means verse 3 of the only chapter
+            number, verse = 1, number
+
+        chapter = number
+        if end_chapter is not None:
+            # "John 3:16-4:2", or "John 3-4:2" from the start of the chapter
+            last_chapter, last_verse = int(end_chapter), int(end)
+            first_verse = 1 if verse is None else int(verse)
+        elif verse is None:
+            # Whole chapters: "John 3", "Psalms 1-2"
+            first_verse = 1
+            last_chapter = int(end) if end else chapter
+            last_verse = book.verse_count(last_chapter)
+        else:
+            first_verse = int(verse)
+            last_chapter = chapter
+            last_verse = int(end) if end else first_verse
+
+        if not (0 < chapter <= last_chapter <= book.chapter_count):
+            raise ReferenceParseError(f"Chapter out of range for {book.name} in '{text}'")
+        # Verse numbers past the canonical count are left for providers to judge, but must fit the ID
+        if not (0 < first_verse <= _MAX_NUMBER and 0 < last_verse <= _MAX_NUMBER) or (
+                last_chapter == chapter and last_verse < first_verse):
+            raise ReferenceParseError(f"Invalid verse range in '{text}'")
+
+        ordinal = book.ordinal << 16
+        ranges.append(VerseRange(
+            ordinal | (chapter << 8) | first_verse,
+            ordinal | (last_chapter << 8) | last_verse
+        ))
+        chapter = last_chapter
+        after_verse = verse is not None
+        separator = next_separator
+
+        if separator is None:
+            break
+
+    if position < length:
+        raise ReferenceParseError(f"Unexpected text after reference in '{text}'")
+    return tuple(ranges)
+
+
+def parse_reference(reference: str) -> Optional[VerseRange]:
+    """
+    Parse a reference into its first verse-ID range.
+
+    Args:
+        reference: Reference text (e.g., 'Song of Solomon 2:1', '1 Corinthians 13:4-7')
+
+    Returns:
+        First range written, or None if the reference is not valid
+    """
+    try:
+        return parse_references(reference)[0]
+    except ReferenceParseError as e:
+        logger.debug(str(e))
+        return None
@@ -0,0 +1,281 @@
+"""
+Persistent response cache for the Bible API.
+Keeps fetched verses on disk with LRU eviction and HTTP revalidation metadata.
+While an event loop runs, saves are batched and the file is written in a worker thread.
+"""
+
+import asyncio
+import atexit
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.models.bible_books import find_book
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class NegativeCache:
+    """Bounded set of references known not to exist, each remembered for a limited time."""
+
+    def __init__(self, max_entries: int = 2000, ttl: int = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> expiry timestamp, oldest first
+        self.entries: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+
+    def add(self, key: str):
+        """Remember that a key does not exist."""
+        self.entries[key] = time.time() + self.ttl
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def contains(self, key: str) -> bool:
+        """Check whether a key is known not to exist (expired entries are dropped)."""
+        expires_at = self.entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self.entries[key]
+            return False
+        self.hits += 1
+        return True
+
+    def discard(self, key: str):
+        """Forget a key (e.g. because it was found after all)."""
+        self.entries.pop(key, None)
+
+    def purge_expired(self):
+        """Drop every expired entry."""
+        now = time.time()
+        for key in [key for key, expires_at in self.entries.items() if expires_at <= now]:
+            del self.entries[key]
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of verse responses that survives restarts."""
+
+    # Seconds changes are collected before a background save
+    SAVE_DELAY = 5.0
+
+    def __init__(self, cache_file: str = "data/http_cache.json", max_entries: int = 5000,
+                 max_age: int = 7 * 24 * 3600, max_missing: int = 2000, missing_ttl: int = 24 * 3600):
+        self.cache_file = Path(cache_file)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.missing = NegativeCache(max_missing, missing_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self._exit_hook = False
+        self.load()
+
+    @staticmethod
+    def make_key(version: str, book: str, chapter: int, verse: int) -> str:
+        """Build the cache key for a verse (verse 0 = whole chapter): version and canonical verse ID."""
+        info = find_book(book)
+        if info is None or not (0 < chapter <= 0xFF and 0 <= verse <= 0xFF):
+            return f"{version}/{book}/{chapter}/{verse}"
+        return f"{version}/{info.verse_id(chapter, verse)}"
+
+    @classmethod
+    def _upgrade_key(cls, key: str) -> str:
+        """Convert a key written by older versions (version/book/chapter/verse) to the current form."""
+        parts = key.split("/")
+        if len(parts) == 4 and parts[2].isdigit() and parts[3].isdigit():
+            return cls.make_key(parts[0], parts[1], int(parts[2]), int(parts[3]))
+        return key
+
+    def load(self):
+        """Load cached responses from file."""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = OrderedDict((self._upgrade_key(key), entry) for key, entry in data.get('entries', []))
+                self.missing.entries = OrderedDict(
+                    (self._upgrade_key(key), expires_at) for key, expires_at in data.get('missing', [])
+                )
+                self.missing.purge_expired()
+                logger.info(
+                    f"Loaded {len(self.entries)} cached Bible API responses "
+                    f"and {len(self.missing.entries)} known-missing references"
+                )
+        except Exception as e:
+            logger.error(f"Error loading response cache: {e}")
+            self.entries = OrderedDict()
+            self.missing.entries = OrderedDict()
+
+    def save(self):
+        """Save cached responses to file if anything changed."""
+        data = self._serialize()
+        if data is not None:
+            self._write(data)
+
+    async def save_async(self):
+        """Save like save(), writing the file in a worker thread."""
+        data = self._serialize()
+        if data is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def schedule_save(self):
+        """Save soon, together with the changes of other fetches (immediately outside an event loop)."""
+        if not self._dirty:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        if not self._exit_hook:
+            # The loop may end before the save runs
+            atexit.register(self.save)
+            self._exit_hook = True
+        # A save left pending by a loop that has ended will never run
+        if self._save_task is None or self._save_task.done() or self._save_task.get_loop() is not loop:
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(self.SAVE_DELAY)
+        await self.save_async()
+
+    def _serialize(self) -> Optional[bytes]:
+        """Encode the cache (on the thread that modifies it), or None if nothing changed."""
+        if not self._dirty:
+            return None
+        # Entries are stored oldest-first so LRU order survives a reload
+        data = json.dumps({
+            'entries': list(self.entries.items()),
+            'missing': list(self.missing.entries.items())
+        }, ensure_ascii=False).encode('utf-8')
+        self._dirty = False
+        return data
+
+    def _write(self, data: bytes):
+        try:
+            with self._write_lock:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                tmp_file.replace(self.cache_file)
+            logger.debug("Response cache saved")
+        except Exception as e:
+            # Keep the changes for the next save
+            self._dirty = True
+            logger.error(f"Error saving response cache: {e}")
+
+    def get(self, version: str, book: str, chapter: int, verse: int) -> Optional[dict]:
+        """
+        Look up a cached response and mark it as recently used.
+
+        Returns:
+            Cache entry with 'text', 'etag', 'last_modified' and 'fetched_at', or None
+        """
+        key = self.make_key(version, book, chapter, verse)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def peek(self, version: str, book: str, chapter: int, verse: int) -> Optional[dict]:
+        """Look up a cached response without touching counters or LRU order."""
+        return self.entries.get(self.make_key(version, book, chapter, verse))
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Check whether an entry can be served without revalidation."""
+        return time.time() - entry.get('fetched_at', 0) < self.max_age
+
+    @staticmethod
+    def validators(entry: Optional[dict]) -> Dict[str, str]:
+        """Get conditional request headers for revalidating an entry."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, version: str, book: str, chapter: int, verse: int, text: str,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a response, evicting the least recently used entries if full."""
+        key = self.make_key(version, book, chapter, verse)
+        self.entries[key] = {
+            'text': text,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }
+        self.entries.move_to_end(key)
+        self.missing.discard(key)
+        self._dirty = True
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def put_many(self, version: str, book: str, chapter: int, verses: Dict[int, str],
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store every verse from a whole-chapter response."""
+        for verse, text in verses.items():
+            self.put(version, book, chapter, verse, text, etag=etag, last_modified=last_modified)
+
+    def mark_revalidated(self, version: str, book: str, chapter: int, verse: int):
+        """Record that the server confirmed an entry is unchanged (HTTP 304)."""
+        entry = self.entries.get(self.make_key(version, book, chapter, verse))
+        if entry is not None:
+            entry['fetched_at'] = time.time()
+            self.revalidations += 1
+            self._dirty = True
+
+    def mark_missing(self, version: str, book: str, chapter: int, verse: int):
+        """Record that a verse does not exist (e.g. the API returned 404)."""
+        self.missing.add(self.make_key(version, book, chapter, verse))
+        self._dirty = True
+
+    def is_missing(self, version: str, book: str, chapter: int, verse: int) -> bool:
+        """Check whether a verse is known not to exist."""
+        return self.missing.contains(self.make_key(version, book, chapter, verse))
+
+    def get_stats(self) -> dict:
+        """Get cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0,
+            'missing_entries': len(self.missing.entries),
+            'missing_hits': self.missing.hits
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def get_response_cache(cache_file: str = "data/http_cache.json", max_entries: int = 5000,
+                       max_age: int = 7 * 24 * 3600, max_missing: int = 2000,
+                       missing_ttl: int = 24 * 3600) -> ResponseCache:
+    """Get the shared response cache for a file."""
+    key = str(Path(cache_file))
+    if key not in _caches:
+        _caches[key] = ResponseCache(cache_file, max_entries, max_age, max_missing, missing_ttl)
+    return _caches[key]
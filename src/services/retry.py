@@ -0,0 +1,133 @@
+"""
+Retry policy for outbound requests.
+Capped exponential backoff with full jitter, a total deadline and per-attempt timeouts.
+Attempt timeouts reuse the connection pool's HTTP_* timeouts (see http_pool), shortened so
+no attempt runs past the deadline; they replace the session defaults for these requests.
+"""
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+from src.config.settings import Settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_transient(error: Exception) -> bool:
+    """Default retry predicate: errors that flag themselves as transient."""
+    return getattr(error, 'transient', False)
+
+
+class RetryPolicy:
+    """Retries transient failures within a bounded time budget."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 deadline: float = 10.0, connect_timeout: float = 5.0, read_timeout: float = 10.0,
+                 total_timeout: float = 30.0, rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.rng = rng or random.Random()
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.exhausted = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetryPolicy":
+        """Create a policy from application settings (timeouts come from the HTTP pool settings)."""
+        return cls(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            deadline=settings.retry_deadline,
+            connect_timeout=settings.http_connect_timeout,
+            read_timeout=settings.http_read_timeout,
+            total_timeout=settings.http_total_timeout
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt + 1 (0-based)."""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def attempt_timeout(self, remaining: float) -> aiohttp.ClientTimeout:
+        """The pool's timeouts for one attempt, never running past the overall deadline."""
+        return aiohttp.ClientTimeout(
+            total=min(self.total_timeout, remaining),
+            connect=min(self.connect_timeout, remaining),
+            sock_read=min(self.read_timeout, remaining)
+        )
+
+    def start_deadline(self) -> float:
+        """Absolute loop time by which a request using this policy must finish."""
+        return asyncio.get_running_loop().time() + self.deadline
+
+    async def run(self, fn: Callable[[aiohttp.ClientTimeout], Awaitable[Any]],
+                  deadline: Optional[float] = None,
+                  retryable: Callable[[Exception], bool] = is_transient) -> Any:
+        """
+        Call fn until it succeeds, a non-retryable error occurs, or the budget runs out.
+
+        Args:
+            fn: Coroutine function taking the per-attempt ClientTimeout
+            deadline: Absolute loop time to give up at (defaults to now + the policy deadline)
+            retryable: Predicate deciding which errors are worth retrying
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            The last error once attempts are exhausted, or asyncio.TimeoutError if the
+            deadline passes before another attempt can start
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + self.deadline
+        self.calls += 1
+
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.deadline_exceeded += 1
+                raise asyncio.TimeoutError("retry deadline exceeded")
+
+            self.attempts += 1
+            try:
+                return await fn(self.attempt_timeout(remaining))
+            except Exception as e:
+                if not retryable(e):
+                    raise
+                if attempt + 1 >= self.max_attempts:
+                    self.exhausted += 1
+                    raise
+
+                delay = self.backoff(attempt)
+                if loop.time() + delay >= deadline:
+                    self.deadline_exceeded += 1
+                    raise
+
+                logger.debug(f"Attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> dict:
+        """Get attempt counters."""
+        return {
+            'calls': self.calls,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'exhausted': self.exhausted,
+            'deadline_exceeded': self.deadline_exceeded
+        }
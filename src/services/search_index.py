@@ -0,0 +1,361 @@
+"""
+Full-text search over the local corpus.
+An inverted index with positional postings per translation, persisted next to the corpus.
+
+Index file layout (all integers little-endian):
+
+    magic (8 bytes) | header length (u32) | JSON header (terms, counts)
+    | verse lengths (u16 x verses) | term starts (u32 x terms + 1) | posting verses (u32)
+    | position starts (u32 x postings + 1) | positions (u16)
+
+Postings of term t are entries term_starts[t]:term_starts[t + 1]; each names a verse ordinal
+and the slice of positions where the term occurs in that verse.
+"""
+
+import heapq
+import json
+import math
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.services.local_corpus import LocalCorpus
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Too common to help ranking; still counted for positions so phrases line up
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from he her him his i in is it me my not of on or "
+    "shall she so that the thee their them they this thou thy to unto was we were which "
+    "with ye you".split()
+)
+
+# Checked in order; the first suffix that leaves a stem of 3+ letters is removed
+_SUFFIXES = ("ingly", "edly", "ings", "ing", "eth", "est", "ed", "es", "ly", "s")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer (covers KJV -eth/-est forms).
+
+    'love', 'loved', 'loveth' and 'loving' all stem to 'lov'.
+    """
+    if len(word) <= 3:
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word[-2] in "su":
+                # 'bless', 'jesus' are not plurals
+                break
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """
+    Split text into (position, stem) pairs, skipping stop words.
+
+    Positions count every word, so phrase offsets survive stop-word removal.
+    """
+    tokens = []
+    for position, word in enumerate(_WORD.findall(text.lower())):
+        word = word.split("'", 1)[0]
+        if word not in STOP_WORDS:
+            tokens.append((position, stem(word)))
+    return tokens
+
+
+def _parse_query(query: str) -> Tuple[List[str], List[List[Tuple[int, str]]]]:
+    """Split a query into free terms and "quoted phrases" (as position/stem lists)."""
+    phrases = []
+    for phrase in re.findall(r'"([^"]*)"', query):
+        tokens = tokenize(phrase)
+        if len(tokens) > 1:
+            phrases.append(tokens)
+    terms = [term for _, term in tokenize(query.replace('"', ' '))]
+    return terms, phrases
+
+
+class SearchIndex:
+    """Positional inverted index for one translation, ranked with BM25."""
+
+    MAGIC = b"BVSRCH1\0"
+    FILE_SUFFIX = ".search"
+    _HEADER_LENGTH = struct.Struct("<I")
+
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, version: str, terms: List[str], verse_lengths: array, term_starts: array,
+                 posting_verses: array, position_starts: array, positions: array):
+        self.version = version
+        self.terms = terms
+        self._term_ids: Dict[str, int] = {term: number for number, term in enumerate(terms)}
+        self.verse_lengths = verse_lengths
+        self.term_starts = term_starts
+        self.posting_verses = posting_verses
+        self.position_starts = position_starts
+        self.positions = positions
+
+        self.verse_count = sum(1 for length in verse_lengths if length)
+        self.average_length = (sum(verse_lengths) / self.verse_count) if self.verse_count else 0.0
+        self.impacts = self._compute_impacts()
+
+    def _compute_impacts(self) -> array:
+        """Precompute each posting's BM25 contribution so queries only add numbers up."""
+        k1, b = self.K1, self.B
+        average_length = self.average_length or 1.0
+        lengths, verses, position_starts = self.verse_lengths, self.posting_verses, self.position_starts
+
+        impacts = array('f', bytes(4 * len(verses)))
+        for term_id in range(len(self.terms)):
+            start, end = self.term_starts[term_id], self.term_starts[term_id + 1]
+            idf = math.log(1 + (self.verse_count - (end - start) + 0.5) / ((end - start) + 0.5))
+            for entry in range(start, end):
+                frequency = position_starts[entry + 1] - position_starts[entry]
+                norm = k1 * (1 - b + b * lengths[verses[entry]] / average_length)
+                impacts[entry] = idf * frequency * (k1 + 1) / (frequency + norm)
+        return impacts
+
+    @classmethod
+    def build(cls, corpus: LocalCorpus, version: str) -> Optional["SearchIndex"]:
+        """
+        Index every verse of a translation in the local corpus.
+
+        Returns:
+            The index, or None if the version is not in the corpus
+        """
+        verse_index = corpus.verse_index(version)
+        if verse_index is None:
+            return None
+
+        postings: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        verse_lengths = array('H', bytes(2 * verse_index.total))
+        for ordinal in range(verse_index.total):
+            text = corpus.text_at(version, ordinal)
+            if not text:
+                continue
+            occurrences: Dict[str, List[int]] = defaultdict(list)
+            tokens = tokenize(text)
+            for position, term in tokens:
+                occurrences[term].append(min(position, 0xFFFF))
+            verse_lengths[ordinal] = min(len(tokens), 0xFFFF)
+            for term, term_positions in occurrences.items():
+                postings[term].append((ordinal, term_positions))
+
+        terms = sorted(postings)
+        term_starts, posting_verses = array('I', [0]), array('I')
+        position_starts, positions = array('I', [0]), array('H')
+        for term in terms:
+            for ordinal, term_positions in postings[term]:
+                posting_verses.append(ordinal)
+                positions.extend(term_positions)
+                position_starts.append(len(positions))
+            term_starts.append(len(posting_verses))
+
+        logger.info(f"Built search index for {version}: {len(terms)} terms, {len(posting_verses)} postings")
+        return cls(version, terms, verse_lengths, term_starts, posting_verses, position_starts, positions)
+
+    @classmethod
+    def path_for(cls, corpus: LocalCorpus, version: str) -> Path:
+        """Get the index file path for a translation (next to its corpus file)."""
+        return corpus.corpus_dir / f"{version}{cls.FILE_SUFFIX}"
+
+    def _arrays(self) -> List[array]:
+        return [self.verse_lengths, self.term_starts, self.posting_verses, self.position_starts, self.positions]
+
+    def save(self, path: Path):
+        """Write the index atomically."""
+        header = json.dumps({
+            'version': self.version,
+            'terms': self.terms,
+            'sizes': [len(values) for values in self._arrays()]
+        }, separators=(',', ':')).encode('utf-8')
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC + self._HEADER_LENGTH.pack(len(header)) + header)
+            for values in self._arrays():
+                if sys.byteorder != 'little':
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """
+        Read an index written by save().
+
+        Raises:
+            ValueError: If the file is not a search index
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a search index")
+            (header_length,) = cls._HEADER_LENGTH.unpack(f.read(cls._HEADER_LENGTH.size))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+            arrays = []
+            for typecode, size in zip("HIIIH", header['sizes']):
+                values = array(typecode)
+                values.fromfile(f, size)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                arrays.append(values)
+
+        return cls(header['version'], header['terms'], *arrays)
+
+    def _postings(self, term: str) -> range:
+        """Get the posting entries of a term (empty if unknown)."""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return range(0)
+        return range(self.term_starts[term_id], self.term_starts[term_id + 1])
+
+    def _find(self, postings: range, ordinal: int) -> Optional[int]:
+        """Find a verse's entry among a term's postings (they are sorted by ordinal)."""
+        entry = bisect_left(self.posting_verses, ordinal, postings.start, postings.stop)
+        if entry < postings.stop and self.posting_verses[entry] == ordinal:
+            return entry
+        return None
+
+    def _positions(self, entry: int) -> array:
+        return self.positions[self.position_starts[entry]:self.position_starts[entry + 1]]
+
+    def _phrase_verses(self, phrase: List[Tuple[int, str]]) -> set:
+        """Get the ordinals of verses containing a phrase, words at their relative offsets."""
+        first_position = phrase[0][0]
+        # Start from the rarest word, then probe the other words' postings by binary search
+        by_size = sorted(phrase, key=lambda token: len(self._postings(token[1])))
+
+        position, term = by_size[0]
+        offset = position - first_position
+        candidates: Dict[int, set] = {
+            self.posting_verses[entry]: {start - offset for start in self._positions(entry)}
+            for entry in self._postings(term)
+        }
+        for position, term in by_size[1:]:
+            offset = position - first_position
+            postings = self._postings(term)
+            found = {}
+            for ordinal, starts in candidates.items():
+                entry = self._find(postings, ordinal)
+                if entry is None:
+                    continue
+                starts = starts.intersection(start - offset for start in self._positions(entry))
+                if starts:
+                    found[ordinal] = starts
+            candidates = found
+            if not candidates:
+                break
+        return set(candidates)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Rank verses against a query.
+
+        Free words are scored with BM25 (any word may match); "quoted phrases" must appear
+        in the verse word for word.
+
+        Args:
+            query: Search text, optionally with quoted phrases
+            limit: Maximum number of results
+
+        Returns:
+            (verse ordinal, score) pairs, best first
+        """
+        terms, phrases = _parse_query(query)
+        if not terms or not self.verse_count:
+            return []
+
+        required = None
+        for phrase in phrases:
+            matches = self._phrase_verses(phrase)
+            required = matches if required is None else required & matches
+
+        term_postings = [postings for postings in map(self._postings, set(terms)) if postings]
+        if required is None and len(term_postings) == 1:
+            # One word: its precomputed impacts are the scores
+            postings = term_postings[0]
+            ranked = heapq.nlargest(limit, zip(
+                self.impacts[postings.start:postings.stop],
+                self.posting_verses[postings.start:postings.stop]
+            ))
+            return [(ordinal, score) for score, ordinal in ranked]
+
+        scores: Dict[int, float] = {}
+        if required is not None:
+            # Phrase matches are few: score just those verses
+            for postings in term_postings:
+                for ordinal in required:
+                    entry = self._find(postings, ordinal)
+                    if entry is not None:
+                        scores[ordinal] = scores.get(ordinal, 0.0) + self.impacts[entry]
+        else:
+            get = scores.get
+            for postings in term_postings:
+                for ordinal, impact in zip(self.posting_verses[postings.start:postings.stop],
+                                           self.impacts[postings.start:postings.stop]):
+                    scores[ordinal] = get(ordinal, 0.0) + impact
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+# (corpus dir, version) -> (corpus file mtime, index)
+_indexes: Dict[Tuple[str, str], Tuple[float, SearchIndex]] = {}
+
+
+def get_search_index(corpus: LocalCorpus, version: str) -> Optional[SearchIndex]:
+    """
+    Get the search index for a translation, loading or building it on first use.
+
+    The index file is rebuilt whenever the corpus file is newer than it.
+
+    Returns:
+        The index, or None if the version is not in the local corpus
+    """
+    corpus_path = corpus.path_for(version)
+    if not corpus_path.exists():
+        return None
+
+    key = (str(corpus.corpus_dir), version)
+    corpus_mtime = corpus_path.stat().st_mtime
+    cached = _indexes.get(key)
+    if cached and cached[0] == corpus_mtime:
+        return cached[1]
+
+    path = SearchIndex.path_for(corpus, version)
+    index = None
+    if path.exists() and path.stat().st_mtime >= corpus_mtime:
+        try:
+            index = SearchIndex.load(path)
+            logger.info(f"Loaded search index for {version} ({len(index.terms)} terms)")
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable search index {path}: {e}")
+
+    if index is None:
+        index = SearchIndex.build(corpus, version)
+        if index is None:
+            return None
+        try:
+            index.save(path)
+        except Exception as e:
+            logger.error(f"Error saving search index {path}: {e}")
+
+    _indexes[key] = (corpus_mtime, index)
+    return index
@@ -0,0 +1,118 @@
+"""
+Near-duplicate detection between verses.
+
+Texts are embedded with feature hashing: stemmed words and adjacent word pairs (see
+search_index.tokenize) are hashed into a fixed number of signed buckets, weighted 1 + log(tf)
+and L2-normalized, so the dot product of two embeddings is their cosine similarity.
+Candidate embeddings form a matrix built once when the candidate pool is set; each
+selection is then a single matrix product against the recently sent verses. NumPy does the
+product when installed; otherwise the same scores come from sparse dot products.
+"""
+
+import math
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from src.services.search_index import tokenize
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sparse embedding: bucket -> weight
+SparseVector = Dict[int, float]
+
+
+def _features(text: str) -> List[str]:
+    """Stems plus pairs of stems that were adjacent in the text (stop words break pairs)."""
+    tokens = tokenize(text)
+    features = [term for _, term in tokens]
+    features += [
+        f"{first} {second}"
+        for (position, first), (next_position, second) in zip(tokens, tokens[1:])
+        if next_position == position + 1
+    ]
+    return features
+
+
+class SimilarityFilter:
+    """Rejects candidate verses too similar to the ones sent most recently."""
+
+    def __init__(self, threshold: float = 0.6, window: int = 7, dimensions: int = 1024):
+        """
+        Args:
+            threshold: Cosine similarity above which a candidate counts as a near duplicate
+            window: Number of recently sent verses to compare against
+            dimensions: Hash buckets per embedding
+        """
+        self.threshold = threshold
+        self.window = window
+        self.dimensions = dimensions
+        self._candidates: List[SparseVector] = []
+        self._matrix = None
+
+    def embed(self, text: str) -> SparseVector:
+        """Embed a text as a normalized sparse vector."""
+        counts: Dict[str, int] = {}
+        for feature in _features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+
+        vector: SparseVector = {}
+        for feature, count in counts.items():
+            hashed = zlib.crc32(feature.encode('utf-8'))
+            bucket = hashed % self.dimensions
+            # The sign bit keeps colliding features from always adding up
+            sign = -1.0 if hashed & 0x80000000 else 1.0
+            vector[bucket] = vector.get(bucket, 0.0) + sign * (1 + math.log(count))
+
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {bucket: weight / norm for bucket, weight in vector.items()} if norm else {}
+
+    def _dense(self, vectors: Sequence[SparseVector]):
+        matrix = np.zeros((len(vectors), self.dimensions), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            if vector:
+                matrix[row, list(vector)] = list(vector.values())
+        return matrix
+
+    def set_candidates(self, texts: Sequence[str]):
+        """Embed the candidate pool (once, ahead of any selection)."""
+        self._candidates = [self.embed(text) for text in texts]
+        self._matrix = self._dense(self._candidates) if np is not None else None
+        logger.debug(f"Embedded {len(texts)} candidate verses")
+
+    def embed_recent(self, recent_texts: Sequence[str]) -> List[SparseVector]:
+        """Embed the recent texts that fall within the window."""
+        return [self.embed(text) for text in recent_texts[-self.window:]] if self.window > 0 else []
+
+    def max_similarities(self, recent_texts: Sequence[str]) -> List[float]:
+        """Get each candidate's highest cosine similarity to any of the recent texts."""
+        recent = self.embed_recent(recent_texts)
+        if not recent or not self._candidates:
+            return [0.0] * len(self._candidates)
+
+        if self._matrix is not None:
+            # candidates x dimensions @ dimensions x recent, then the best match per candidate
+            return (self._matrix @ self._dense(recent).T).max(axis=1).tolist()
+
+        return [_max_dot(candidate, recent) for candidate in self._candidates]
+
+    def allowed(self, recent_texts: Sequence[str]) -> List[bool]:
+        """Flag the candidates that are not near duplicates of the recent texts."""
+        return [similarity <= self.threshold for similarity in self.max_similarities(recent_texts)]
+
+
+def _max_dot(vector: SparseVector, others: Sequence[SparseVector]) -> float:
+    """Highest dot product of a sparse vector with any of the others."""
+    return max(sum(weight * other.get(bucket, 0.0) for bucket, weight in vector.items()) for other in others)
+
+
+def create_similarity_filter(threshold: float, window: int) -> Optional[SimilarityFilter]:
+    """Create a filter, or None if the settings disable it (no window, or a threshold of 1 or more)."""
+    if window <= 0 or threshold >= 1:
+        return None
+    return SimilarityFilter(threshold, window)
@@ -0,0 +1,62 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight call instead of each issuing their own.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key onto one shared task."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for a key, or join the call already in flight for that key.
+
+        The shared call runs as its own task, so a caller being cancelled (e.g. a losing
+        hedged request) does not cancel the work other callers are waiting on.
+
+        Args:
+            key: Identity of the call (e.g. (version, book, chapter, verse))
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            Result of the shared call (exceptions are re-raised to every caller)
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Joined in-flight request for {key}")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        """Forget a finished call so the next one for its key starts fresh."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so it is not reported as unhandled when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        """Get coalescing counters."""
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight)
+        }
@@ -0,0 +1,108 @@
+"""
+Topic (tag) index for themed verses.
+Each tag holds its passages as parallel sorted arrays of first/last verse IDs, plus the
+sorted array of every verse ID they cover; random picks index straight into the arrays.
+"""
+
+import random
+from array import array
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.models.bible_books import expand_range
+from src.models.topics import TOPIC_REFERENCES
+from src.services.reference_parser import VerseRange, parse_references
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TopicIndex:
+    """Tag -> passages and covered verse IDs, stored as compact sorted arrays."""
+
+    def __init__(self, topics: Dict[str, Iterable[str]]):
+        """
+        Args:
+            topics: Tag -> references (e.g. {'hope': ['Romans 15:13', 'Romans 5:3-5']})
+        """
+        self._starts: Dict[str, array] = {}
+        self._ends: Dict[str, array] = {}
+        self._verse_ids: Dict[str, array] = {}
+        tags_by_verse: Dict[int, List[str]] = {}
+
+        for tag, references in topics.items():
+            tag = normalize_tag(tag)
+            ranges = sorted({verse_range for reference in references for verse_range in parse_references(reference)})
+            self._starts[tag] = array('I', (verse_range.start for verse_range in ranges))
+            self._ends[tag] = array('I', (verse_range.end for verse_range in ranges))
+
+            covered = sorted({verse_id for verse_range in ranges for verse_id in expand_range(*verse_range)})
+            self._verse_ids[tag] = array('I', covered)
+            for verse_id in covered:
+                tags_by_verse.setdefault(verse_id, []).append(tag)
+
+        self._tags_by_verse: Dict[int, Tuple[str, ...]] = {
+            verse_id: tuple(tags) for verse_id, tags in tags_by_verse.items()
+        }
+        # Merged passages of tag combinations, built on first use
+        self._unions: Dict[FrozenSet[str], Tuple[array, array]] = {}
+
+    def tags(self) -> List[str]:
+        """List every tag."""
+        return sorted(self._starts)
+
+    def passages(self, tag: str) -> List[VerseRange]:
+        """Get a tag's passages in canonical order (empty for unknown tags)."""
+        tag = normalize_tag(tag)
+        return [VerseRange(start, end) for start, end in zip(self._starts.get(tag, ()), self._ends.get(tag, ()))]
+
+    def verse_ids(self, tag: str) -> array:
+        """Get the sorted IDs of every verse a tag covers."""
+        return self._verse_ids.get(normalize_tag(tag), array('I'))
+
+    def contains(self, tag: str, verse_id: int) -> bool:
+        """Check whether a tag covers a verse."""
+        verse_ids = self.verse_ids(tag)
+        position = bisect_left(verse_ids, verse_id)
+        return position < len(verse_ids) and verse_ids[position] == verse_id
+
+    def tags_for(self, verse_id: int) -> List[str]:
+        """Get the tags covering a verse."""
+        return list(self._tags_by_verse.get(verse_id, ()))
+
+    def _union(self, tags: FrozenSet[str]) -> Tuple[array, array]:
+        """Get the distinct passages of several tags (cached per combination)."""
+        union = self._unions.get(tags)
+        if union is None:
+            unknown = [tag for tag in tags if tag not in self._starts]
+            if unknown:
+                raise ValueError(f"Unknown topic(s): {', '.join(sorted(unknown))} (available: {', '.join(self.tags())})")
+            ranges = sorted({
+                (start, end) for tag in tags for start, end in zip(self._starts[tag], self._ends[tag])
+            })
+            union = (array('I', (start for start, _ in ranges)), array('I', (end for _, end in ranges)))
+            self._unions[tags] = union
+        return union
+
+    def random_passage(self, tags: Iterable[str], rng: Optional[random.Random] = None) -> VerseRange:
+        """
+        Pick a passage uniformly from one or more tags, in O(1) once the combination is cached.
+
+        Raises:
+            ValueError: If no tags are given or a tag is unknown
+        """
+        key = frozenset(normalize_tag(tag) for tag in tags)
+        if not key:
+            raise ValueError("No topics given")
+        starts, ends = self._union(key)
+        position = (rng or random).randrange(len(starts))
+        return VerseRange(starts[position], ends[position])
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a tag for lookups (case and surrounding whitespace are ignored)."""
+    return tag.strip().lower()
+
+
+# Shipped topics, indexed once at import
+topic_index = TopicIndex(TOPIC_REFERENCES)
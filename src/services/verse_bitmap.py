@@ -0,0 +1,111 @@
+"""
+Bitmap sets of verses.
+
+A VerseBitmap holds one bit per verse of the canon, addressed by the verse's dense ordinal
+(see VerseIndex): 31,102 verses fit in under 4 KB. Membership is a bit test, counting is a
+popcount over the whole buffer, and a year's history serializes to a few hundred bytes
+once compressed.
+"""
+
+import base64
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from src.services.verse_index import VerseIndex, canonical_index
+
+
+class VerseBitmap:
+    """Set of canonical verse IDs stored as a bitmap over verse ordinals."""
+
+    __slots__ = ("index", "bits")
+
+    def __init__(self, verse_ids: Iterable[int] = (), index: VerseIndex = canonical_index,
+                 bits: Optional[bytearray] = None):
+        """
+        Args:
+            verse_ids: Initial verse IDs
+            index: Verse index mapping IDs to bit positions
+            bits: Raw bitmap to wrap (as produced by to_bytes)
+        """
+        self.index = index
+        size = (index.total + 7) // 8
+        if bits is not None and len(bits) != size:
+            raise ValueError(f"Bitmap has {len(bits)} bytes, expected {size}")
+        self.bits = bits if bits is not None else bytearray(size)
+        self.update(verse_ids)
+
+    def add(self, verse_id: int) -> bool:
+        """
+        Add a verse.
+
+        Returns:
+            False if the verse is not in the index (and so cannot be stored)
+        """
+        ordinal = self.index.ordinal_of(verse_id)
+        if ordinal is None:
+            return False
+        self.bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return True
+
+    def update(self, verse_ids: Iterable[int]):
+        """Add several verses (IDs outside the index are ignored)."""
+        for verse_id in verse_ids:
+            self.add(verse_id)
+
+    def has_ordinal(self, ordinal: int) -> bool:
+        """Test a bit directly by verse ordinal."""
+        return bool(self.bits[ordinal >> 3] >> (ordinal & 7) & 1)
+
+    def __contains__(self, verse_id: int) -> bool:
+        ordinal = self.index.ordinal_of(verse_id)
+        return ordinal is not None and self.has_ordinal(ordinal)
+
+    def isdisjoint(self, verse_ids: Iterable[int]) -> bool:
+        """Check that none of the verses is in the set."""
+        return not any(verse_id in self for verse_id in verse_ids)
+
+    def __len__(self) -> int:
+        # Popcount of the whole buffer in one pass (int.bit_count needs Python 3.10)
+        return bin(int.from_bytes(self.bits, 'little')).count("1")
+
+    def __bool__(self) -> bool:
+        return any(self.bits)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate verse IDs in canonical order."""
+        for position, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield self.index.verse_id(position * 8 + low.bit_length() - 1)
+                byte ^= low
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, VerseBitmap):
+            return self.index is other.index and self.bits == other.bits
+        return NotImplemented
+
+    def clear(self):
+        """Remove every verse."""
+        self.bits[:] = bytes(len(self.bits))
+
+    def to_bytes(self) -> bytes:
+        """Raw bitmap (one bit per verse ordinal, least significant bit first)."""
+        return bytes(self.bits)
+
+    def encode(self) -> str:
+        """Compact text form for JSON: base64 of the zlib-compressed bitmap."""
+        return base64.b64encode(zlib.compress(self.bits, 9)).decode('ascii')
+
+    @classmethod
+    def decode(cls, text: str, index: VerseIndex = canonical_index) -> "VerseBitmap":
+        """
+        Read the text form produced by encode.
+
+        Raises:
+            ValueError: If the data is damaged or sized for another index
+        """
+        try:
+            bits = bytearray(zlib.decompress(base64.b64decode(text)))
+        except (zlib.error, ValueError) as e:
+            raise ValueError(f"Invalid verse bitmap: {e}") from e
+        return cls(index=index, bits=bits)
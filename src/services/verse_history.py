@@ -1,15 +1,34 @@
 """
 Verse history tracking service to prevent repetition within a year.
 Ensures verses are not repeated within the same calendar year.
+Sent verses are keyed by canonical verse ID, so every spelling of a reference counts once,
+and each year's sent verses are a bitmap over the canon (see verse_bitmap).
+History lives in a JSON snapshot plus an append-only journal of sends (see history_journal),
+or in the SQLite backend when DATABASE_URL is set; either way changes are written in the
+background, batched, off the event loop (see history_writer).
+Picks walk a seeded permutation of the available verses with a persisted cursor (see
+verse_selector). Optionally, candidates too similar to the last few sent verses are skipped
+(see similarity).
 """
 
 import json
 import os
+import threading
 from datetime import datetime, date
 from pathlib import Path
-from typing import List, Optional, Set, Dict
+from typing import Callable, List, Optional, Set, Dict, Tuple
 
-from src.models.verse import BibleVerse
+from src.config.settings import get_settings
+from src.models.bible_books import book_of, expand_range, verse_id_for
+from src.models.verse import BiblePassage, BibleVerse
+from src.services.database import Database, get_database
+from src.services.history_journal import HistoryJournal
+from src.services.history_writer import HistoryWriter, write_atomic
+from src.services.reference_parser import ReferenceParseError, parse_reference, parse_references
+from src.services.similarity import SimilarityFilter, create_similarity_filter
+from src.services.verse_bitmap import VerseBitmap
+from src.services.verse_index import canonical_index
+from src.services.verse_selector import SelectionCursor, permutation, pool_fingerprint
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,65 +37,249 @@ logger = get_logger(__name__)
 class VerseHistoryService:
     """Service for tracking and managing verse history to prevent repetition within a year."""
     
-    def __init__(self, history_file: str = "data/verse_history.json"):
+    def __init__(self, history_file: str = "data/verse_history.json", database: Optional[Database] = None,
+                 similarity: Optional[SimilarityFilter] = None, compact_every: int = 100,
+                 write_delay: float = 1.0):
+        """
+        Args:
+            history_file: JSON history file (imported into the database on first use if one is given)
+            database: SQLite backend to keep history in instead of the file
+            similarity: Filter rejecting near duplicates of recently sent verses
+            compact_every: Journal records after which the file history is compacted into the snapshot
+            write_delay: Seconds changes are collected before being written together
+        """
         self.history_file = Path(history_file)
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
-        self.sent_verses_by_year: Dict[int, Set[str]] = {}
+        self.journal = HistoryJournal(self.history_file.with_suffix('.journal'))
+        self.compact_every = compact_every
+        # Sequence number of the last change recorded (in the snapshot or the journal)
+        self.journal_seq = 0
+        self.database = database
+        self.similarity = similarity
+        self.sent_verses_by_year: Dict[int, VerseBitmap] = {}
+        self.cursors: Dict[int, SelectionCursor] = {}
+        # Texts of the most recently sent verses, oldest first
+        self.recent_texts: List[str] = []
         self.available_verses: List[BibleVerse] = []
+        # Bitmap positions each available verse covers, parallel to available_verses
+        self._available_ordinals: List[Tuple[int, ...]] = []
+        self._pool = pool_fingerprint(())
+        # Changes not written yet: journal records (file) or database calls, and whether to compact
+        self._pending_records: List[dict] = []
+        self._pending_operations: List[Callable[[], None]] = []
+        self._compact_pending = False
+        # _lock guards the in-memory history against the writer thread; _write_lock serializes writes
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.writer = HistoryWriter(self._write_pending, write_delay)
         self.load_history()
     
     def load_history(self):
-        """Load verse history from file."""
+        """Load verse history from the database or file."""
+        if self.database is None:
+            self._load_file()
+            return
+        
+        try:
+            self.sent_verses_by_year = {
+                year: VerseBitmap(verse_ids) for year, verse_ids in self.database.load_history().items()
+            }
+            self.recent_texts = self.database.recent_texts(self._recent_limit())
+            self.cursors = {year: SelectionCursor(*cursor) for year, cursor in self.database.load_cursors().items()}
+            logger.info(f"Loaded verse history for {len(self.sent_verses_by_year)} years from database")
+        except Exception as e:
+            logger.error(f"Error loading verse history from database: {e}")
+            self.sent_verses_by_year = {}
+            return
+        
+        if not self.sent_verses_by_year and (self.history_file.exists() or self.journal.path.exists()):
+            # First run on the database: carry the file history over
+            self._load_file()
+            for year, verse_ids in self.sent_verses_by_year.items():
+                self.database.mark_sent(year, verse_ids)
+            logger.info(f"Imported verse history from {self.history_file} into the database")
+    
+    def _load_file(self):
+        """Load verse history from the JSON snapshot, then replay the journal on top."""
         try:
             if self.history_file.exists():
                 with open(self.history_file, 'r') as f:
                     data = json.load(f)
                     # Convert year keys back to integers
                     self.sent_verses_by_year = {
-                        int(year): set(verses) 
-                        for year, verses in data.get('sent_verses_by_year', {}).items()
+                        int(year): VerseBitmap.decode(bitmap)
+                        for year, bitmap in data.get('sent_bitmaps_by_year', {}).items()
+                    }
+                    # Older files stored lists of verse IDs or references
+                    for year, verses in data.get('sent_verses_by_year', {}).items():
+                        self.sent_verses_by_year.setdefault(int(year), VerseBitmap()).update(
+                            self._to_verse_ids(verses)
+                        )
+                    self.recent_texts = data.get('recent_texts', [])
+                    self.cursors = {
+                        int(year): SelectionCursor(*cursor) for year, cursor in data.get('cursors', {}).items()
                     }
+                    self.journal_seq = data.get('journal_seq', 0)
                     logger.info(f"Loaded verse history for {len(self.sent_verses_by_year)} years")
             else:
                 logger.info("No history file found, starting fresh")
         except Exception as e:
             logger.error(f"Error loading verse history: {e}")
             self.sent_verses_by_year = {}
+        
+        replayed = 0
+        for record in self.journal.records():
+            # Records up to the snapshot's sequence number are already in it
+            if record.get('seq', 0) <= self.journal_seq:
+                continue
+            self._apply_sent(record['year'], record['ids'], record.get('text'))
+            if record.get('cursor'):
+                self.cursors[record['year']] = SelectionCursor(*record['cursor'])
+            self.journal_seq = record['seq']
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} verse history journal records")
     
     def save_history(self):
-        """Save verse history to file."""
-        try:
-            data = {
-                'sent_verses_by_year': {
-                    str(year): list(verses) 
-                    for year, verses in self.sent_verses_by_year.items()
-                },
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.history_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug("Verse history saved")
-        except Exception as e:
-            logger.error(f"Error saving verse history: {e}")
+        """
+        Write every pending change now, compacting the file history into a new snapshot.
+        (Normally changes are written by the background writer; see flush.)
+        """
+        with self._lock:
+            self._compact_pending = True
+        self.writer.write_now()
+    
+    async def flush(self):
+        """Write every pending change without blocking the event loop (call on shutdown)."""
+        await self.writer.flush()
+    
+    def _persist(self, record: Optional[dict] = None, operation: Optional[Callable[[], None]] = None,
+                 compact: bool = False):
+        """Queue a change for the background writer."""
+        with self._lock:
+            if record is not None:
+                self._pending_records.append(record)
+            if operation is not None:
+                self._pending_operations.append(operation)
+            self._compact_pending = self._compact_pending or compact
+        self.writer.schedule()
+    
+    def _write_pending(self):
+        """
+        Write the queued changes (blocking; runs in the writer's thread).
+        
+        File history is either appended to the journal in one write, or, once the journal is
+        long enough, compacted: the snapshot already holds every queued record, so they are
+        not appended first.
+        """
+        with self._write_lock:
+            with self._lock:
+                records, self._pending_records = self._pending_records, []
+                operations, self._pending_operations = self._pending_operations, []
+                compact = self._compact_pending or self.journal.length + len(records) >= self.compact_every
+                self._compact_pending = False
+                snapshot = self._snapshot() if compact and self.database is None else None
+            
+            for operation in operations:
+                operation()
+            if self.database is not None:
+                return
+            
+            try:
+                if snapshot is not None:
+                    write_atomic(self.history_file, snapshot)
+                    self.journal.truncate()
+                    logger.debug("Verse history saved")
+                elif records:
+                    self.journal.extend(records)
+            except Exception:
+                # Whatever was lost is still in memory: have the next write snapshot it
+                with self._lock:
+                    self._compact_pending = True
+                raise
+    
+    def _snapshot(self) -> bytes:
+        """Serialize the whole file history (caller holds the lock)."""
+        data = {
+            'sent_bitmaps_by_year': {
+                str(year): verses.encode()
+                for year, verses in self.sent_verses_by_year.items()
+            },
+            'recent_texts': self.recent_texts,
+            'cursors': {str(year): cursor.to_list() for year, cursor in self.cursors.items()},
+            'journal_seq': self.journal_seq,
+            'last_updated': datetime.now().isoformat()
+        }
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    @staticmethod
+    def _to_verse_ids(entries: List) -> Set[int]:
+        """Convert stored history entries to verse IDs (older files stored reference strings)."""
+        verse_ids = set()
+        for entry in entries:
+            if isinstance(entry, int):
+                verse_ids.add(entry)
+                continue
+            try:
+                for verse_range in parse_references(str(entry)):
+                    verse_ids.update(expand_range(verse_range.start, verse_range.end))
+            except ReferenceParseError:
+                logger.warning(f"Dropping unrecognized verse history entry: {entry}")
+        return verse_ids
+    
+    @staticmethod
+    def verse_id(verse: BibleVerse) -> Optional[int]:
+        """Get the canonical ID of a verse (its first verse, for passages)."""
+        verse_id = verse_id_for(verse.book, verse.chapter, verse.verse)
+        if verse_id is None:
+            parsed = parse_reference(verse.reference)
+            verse_id = parsed[0] if parsed else None
+        return verse_id
+    
+    @classmethod
+    def verse_ids(cls, verse: BibleVerse) -> List[int]:
+        """Get the canonical IDs of every verse a verse or passage covers."""
+        verse_id = cls.verse_id(verse)
+        if verse_id is None:
+            return []
+        if isinstance(verse, BiblePassage):
+            end_id = book_of(verse_id).verse_id(verse.end_chapter, verse.end_verse)
+            return expand_range(verse_id, end_id)
+        return [verse_id]
     
     def set_available_verses(self, verses: List[BibleVerse]):
-        """Set the list of available verses."""
+        """Set the list of available verses (embedding them for the similarity filter)."""
         self.available_verses = verses
+        self._available_ordinals = [
+            tuple(ordinal for ordinal in map(canonical_index.ordinal_of, self.verse_ids(verse)) if ordinal is not None)
+            for verse in verses
+        ]
+        self._pool = pool_fingerprint(verse.reference for verse in verses)
+        if self.similarity is not None:
+            self.similarity.set_candidates([verse.text for verse in verses])
         logger.info(f"Set {len(verses)} available verses")
     
+    def _recent_limit(self) -> int:
+        """Number of recently sent texts worth keeping."""
+        return self.similarity.window if self.similarity is not None else 0
+    
     def get_current_year(self) -> int:
         """Get the current year."""
         return datetime.now().year
     
-    def get_sent_verses_for_year(self, year: int) -> Set[str]:
-        """Get verses sent in a specific year."""
-        return self.sent_verses_by_year.get(year, set())
+    def get_sent_verses_for_year(self, year: int) -> Set[int]:
+        """Get the IDs of verses sent in a specific year."""
+        return set(self.sent_verses_by_year.get(year, ()))
     
     def get_unused_verses_for_year(self, year: int) -> List[BibleVerse]:
-        """Get verses that haven't been sent in the specified year."""
-        sent_verses = self.get_sent_verses_for_year(year)
-        unused = [verse for verse in self.available_verses 
-                  if verse.reference not in sent_verses]
+        """Get verses (and passages) none of whose verses have been sent in the specified year."""
+        sent_verses = self.sent_verses_by_year.get(year)
+        if not sent_verses:
+            unused = list(self.available_verses)
+        else:
+            has_ordinal = sent_verses.has_ordinal
+            unused = [verse for verse, ordinals in zip(self.available_verses, self._available_ordinals)
+                      if not any(map(has_ordinal, ordinals))]
         logger.info(f"Found {len(unused)} unused verses for year {year} out of {len(self.available_verses)} total")
         return unused
     
@@ -85,47 +288,141 @@ class VerseHistoryService:
         if year is None:
             year = self.get_current_year()
         
-        if year not in self.sent_verses_by_year:
-            self.sent_verses_by_year[year] = set()
+        verse_ids = self.verse_ids(verse)
+        if not verse_ids:
+            logger.warning(f"Cannot track '{verse.reference}': not a canonical reference")
+            return
         
-        self.sent_verses_by_year[year].add(verse.reference)
-        self.save_history()
+        limit = self._recent_limit()
+        text = verse.text if limit else None
+        with self._lock:
+            self._apply_sent(year, verse_ids, text)
+            cursor = self.cursors.get(year)
+            self.journal_seq += 1
+            seq = self.journal_seq
+        
+        if self.database is not None:
+            database = self.database
+            
+            def write_sent():
+                database.mark_sent(year, verse_ids)
+                if limit:
+                    database.add_recent_text(verse.text, keep=limit)
+                if cursor is not None:
+                    database.set_cursor(year, cursor.cycle, cursor.position, cursor.pool)
+            
+            self._persist(operation=write_sent)
+        else:
+            self._persist(record={
+                'seq': seq, 'year': year, 'ids': verse_ids, 'text': text,
+                'cursor': cursor.to_list() if cursor is not None else None
+            })
         logger.info(f"Marked verse '{verse.reference}' as sent for year {year}")
     
+    def _apply_sent(self, year: int, verse_ids: List[int], text: Optional[str]):
+        """Record sent verse IDs (and their text for the similarity window) in memory."""
+        self.sent_verses_by_year.setdefault(year, VerseBitmap()).update(verse_ids)
+        limit = self._recent_limit()
+        if limit and text is not None:
+            self.recent_texts = (self.recent_texts + [text])[-limit:]
+    
     def reset_history_for_year(self, year: int):
         """Reset the verse history for a specific year."""
         if year in self.sent_verses_by_year:
-            self.sent_verses_by_year[year].clear()
-            self.save_history()
+            with self._lock:
+                self.sent_verses_by_year[year].clear()
+                cursor = self.cursors.get(year)
+                if cursor is not None:
+                    # Start the next cycle: a fresh permutation from its first position
+                    self.cursors[year] = cursor = SelectionCursor(cursor.cycle + 1, 0, cursor.pool)
+            
+            operation = None
+            if self.database is not None:
+                database = self.database
+                
+                def operation():
+                    database.delete_history(year=year)
+                    if cursor is not None:
+                        database.set_cursor(year, cursor.cycle, cursor.position, cursor.pool)
+            
+            self._persist(operation=operation, compact=True)
             logger.info(f"Verse history reset for year {year}")
     
     def reset_all_history(self):
         """Reset all verse history."""
-        self.sent_verses_by_year.clear()
-        self.save_history()
+        with self._lock:
+            self.sent_verses_by_year.clear()
+            self.cursors.clear()
+        self._persist(operation=self.database.delete_history if self.database is not None else None, compact=True)
         logger.info("All verse history reset")
     
     def get_next_verse(self, year: Optional[int] = None) -> Optional[BibleVerse]:
-        """Get the next available verse for the specified year, ensuring no repetition within that year."""
+        """
+        Get the next available verse for the specified year, ensuring no repetition within that year.
+        
+        Walks the year's permutation from the cursor, skipping verses already sent; near
+        duplicates of recent verses are passed over (and left for later) unless nothing else is left.
+        """
         if year is None:
             year = self.get_current_year()
+        if not self.available_verses:
+            return None
         
-        unused_verses = self.get_unused_verses_for_year(year)
+        cursor = self.cursors.get(year)
+        if cursor is None or cursor.pool != self._pool:
+            # New year or changed pool: the bitmap still rules out anything already sent
+            cursor = SelectionCursor(cursor.cycle if cursor else 0, 0, self._pool)
+            with self._lock:
+                self.cursors[year] = cursor
         
-        if not unused_verses:
+        position = self._skip_sent(year, cursor)
+        if position == len(self.available_verses):
             # All verses have been used this year, reset for this year and start over
             logger.info(f"All verses have been used for year {year}, resetting history for this year")
+            with self._lock:
+                self.sent_verses_by_year.setdefault(year, VerseBitmap())
             self.reset_history_for_year(year)
-            unused_verses = self.available_verses
+            cursor = self.cursors[year]
+            position = 0
         
-        if unused_verses:
-            # Select a random verse from unused ones
-            import random
-            selected_verse = random.choice(unused_verses)
-            self.mark_verse_sent(selected_verse, year)
-            return selected_verse
+        order = permutation(len(self.available_verses), year, cursor.cycle, cursor.pool)
+        choice = self._first_distinct(year, order, position)
+        if choice == position:
+            position += 1
+        with self._lock:
+            self.cursors[year] = SelectionCursor(cursor.cycle, position, cursor.pool)
         
-        return None
+        selected_verse = self.available_verses[order[choice]]
+        self.mark_verse_sent(selected_verse, year)
+        return selected_verse
+    
+    def _is_sent(self, year: int, index: int) -> bool:
+        """Check whether any verse of an available entry was sent in a year."""
+        sent_verses = self.sent_verses_by_year.get(year)
+        return sent_verses is not None and any(map(sent_verses.has_ordinal, self._available_ordinals[index]))
+    
+    def _skip_sent(self, year: int, cursor: SelectionCursor) -> int:
+        """Get the first permutation position at or after the cursor whose entry is unsent."""
+        order = permutation(len(self.available_verses), year, cursor.cycle, cursor.pool)
+        position = cursor.position
+        while position < len(order) and self._is_sent(year, order[position]):
+            position += 1
+        return position
+    
+    def _first_distinct(self, year: int, order: Tuple[int, ...], position: int) -> int:
+        """Get the first unsent position from here that is not a near duplicate of a recent verse."""
+        if self.similarity is None or not self.recent_texts:
+            return position
+        
+        # One matrix product scores every candidate against the recent verses
+        allowed = self.similarity.allowed(self.recent_texts)
+        for candidate in range(position, len(order)):
+            if allowed[order[candidate]] and not self._is_sent(year, order[candidate]):
+                if candidate > position:
+                    logger.info("Passed over candidates similar to recent verses")
+                return candidate
+        logger.info("Every candidate is similar to a recent verse, ignoring similarity")
+        return position
     
     def get_stats(self, year: Optional[int] = None) -> dict:
         """Get statistics about verse usage for a specific year or all years."""
@@ -133,14 +430,17 @@ class VerseHistoryService:
             year = self.get_current_year()
         
         total_verses = len(self.available_verses)
-        used_verses = len(self.get_sent_verses_for_year(year))
-        unused_verses = total_verses - used_verses
+        # Passages cover several sent verse IDs, so count available entries rather than IDs
+        unused_verses = len(self.get_unused_verses_for_year(year))
+        used_verses = total_verses - unused_verses
         
         return {
             'year': year,
             'total_verses': total_verses,
             'used_verses': used_verses,
             'unused_verses': unused_verses,
+            # Distinct verses sent, counted by popcount of the year's bitmap
+            'sent_verse_ids': len(self.sent_verses_by_year.get(year, ())),
             'completion_percentage': (used_verses / total_verses * 100) if total_verses > 0 else 0
         }
     
@@ -160,13 +460,33 @@ class VerseHistoryService:
             if year < (current_year - keep_years):
                 years_to_remove.append(year)
         
-        for year in years_to_remove:
-            del self.sent_verses_by_year[year]
-            logger.info(f"Removed history for year {year}")
+        with self._lock:
+            for year in years_to_remove:
+                del self.sent_verses_by_year[year]
+                self.cursors.pop(year, None)
+                logger.info(f"Removed history for year {year}")
         
         if years_to_remove:
-            self.save_history()
+            operation = None
+            if self.database is not None:
+                database, before = self.database, current_year - keep_years
+                
+                def operation():
+                    database.delete_history(before=before)
+            
+            self._persist(operation=operation, compact=True)
+
+
+def _create_verse_history() -> VerseHistoryService:
+    """Create the shared history service, backed by the database when one is configured."""
+    settings = get_settings()
+    return VerseHistoryService(
+        database=get_database(settings.database_url, settings.database_pool_size),
+        similarity=create_similarity_filter(settings.similarity_threshold, settings.similarity_window),
+        compact_every=settings.history_compact_every,
+        write_delay=settings.history_write_delay
+    )
 
 
 # Global instance
-verse_history = VerseHistoryService() 
\ No newline at end of file
+verse_history = _create_verse_history() 
\ No newline at end of file
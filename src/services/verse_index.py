@@ -0,0 +1,105 @@
+"""
+Verse-count index for uniform random verse selection.
+Maps every verse in the canon to a dense ordinal so random picks are always valid.
+"""
+
+import random
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.models.bible_books import BOOKS_BY_KEY, VERSE_COUNTS, book_of, unpack_verse_id
+
+
+class VerseIndex:
+    """Cumulative per-chapter verse counts over a whole Bible."""
+
+    def __init__(self, verse_counts: Dict[str, Sequence[int]]):
+        self.verse_counts = {book: tuple(chapters) for book, chapters in verse_counts.items()}
+
+        # One entry per chapter: (book, chapter) and the ordinal of its first verse
+        self._chapters: List[Tuple[str, int]] = []
+        self._starts: List[int] = []
+        self._start_by_chapter: Dict[Tuple[str, int], int] = {}
+
+        total = 0
+        for book, chapters in self.verse_counts.items():
+            for chapter, count in enumerate(chapters, 1):
+                if count <= 0:
+                    continue
+                self._chapters.append((book, chapter))
+                self._starts.append(total)
+                self._start_by_chapter[(book, chapter)] = total
+                total += count
+        self.total = total
+
+    def __len__(self) -> int:
+        return self.total
+
+    def chapter_count(self, book: str) -> int:
+        """Get the number of chapters in a book (0 if unknown)."""
+        return len(self.verse_counts.get(book, ()))
+
+    def verse_count(self, book: str, chapter: int) -> int:
+        """Get the number of verses in a chapter (0 if unknown)."""
+        chapters = self.verse_counts.get(book, ())
+        if 1 <= chapter <= len(chapters):
+            return chapters[chapter - 1]
+        return 0
+
+    def contains(self, book: str, chapter: int, verse: int) -> bool:
+        """Check whether a reference exists in this index."""
+        return 1 <= verse <= self.verse_count(book, chapter)
+
+    def ordinal(self, book: str, chapter: int, verse: int) -> Optional[int]:
+        """
+        Get the dense ordinal (0-based position in canonical order) of a verse.
+
+        Returns:
+            Ordinal, or None if the verse does not exist
+        """
+        if not self.contains(book, chapter, verse):
+            return None
+        return self._start_by_chapter[(book, chapter)] + verse - 1
+
+    def locate(self, ordinal: int) -> Tuple[str, int, int]:
+        """
+        Get the (book, chapter, verse) at a dense ordinal.
+
+        Raises:
+            IndexError: If the ordinal is out of range
+        """
+        if not 0 <= ordinal < self.total:
+            raise IndexError(f"Verse ordinal {ordinal} out of range (0-{self.total - 1})")
+
+        position = bisect_right(self._starts, ordinal) - 1
+        book, chapter = self._chapters[position]
+        return book, chapter, ordinal - self._starts[position] + 1
+
+    def verse_id(self, ordinal: int) -> int:
+        """
+        Get the canonical verse ID at a dense ordinal.
+
+        Raises:
+            IndexError: If the ordinal is out of range
+            KeyError: If the verse's book is not in the canon
+        """
+        book, chapter, verse = self.locate(ordinal)
+        return BOOKS_BY_KEY[book].verse_id(chapter, verse)
+
+    def ordinal_of(self, verse_id: int) -> Optional[int]:
+        """Get the dense ordinal of a canonical verse ID (None if not in this index)."""
+        try:
+            book = book_of(verse_id).key
+        except KeyError:
+            return None
+        _, chapter, verse = unpack_verse_id(verse_id)
+        return self.ordinal(book, chapter, verse)
+
+    def random_reference(self, rng: Optional[random.Random] = None) -> Tuple[str, int, int]:
+        """Pick a verse uniformly at random over every verse in the index."""
+        rng = rng or random
+        return self.locate(rng.randrange(self.total))
+
+
+# Shipped index over the standard canon
+canonical_index = VerseIndex(VERSE_COUNTS)
@@ -0,0 +1,41 @@
+"""
+Non-repeating verse selection by walking a seeded permutation.
+
+Each year (and each cycle within it, after the pool is used up) the candidate pool is
+shuffled once with a seed derived from the year, the cycle and the pool's contents, so every
+process draws the same order. A persisted cursor marks how far the walk has got: every
+position before it has been sent, and each pick just advances it.
+"""
+
+import random
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+
+@dataclass
+class SelectionCursor:
+    """Progress through one year's permutation."""
+
+    cycle: int = 0
+    position: int = 0
+    # Fingerprint of the pool the permutation was drawn over (see pool_fingerprint)
+    pool: int = 0
+
+    def to_list(self) -> list:
+        """Compact form for JSON."""
+        return [self.cycle, self.position, self.pool]
+
+
+def pool_fingerprint(references: Iterable[str]) -> int:
+    """Fingerprint a candidate pool, so a changed pool gets a fresh permutation."""
+    return zlib.crc32("\n".join(references).encode('utf-8'))
+
+
+@lru_cache(maxsize=4)
+def permutation(size: int, year: int, cycle: int, pool: int) -> Tuple[int, ...]:
+    """Get the shuffled order of pool positions for a year and cycle (same in every process)."""
+    order = list(range(size))
+    random.Random(f"{year}/{cycle}/{pool}").shuffle(order)
+    return tuple(order)
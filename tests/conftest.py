@@ -0,0 +1,100 @@
+"""
+Shared test fixtures.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.history_journal import HistoryJournal
+from src.services.local_corpus import LocalCorpus
+from src.services.verse_history import verse_history
+
+
+SAMPLE_BOOKS = {
+    "john": {
+        3: {
+            16: "For God so loved the world, that he gave his only begotten Son, that whosoever believeth in him should not perish, but have everlasting life.",
+            17: "For God sent not his Son into the world to condemn the world; but that the world through him might be saved.",
+        },
+    },
+    "psalms": {
+        23: {
+            1: "The LORD is my shepherd; I shall not want.",
+            2: "He maketh me to lie down in green pastures: he leadeth me beside the still waters.",
+        },
+    },
+    "proverbs": {
+        3: {
+            5: "Trust in the LORD with all thine heart; and lean not unto thine own understanding.",
+            6: "In all thy ways acknowledge him, and he shall direct thy paths.",
+        },
+    },
+    "1corinthians": {
+        13: {
+            4: "Charity suffereth long, and is kind; charity envieth not; charity vaunteth not itself, is not puffed up,",
+        },
+    },
+}
+
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response."""
+
+    def __init__(self, status, payload=None, headers=None, delay=0):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+        self.delay = delay
+
+    async def json(self, content_type=None):
+        return self.payload
+
+    async def __aenter__(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class FakeSession:
+    """Minimal stand-in for an aiohttp session that serves canned responses by URL."""
+
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(url)
+        for suffix, response in self.routes.items():
+            if url.endswith(suffix):
+                return response
+        return FakeResponse(404)
+
+
+@pytest.fixture
+def network_enabled(monkeypatch):
+    """Allow remote providers (tests still only talk to a FakeSession)."""
+    monkeypatch.setenv("BIBLE_NETWORK_FALLBACK", "true")
+
+
+@pytest.fixture(autouse=True)
+def sample_corpus(tmp_path, monkeypatch):
+    """Provide a small offline KJV corpus so tests never need the network or write to data/."""
+    corpus_dir = tmp_path / "corpus"
+    corpus = LocalCorpus(str(corpus_dir))
+    corpus.write_version("en-kjv", SAMPLE_BOOKS)
+    monkeypatch.setenv("BIBLE_CORPUS_DIR", str(corpus_dir))
+    monkeypatch.setenv("BIBLE_NETWORK_FALLBACK", "false")
+    monkeypatch.setenv("RETRY_BASE_DELAY", "0.001")
+    monkeypatch.setenv("HTTP_CACHE_FILE", str(tmp_path / "http_cache.json"))
+    monkeypatch.setenv("DAILY_PLAN_DIR", str(tmp_path / "plans"))
+    monkeypatch.setenv("CHAT_HISTORY_DIR", str(tmp_path / "chat_history"))
+    # The shared history service was created at import; keep its writes out of data/
+    monkeypatch.setattr(verse_history, "history_file", tmp_path / "verse_history.json")
+    monkeypatch.setattr(verse_history, "journal", HistoryJournal(tmp_path / "verse_history.journal"))
+    yield corpus
+    # Write what the test left pending before the paths are restored
+    verse_history.writer.write_now()
@@ -5,7 +5,10 @@ Tests for the Bible API service.
 import pytest
 import asyncio
 from src.services.bible_api import BibleAPIService
-from src.models.verse import VerseRequest
+from src.models.verse import BiblePassage, VerseRequest
+from src.services.http_pool import http_pool
+from src.services.verse_index import canonical_index
+from tests.conftest import FakeResponse, FakeSession
 
 
 @pytest.mark.asyncio
@@ -19,7 +22,7 @@ async def test_get_random_verse():
         assert response.verse is not None
         assert response.verse.reference is not None
         assert response.verse.text is not None
-        assert response.verse.translation == "NIV"
+        assert response.verse.translation == "EN-KJV"  # NIV is served from the KJV corpus
 
 
 @pytest.mark.asyncio
@@ -41,4 +44,168 @@ async def test_get_daily_verse():
         response = await service.get_daily_verse()
         
         assert response.success is True
-        assert response.verse is not None 
\ No newline at end of file
+        assert response.verse is not None 
+
+@pytest.mark.asyncio
+async def test_chapter_fetch_fans_out_into_cache(network_enabled):
+    """Test a whole chapter is fetched once and neighbouring verses are served from cache."""
+    service = BibleAPIService()
+    service.session = FakeSession({
+        "/books/romans/chapters/8.json": FakeResponse(200, {"data": [
+            {"book": "Romans", "chapter": "8", "verse": "28", "text": "And we know that all things work together for good"},
+            {"book": "Romans", "chapter": "8", "verse": "29", "text": "For whom he did foreknow, he also did predestinate"},
+        ]}),
+    })
+
+    verse = await service._fetch_from_providers("Romans 8:28", "KJV")
+    passage = await service._fetch_from_providers("Romans 8:28-29", "KJV")
+
+    assert verse.text.startswith("And we know")
+    assert passage.text.endswith("he also did predestinate")
+    assert len(service.session.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_verses_are_not_requested_again(network_enabled):
+    """Test references the API doesn't have are negatively cached."""
+    service = BibleAPIService()
+    service.session = FakeSession({
+        "/books/jude/chapters/1.json": FakeResponse(200, {"data": [{"verse": "24", "text": "Now unto him that is able"}]}),
+    })
+
+    assert await service._fetch_from_providers("Jude 1:40", "KJV") is None
+    assert await service._fetch_from_providers("Jude 1:40", "KJV") is None
+    assert await service._fetch_from_providers("Obadiah 1:3", "KJV") is None
+    assert await service._fetch_from_providers("Obadiah 1:3", "KJV") is None
+
+    assert len(service.session.requests) == 2
+    assert service.response_cache.is_missing("en-kjv", "obadiah", 1, 3)
+
+
+def test_random_pick_gives_up_on_known_missing_references(monkeypatch):
+    """Test no reference is returned when every roll is known to be missing."""
+    service = BibleAPIService()
+    monkeypatch.setattr(service.response_cache, "is_missing", lambda *args: True)
+
+    assert service._pick_network_reference(canonical_index, "en-kjv") is None
+
+
+@pytest.mark.asyncio
+async def test_services_share_the_connection_pool():
+    """Test services reuse the application-scoped session instead of opening their own."""
+    session = await http_pool.start()
+    try:
+        async with BibleAPIService() as first, BibleAPIService() as second:
+            assert first.session is session
+            assert second.session is session
+        assert not session.closed
+    finally:
+        await http_pool.close()
+
+    assert session.closed
+    assert BibleAPIService().session is None
+
+
+@pytest.mark.asyncio
+async def test_hedged_fetch_returns_first_success(monkeypatch):
+    """Test hedging launches backup candidates and cancels the slow ones."""
+    monkeypatch.setenv("RANDOM_VERSE_HEDGE_DELAY", "0.01")
+    service = BibleAPIService()
+    cancelled = []
+
+    async def fake_fetch(reference, translation="NIV"):
+        try:
+            if reference == "slow":
+                await asyncio.sleep(5)
+            if reference == "missing":
+                return None
+            return reference
+        except asyncio.CancelledError:
+            cancelled.append(reference)
+            raise
+
+    service._fetch_from_providers = fake_fetch
+
+    result = await asyncio.wait_for(service._fetch_hedged(["slow", "missing", "fast"], "KJV"), timeout=1)
+    await asyncio.sleep(0)
+
+    assert result == "fast"
+    assert cancelled == ["slow"]
+    assert await service._fetch_hedged(["missing", "missing"], "KJV") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced(network_enabled):
+    """Test concurrent lookups in the same chapter share one HTTP request."""
+    service = BibleAPIService()
+    service.session = FakeSession({
+        "/books/galatians/chapters/5.json": FakeResponse(200, {"data": [
+            {"verse": "22", "text": "But the fruit of the Spirit is love, joy, peace,"},
+            {"verse": "23", "text": "Meekness, temperance: against such there is no law."},
+        ]}, delay=0.05),
+    })
+
+    results = await asyncio.gather(
+        service._fetch_from_providers("Galatians 5:22", "KJV"),
+        service._fetch_from_providers("Galatians 5:22", "KJV"),
+        service._fetch_from_providers("Galatians 5:22-23", "KJV"),
+    )
+
+    assert all(results)
+    assert len(service.session.requests) == 1
+    assert service.get_stats()["single_flight"]["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_passage_spanning_chapters_is_fetched_concurrently(network_enabled):
+    """Test a range request fetches each chapter once, in parallel, and assembles a passage."""
+    service = BibleAPIService()
+    service.session = FakeSession({
+        "/books/ruth/chapters/1.json": FakeResponse(200, {"data": [
+            {"verse": "22", "text": "So Naomi returned,"},
+        ]}, delay=0.05),
+        "/books/ruth/chapters/2.json": FakeResponse(200, {"data": [
+            {"verse": "1", "text": "And Naomi had a kinsman"},
+        ]}, delay=0.05),
+    })
+
+    started = asyncio.get_running_loop().time()
+    response = await service.get_verse(
+        VerseRequest(book="Ruth", chapter=1, verse=22, end_chapter=2, end_verse=1, translation="KJV")
+    )
+
+    assert asyncio.get_running_loop().time() - started < 0.1
+    passage = response.verse
+    assert isinstance(passage, BiblePassage)
+    assert passage.reference == "Ruth 1:22-2:1"
+    assert passage.text == "So Naomi returned, And Naomi had a kinsman"
+    assert [(verse.chapter, verse.verse) for verse in passage.verses] == [(1, 22), (2, 1)]
+    assert (passage.end_chapter, passage.end_verse) == (2, 1)
+    assert len(service.session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_verses_outside_the_chapter_are_rejected():
+    """Test verse numbers past the end of the chapter are invalid rather than packed into another verse."""
+    service = BibleAPIService()
+    for request in (
+        VerseRequest(book="John", chapter=3, verse=300),
+        VerseRequest(book="John", chapter=3, verse=37),
+        VerseRequest(book="John", chapter=3, verse=16, end_verse=300),
+        VerseRequest(book="Ruth", chapter=1, verse=22, end_chapter=2, end_verse=24),
+    ):
+        response = await service.get_verse(request)
+        assert response.success is False
+        assert response.error.startswith("Invalid passage")
+
+
+def test_fallback_ranges_are_passages():
+    """Test built-in fallback ranges keep their last verse."""
+    service = BibleAPIService()
+    proverbs = next(
+        service._make_fallback_verse(data) for data in service.fallback_verses
+        if data["reference"] == "Proverbs 3:5-6"
+    )
+
+    assert isinstance(proverbs, BiblePassage)
+    assert (proverbs.verse, proverbs.end_verse) == (5, 6)
@@ -0,0 +1,71 @@
+"""
+Tests for per-chat verse history.
+"""
+
+from datetime import date
+
+import pytest
+
+from src.bot.telegram_bot import BibleVerseBot
+from src.models.bible_books import verse_id_for
+from src.models.verse import BibleVerse, VerseResponse
+from src.services.chat_history import ChatHistory
+
+JOHN_3_16 = verse_id_for("john", 3, 16)
+PSALM_23_1 = verse_id_for("psalms", 23, 1)
+
+
+def test_bulk_updates_and_widening(tmp_path):
+    """Test one send marks many chats, rows widen as chats arrive, and history survives reopening."""
+    history = ChatHistory(str(tmp_path))
+    history.mark_sent(2025, [JOHN_3_16], ["a", "b"])
+    assert history.unsent_chats(2025, [JOHN_3_16], ["a", "b", "c"]) == ["c"]
+
+    late_chats = [f"chat{number}" for number in range(200)]
+    history.mark_sent(2025, [PSALM_23_1], late_chats + ["a"])
+    assert history._year(2025).capacity >= 202
+
+    reopened = ChatHistory(str(tmp_path))
+    assert reopened.was_sent(2025, JOHN_3_16, "b")
+    assert not reopened.was_sent(2025, JOHN_3_16, "chat5")
+    assert (reopened.sent_count(2025, "a"), reopened.sent_count(2025, "chat199"), reopened.sent_count(2025, "x")) == (2, 1, 0)
+    assert reopened.unsent_chats(2026, [JOHN_3_16], ["a"]) == ["a"]
+
+    reopened.cleanup(before=2026)
+    assert reopened.years() == []
+
+
+class FakeBot:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.messages.append((chat_id, text))
+
+
+@pytest.mark.asyncio
+async def test_daily_verse_skips_each_chats_own_repeats(monkeypatch):
+    """Test chats that already got the daily verse receive a different one, in one bulk update per verse."""
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "123:test")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "1")
+    monkeypatch.setenv("TELEGRAM_CHAT_IDS", "2,3")
+    bot = BibleVerseBot()
+    bot.bot = FakeBot()
+    john = BibleVerse(reference="John 3:16", text="For God so loved the world", translation="KJV",
+                      book="John", chapter=3, verse=16)
+    psalm = BibleVerse(reference="Psalms 23:1", text="The LORD is my shepherd", translation="KJV",
+                       book="Psalms", chapter=23, verse=1)
+
+    async def daily_verse():
+        return VerseResponse(success=True, verse=john)
+
+    async def get_verse(request):
+        return VerseResponse(success=True, verse=psalm)
+
+    monkeypatch.setattr(bot.bible_service, "get_daily_verse", daily_verse)
+    monkeypatch.setattr(bot.bible_service, "get_verse", get_verse)
+    bot.chat_history.mark_sent(date.today().year, [JOHN_3_16], ["2"])
+
+    assert await bot.send_daily_verse()
+    received = {chat_id: "shepherd" in text for chat_id, text in bot.bot.messages}
+    assert received == {"1": False, "2": True, "3": False}
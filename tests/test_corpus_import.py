@@ -0,0 +1,130 @@
+"""
+Tests for incremental corpus imports.
+"""
+
+import json
+
+import aiohttp
+import pytest
+
+from src.services.corpus_import import CorpusImporter, parse_usfm
+from src.services.local_corpus import LocalCorpus
+from tests.conftest import FakeResponse, FakeSession
+
+JUDE_USFM = r"""\id JUD Sample translation
+\h Jude
+\mt1 The General Epistle of Jude
+\c 1
+\s1 Greeting
+\p
+\v 1 \w Jude|strong="G2455"\w*, the servant of Jesus Christ,\f + \fr 1:1 \ft a footnote\f*
+and brother of James,
+\v 2 Mercy unto you, and \add peace\add*, and love, be multiplied.
+\v 3-4 Beloved, when I gave all diligence\x - \xo 1:3 \xt Tit 1:4\x* to write unto you.
+"""
+
+
+def write_usfm(directory, name, text):
+    directory.mkdir(exist_ok=True)
+    (directory / name).write_text(text, encoding="utf-8")
+
+
+def test_parse_usfm():
+    """Test USFM markup, notes and headings are stripped from verse text."""
+    book, chapters = parse_usfm(JUDE_USFM)
+
+    assert book == "jude"
+    assert chapters == {1: {
+        1: "Jude, the servant of Jesus Christ, and brother of James,",
+        2: "Mercy unto you, and peace, and love, be multiplied.",
+        3: "Beloved, when I gave all diligence to write unto you.",
+    }}
+
+
+def test_usfm_import_is_incremental(tmp_path):
+    """Test unchanged books are skipped and changed ones re-parsed, keeping the rest."""
+    corpus = LocalCorpus(str(tmp_path / "corpus"))
+    importer = CorpusImporter(corpus, workers=2)
+    sources = tmp_path / "usfm"
+    write_usfm(sources, "65-JUD.usfm", JUDE_USFM)
+    write_usfm(sources, "57-PHM.usfm", "\\id PHM\n\\c 1\n\\v 1 Paul, a prisoner of Jesus Christ.\n")
+
+    first = importer.import_usfm("en-test", [str(sources)])
+    assert (first.books, first.skipped, first.verses, first.written) == (2, 0, 4, True)
+    assert corpus.get_text("en-test", "philemon", 1, 1) == "Paul, a prisoner of Jesus Christ."
+
+    second = importer.import_usfm("en-test", [str(sources)])
+    assert (second.books, second.skipped, second.written) == (0, 2, False)
+    assert "already up to date" in second.summary()
+
+    write_usfm(sources, "57-PHM.usfm", "\\id PHM\n\\c 1\n\\v 1 Paul, a prisoner.\n")
+    third = importer.import_usfm("en-test", [str(sources)])
+    assert (third.books, third.skipped, third.written) == (1, 1, True)
+    assert corpus.get_text("en-test", "philemon", 1, 1) == "Paul, a prisoner."
+    assert corpus.get_text("en-test", "jude", 1, 2).startswith("Mercy unto you")
+
+
+def test_json_import(tmp_path):
+    """Test JSON dumps are checksummed per book."""
+    corpus = LocalCorpus(str(tmp_path / "corpus"))
+    importer = CorpusImporter(corpus)
+    dump = tmp_path / "dump.json"
+    dump.write_text(json.dumps({"John": {"11": {"35": "Jesus wept."}}}))
+
+    assert importer.import_json("en-test", str(dump)).written
+    assert not importer.import_json("en-test", str(dump)).written
+    assert corpus.get_text("en-test", "john", 11, 35) == "Jesus wept."
+    assert json.loads(importer.manifest_path("en-test").read_text())['books'].keys() == {"john"}
+
+
+@pytest.mark.asyncio
+async def test_api_import_skips_imported_books(tmp_path):
+    """Test API imports only download books missing from the last import unless refreshing."""
+    corpus = LocalCorpus(str(tmp_path / "corpus"))
+    importer = CorpusImporter(corpus)
+    session = FakeSession({
+        "/books/jude/chapters/1.json": FakeResponse(200, {"data": [{"verse": "1", "text": "Jude, the servant"}]}),
+    })
+
+    first = await importer.import_api(session, "en-test", "https://example.test")
+    assert first.books == 1 and corpus.get_text("en-test", "jude", 1, 1) == "Jude, the servant"
+    requests = len(session.requests)
+
+    second = await importer.import_api(session, "en-test", "https://example.test")
+    assert len(session.requests) - requests == 1188
+    assert (second.books, second.written) == (0, False)
+
+    refreshed = await importer.import_api(session, "en-test", "https://example.test", refresh=True)
+    assert (refreshed.skipped, refreshed.written) == (1, False)
+
+
+class FailingResponse(FakeResponse):
+    """Response whose request fails with a network error."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    async def __aenter__(self):
+        raise aiohttp.ClientConnectionError("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_api_import_retries_incomplete_books(tmp_path):
+    """Test a book with a failed chapter is left out of the manifest and fetched again next run."""
+    corpus = LocalCorpus(str(tmp_path / "corpus"))
+    importer = CorpusImporter(corpus)
+    routes = {
+        f"/books/ruth/chapters/{chapter}.json": FakeResponse(200, {"data": [{"verse": "1", "text": f"Ruth {chapter}"}]})
+        for chapter in range(1, 5)
+    }
+    routes["/books/ruth/chapters/4.json"] = FailingResponse()
+    routes["/books/jude/chapters/1.json"] = FakeResponse(200, {"data": [{"verse": "1", "text": "Jude, the servant"}]})
+
+    first = await importer.import_api(FakeSession(routes), "en-test", "https://example.test")
+    # The network error did not abort the other downloads
+    assert corpus.get_text("en-test", "jude", 1, 1) == "Jude, the servant"
+    assert "ruth" not in importer.load_manifest("en-test") and first.incomplete > 0
+
+    routes["/books/ruth/chapters/4.json"] = FakeResponse(200, {"data": [{"verse": "1", "text": "Ruth 4"}]})
+    second = await importer.import_api(FakeSession(routes), "en-test", "https://example.test")
+    assert second.books == 1 and corpus.get_text("en-test", "ruth", 4, 1) == "Ruth 4"
@@ -0,0 +1,75 @@
+"""
+Tests for precomputed daily verse plans.
+"""
+
+from datetime import date
+
+import pytest
+
+from src.models.bible_books import expand_range, verse_id_for
+from src.services.bible_api import BibleAPIService
+from src.services.daily_plan import DailyPlan, DailyPlanner, generate_plan
+from src.services.reference_parser import VerseRange
+from src.services.similarity import SimilarityFilter
+
+
+def test_plan_covers_year_without_repeats():
+    """Test a plan has one entry per day, never repeats a verse and is reproducible."""
+    plan = generate_plan(2028, themes=["hope", "love"])
+
+    assert len(plan) == 366
+    planned = [verse_id for verse_range in plan.ranges for verse_id in expand_range(*verse_range)]
+    assert len(planned) == len(set(planned))
+    assert plan.ranges == generate_plan(2028, themes=["hope", "love"]).ranges
+    assert plan.ranges != generate_plan(2029, themes=["hope", "love"]).ranges[:365]
+
+    entry = plan.entry(date(2028, 1, 7))
+    assert entry.translation == "ASV"
+    with pytest.raises(ValueError):
+        plan.entry(date(2027, 12, 31))
+
+
+def test_plan_passes_over_near_duplicates_of_previous_days():
+    """Test consecutive days never get near-identical texts when a similarity filter is given."""
+    def text_of(verse_range):
+        if verse_range.start % 2 == 0:
+            return "For God so loved the world that he gave his only begotten Son"
+        return f"distinct{verse_range.start} words{verse_range.start}"
+
+    plan = generate_plan(2028, similarity=SimilarityFilter(threshold=0.6, window=1), text_of=text_of)
+    duplicates = [verse_range.start % 2 == 0 for verse_range in plan.ranges]
+    assert not any(first and second for first, second in zip(duplicates, duplicates[1:]))
+    assert plan.similarity == [0.6, 1]
+    # Without the filter the same texts do land on consecutive days
+    unchecked = [verse_range.start % 2 == 0 for verse_range in generate_plan(2028).ranges]
+    assert any(first and second for first, second in zip(unchecked, unchecked[1:]))
+
+
+def test_planner_saves_and_regenerates_on_changed_settings(tmp_path):
+    """Test plans round-trip through their file and are rebuilt when the themes change."""
+    planner = DailyPlanner(str(tmp_path), themes=["peace"])
+    plan = planner.get_plan(2027)
+    assert planner.path_for(2027).stat().st_size < 4096
+
+    loaded = DailyPlan.load(planner.path_for(2027))
+    assert (loaded.ranges, loaded.translation_indexes, loaded.themes) == (plan.ranges, plan.translation_indexes, ["peace"])
+
+    rethemed = DailyPlanner(str(tmp_path), themes=["joy"]).get_plan(2027)
+    assert rethemed.themes == ["joy"]
+    assert DailyPlan.load(planner.path_for(2027)).themes == ["joy"]
+
+
+@pytest.mark.asyncio
+async def test_daily_verse_follows_plan():
+    """Test the daily verse is today's planned verse."""
+    service = BibleAPIService()
+    today = date.today()
+    plan = generate_plan(today.year)
+    plan.ranges[today.timetuple().tm_yday - 1] = VerseRange(*[verse_id_for("psalms", 23, 1)] * 2)
+    plan.translation_indexes = [0] * len(plan)
+    service.daily_planner._plans[today.year] = plan
+
+    response = await service.get_daily_verse()
+    assert response.success
+    assert response.verse.reference == "Psalms 23:1"
+    assert response.verse.text == "The LORD is my shepherd; I shall not want."
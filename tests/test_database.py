@@ -0,0 +1,121 @@
+"""
+Tests for the SQLite storage backend.
+"""
+
+import pytest
+
+from src.models.bible_books import verse_id_for
+from src.models.verse import BibleVerse, VerseRequest
+from src.services.bible_api import BibleAPIService
+from src.services.database import Database, fts_query, sqlite_path
+from src.services.verse_history import VerseHistoryService
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(tmp_path / "bible_bot.db", pool_size=2)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'bible_bot.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    return url
+
+
+def test_urls_and_queries():
+    """Test DATABASE_URL parsing and query translation to FTS5 syntax."""
+    assert str(sqlite_path("sqlite:///data/bible_bot.db")) == "data/bible_bot.db"
+    assert str(sqlite_path("sqlite:////var/lib/bot.db")) == "/var/lib/bot.db"
+    with pytest.raises(ValueError):
+        sqlite_path("postgresql://localhost/bot")
+
+    assert fts_query("love world") == '"love" OR "world"'
+    assert fts_query('"green pastures" still') == '"green pastures" AND ("still")'
+    assert fts_query('NEAR( "') == '"NEAR"'
+    assert fts_query('" ,') is None
+
+
+def test_verses_and_search(database):
+    """Test WAL mode, point/range lookups and ranked full-text search."""
+    john = verse_id_for("john", 3, 16)
+    database.import_version("en-kjv", [
+        (john, "For God so loved the world"),
+        (john + 1, "For God sent not his Son into the world to condemn the world"),
+        (verse_id_for("psalms", 23, 2), "He maketh me to lie down in green pastures"),
+    ])
+
+    with database.pool.connection() as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert database.has_version("en-kjv") and not database.has_version("en-asv")
+    assert database.get_text("en-kjv", john) == "For God so loved the world"
+    assert list(database.get_range("en-kjv", john, john + 10)) == [john, john + 1]
+
+    assert [row[0] for row in database.search("en-kjv", "world")] == [john + 1, john]
+    assert [row[0] for row in database.search("en-kjv", "loving")] == [john]
+    assert [row[0] for row in database.search("en-kjv", '"green pastures"')] == [verse_id_for("psalms", 23, 2)]
+    assert database.search("en-kjv", '"pastures green"') == []
+
+    # Re-importing replaces the version, index included
+    database.import_version("en-kjv", [(john, "Jesus wept")])
+    assert database.search("en-kjv", "world") == []
+    assert database.get_text("en-kjv", john + 1) is None
+
+
+def test_history_and_chats(database):
+    """Test history rows per year and chat bookkeeping."""
+    database.mark_sent(2024, [1, 2])
+    database.mark_sent(2025, [3, 2])
+    database.mark_sent(2025, [9], chat_id="42")
+
+    assert database.load_history() == {2024: {1, 2}, 2025: {2, 3}}
+    assert database.sent_verse_ids(2025, chat_id="42") == {9}
+    assert database.was_sent(2025, 3) and not database.was_sent(2025, 9)
+
+    database.delete_history(before=2025)
+    assert database.history_years() == [2025]
+
+    database.upsert_chat("42", "Group")
+    database.record_chat_sends(["42"])
+    database.deactivate_chat("42")
+    assert database.get_chats() == []
+    [chat] = database.get_chats(active_only=False)
+    assert chat['title'] == "Group" and chat['last_sent_at']
+
+
+def test_verse_history_imports_file_into_database(tmp_path, database):
+    """Test the history service writes to the database and carries over an existing file."""
+    history_file = tmp_path / "history.json"
+    file_history = VerseHistoryService(str(history_file))
+    file_history.mark_verse_sent(BibleVerse(reference="John 3:16", text="...", translation="KJV",
+                                            book="John", chapter=3, verse=16), 2025)
+
+    history = VerseHistoryService(str(history_file), database=database)
+    assert database.sent_verse_ids(2025) == {verse_id_for("john", 3, 16)}
+
+    history.set_available_verses([BibleVerse(reference="Psalm 23:1", text="...", translation="KJV",
+                                             book="Psalm", chapter=23, verse=1)])
+    history.get_next_verse(2025)
+    assert database.load_cursors() == {2025: (0, 1, history.cursors[2025].pool)}
+
+    history.reset_history_for_year(2025)
+    assert database.load_history() == {}
+    assert database.load_cursors()[2025][:2] == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_service_uses_database(database_url, sample_corpus):
+    """Test imported verses are served and searched through the database."""
+    service = BibleAPIService()
+    assert service.store_in_database("en-kjv") == 7
+    assert [p.name for p in service.provider_registry.providers][:2] == ["database", "local"]
+
+    response = await service.get_verse(VerseRequest(reference="Psalm 23:1-2", translation="KJV"))
+    assert response.success
+    assert response.verse.text.startswith("The LORD is my shepherd")
+    assert service.get_stats()['providers']['database']['requests'] == 1
+
+    [result] = service.search('"still waters"', translation="KJV")
+    assert result.reference == "Psalms 23:2"
@@ -0,0 +1,71 @@
+"""
+Tests for the local Bible corpus.
+"""
+
+import json
+
+from src.services.local_corpus import LocalCorpus, PackedVersion, parse_chapter_payload
+from src.services.verse_index import canonical_index
+
+
+def test_lookup_from_disk(sample_corpus):
+    """Test that a fresh instance reads verses back from the store."""
+    corpus = LocalCorpus(str(sample_corpus.corpus_dir))
+
+    assert corpus.has_version("en-kjv")
+    assert corpus.get_text("en-kjv", "john", 3, 16).startswith("For God so loved")
+    assert corpus.get_text("en-kjv", "john", 3, 99) is None
+    assert corpus.get_text("en-kjv", "genesis", 1, 1) is None
+    assert sorted(corpus.get_chapter("en-kjv", "proverbs", 3)) == [5, 6]
+
+
+def test_packed_layout(sample_corpus):
+    """Test that ordinals follow canonical order and gaps are stored as empty slices."""
+    packed = PackedVersion(sample_corpus.path_for("en-kjv"))
+    try:
+        assert list(packed.index.verse_counts)[:2] == ["psalms", "proverbs"]
+        ordinal = packed.index.ordinal("proverbs", 3, 5)
+        assert packed.text_at(ordinal).startswith("Trust in the LORD")
+        assert packed.text_at(packed.index.ordinal("proverbs", 3, 1)) is None
+    finally:
+        packed.close()
+
+
+def test_rewrite_while_mapped(tmp_path):
+    """Test that rewriting a mapped version serves the new text and keeps canonical ordinals."""
+    corpus = LocalCorpus(str(tmp_path / "rewritten"))
+    corpus.write_version("en-test", {"john": {3: {16: "old"}}})
+    assert corpus.get_text("en-test", "john", 3, 16) == "old"
+
+    books = {book: {c: {v: f"{book} {c}:{v} ✝" for v in range(1, n + 1)} for c, n in enumerate(counts, 1)}
+             for book, counts in canonical_index.verse_counts.items()}
+    corpus.write_version("en-test", books)
+
+    assert corpus.get_text("en-test", "john", 3, 16) == "john 3:16 ✝"
+    assert corpus.verse_index("en-test").ordinal("john", 3, 16) == canonical_index.ordinal("john", 3, 16)
+    assert len(corpus.get_chapter("en-test", "psalms", 119)) == 176
+    corpus.close()
+
+
+def test_import_from_json(tmp_path):
+    """Test importing a flat list of verse records."""
+    source = tmp_path / "dump.json"
+    source.write_text(json.dumps([
+        {"book": "1 John", "chapter": 4, "verse": 8, "text": "God is love."},
+    ]))
+    corpus = LocalCorpus(str(tmp_path / "imported"))
+    corpus.import_from_json("en-test", str(source))
+
+    assert corpus.available_versions() == ["en-test"]
+    assert corpus.get_text("en-test", "1john", 4, 8) == "God is love."
+
+
+def test_parse_chapter_payload():
+    """Test parsing a wldeh/bible-api chapter payload."""
+    payload = {"data": [
+        {"book": "John", "chapter": "3", "verse": "16", "text": "For God so loved the world "},
+        {"book": "John", "chapter": "3", "verse": "16", "text": "duplicate"},
+        {"book": "John", "chapter": "3", "verse": "17", "text": ""},
+    ]}
+
+    assert parse_chapter_payload(payload) == {16: "For God so loved the world"}
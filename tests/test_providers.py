@@ -0,0 +1,126 @@
+"""
+Tests for Bible providers and latency-aware routing.
+"""
+
+import pytest
+
+from src.services.bible_api import BibleAPIService
+from src.services.providers import (
+    BibleProvider, LocalCorpusProvider, ProviderError, ProviderRegistry, ProviderResponse
+)
+
+
+class StubProvider(BibleProvider):
+    """Provider that returns a fixed verse or fails on demand."""
+
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self, session, version, book, chapter, verse=None, headers=None, timeout=None):
+        self.calls += 1
+        if self.fail:
+            raise ProviderError(f"{self.name} is down")
+        return ProviderResponse(200, {16: f"text from {self.name}"})
+
+
+def test_routing_prefers_low_latency_and_low_errors():
+    """Test healthier providers rank first within a tier."""
+    registry = ProviderRegistry()
+    slow, fast = StubProvider("slow"), StubProvider("fast")
+    registry.register(slow)
+    registry.register(fast)
+
+    registry.record_success(slow, 0.500)
+    registry.record_success(fast, 0.050)
+    assert [p.name for p in registry.ranked("en-kjv")] == ["fast", "slow"]
+
+    registry.record_failure(fast, 2.0)
+    assert [p.name for p in registry.ranked("en-kjv")] == ["slow", "fast"]
+
+
+def test_circuit_breaker_ejects_failing_provider():
+    """Test a provider is skipped after repeated failures until its cool-down ends."""
+    registry = ProviderRegistry(failure_threshold=2, cooldown=60)
+    flaky = StubProvider("flaky")
+    registry.register(flaky)
+
+    registry.record_failure(flaky, 0.1)
+    assert registry.ranked("en-kjv") == [flaky]
+    registry.record_failure(flaky, 0.1)
+    assert registry.ranked("en-kjv") == []
+    assert registry.get_stats()["flaky"]["circuit_open"] is True
+
+    registry.health["flaky"].open_until = 0
+    registry.record_success(flaky, 0.1)
+    assert registry.ranked("en-kjv") == [flaky]
+
+
+def test_circuit_half_opens_for_one_trial_after_cool_down():
+    """Test an ejected provider gets one trial request and is only readmitted if it succeeds."""
+    registry = ProviderRegistry(failure_threshold=2, cooldown=60)
+    flaky = StubProvider("flaky")
+    registry.register(flaky)
+    registry.record_failure(flaky, 0.1)
+    registry.record_failure(flaky, 0.1)
+
+    # Cool-down over: one trial goes through, concurrent requests still skip the provider
+    registry.health["flaky"].open_until -= 61
+    assert registry.get_stats()["flaky"]["circuit_half_open"] is True
+    assert registry.ranked("en-kjv") == [flaky]
+    assert registry.ranked("en-kjv") == []
+
+    # A failed trial reopens the circuit at once
+    registry.record_failure(flaky, 0.1)
+    assert registry.get_stats()["flaky"]["circuit_open"] is True
+
+    registry.health["flaky"].open_until -= 61
+    assert registry.ranked("en-kjv") == [flaky]
+    registry.record_success(flaky, 0.1)
+    assert registry.health["flaky"].consecutive_failures == 0
+    # Closed again: a single failure no longer ejects it
+    registry.record_failure(flaky, 0.1)
+    assert registry.ranked("en-kjv") == [flaky]
+
+
+def test_failure_latency_is_averaged():
+    """Test one slow failure moves the latency average rather than replacing it."""
+    registry = ProviderRegistry(alpha=0.5)
+    provider = StubProvider("api")
+    registry.register(provider)
+
+    registry.record_success(provider, 0.1)
+    registry.record_failure(provider, 0.9)
+    assert registry.health["api"].latency == pytest.approx(0.5)
+    registry.record_success(provider, 0.1)
+    assert registry.health["api"].latency == pytest.approx(0.3)
+
+
+def test_local_provider_is_always_tried_first(sample_corpus):
+    """Test the local corpus outranks remote providers for imported versions only."""
+    registry = ProviderRegistry()
+    remote = StubProvider("remote")
+    registry.register(remote)
+    registry.register(LocalCorpusProvider(sample_corpus))
+    registry.record_success(remote, 0.001)
+
+    assert [p.name for p in registry.ranked("en-kjv")] == ["local", "remote"]
+    assert [p.name for p in registry.ranked("en-web")] == ["remote"]
+    assert [p.name for p in registry.ranked("en-kjv", include_remote=False)] == ["local"]
+
+
+@pytest.mark.asyncio
+async def test_service_fails_over_to_next_provider(network_enabled):
+    """Test a failing provider is skipped and its failure recorded."""
+    service = BibleAPIService()
+    down, up = StubProvider("down", fail=True), StubProvider("up")
+    service.provider_registry = ProviderRegistry()
+    service.provider_registry.register(down)
+    service.provider_registry.register(up)
+
+    verse = await service._fetch_from_providers("John 5:16", "KJV")
+
+    assert verse.text == "text from up"
+    assert verse.source == "up"
+    assert service.get_stats()["providers"]["down"]["failures"] == 1
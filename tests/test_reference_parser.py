@@ -0,0 +1,48 @@
+"""
+Tests for the Bible reference parser.
+"""
+
+import pytest
+
+from src.models.bible_books import format_reference, verse_id_for
+from src.services.reference_parser import ReferenceParseError, parse_reference, parse_references, resolve_book
+
+
+def spans(text):
+    return [(format_reference(r.start), format_reference(r.end)) for r in parse_references(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("John 3:16", [("John 3:16", "John 3:16")]),
+    ("Jn 3:16", [("John 3:16", "John 3:16")]),
+    ("Song of Solomon 2:1", [("Song of Solomon 2:1", "Song of Solomon 2:1")]),
+    ("1 Corinthians 13:4-7", [("1 Corinthians 13:4", "1 Corinthians 13:7")]),
+    ("1Cor 13:4–7", [("1 Corinthians 13:4", "1 Corinthians 13:7")]),
+    ("II Kings 2:11", [("2 Kings 2:11", "2 Kings 2:11")]),
+    ("John 3:16-4:2", [("John 3:16", "John 4:2")]),
+    ("John 3", [("John 3:1", "John 3:36")]),
+    ("Ps 1-2", [("Psalms 1:1", "Psalms 2:12")]),
+    ("Jude 3", [("Jude 1:3", "Jude 1:3")]),
+    ("Rom 8:28; 12:1-2", [("Romans 8:28", "Romans 8:28"), ("Romans 12:1", "Romans 12:2")]),
+    ("John 3:16, 18; 1 Jn 4:8", [("John 3:16", "John 3:16"), ("John 3:18", "John 3:18"), ("1 John 4:8", "1 John 4:8")]),
+])
+def test_parses_references(text, expected):
+    """Test book spellings, ranges and lists resolve to canonical verse-ID ranges."""
+    assert spans(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "John", "Hezekiah 1:1", "John 22:1", "John 3:18-16", "Ph 1:1", "3:16", "John 3:16 blah"])
+def test_rejects_invalid_references(text):
+    """Test unknown books, impossible chapters and reversed ranges are errors."""
+    with pytest.raises(ReferenceParseError):
+        parse_references(text)
+    assert parse_reference(text) is None
+
+
+def test_unique_prefixes_resolve():
+    """Test unambiguous abbreviations match by prefix, and ambiguous ones don't."""
+    assert resolve_book("Zeph").key == "zephaniah"
+    assert resolve_book("Philem.").key == "philemon"
+    assert resolve_book("Phil").key == "philippians"
+    assert resolve_book("J") is None
+    assert parse_reference("Proverbs 3:5-6").start == verse_id_for("proverbs", 3, 5)
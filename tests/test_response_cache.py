@@ -0,0 +1,112 @@
+"""
+Tests for the persistent Bible API response cache.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.services.response_cache import ResponseCache
+
+
+def test_persists_across_instances(tmp_path):
+    """Test cached responses survive a restart."""
+    cache_file = tmp_path / "cache.json"
+    cache = ResponseCache(str(cache_file))
+    cache.put("en-kjv", "john", 3, 16, "For God so loved the world", etag='"abc"')
+    cache.save()
+
+    reloaded = ResponseCache(str(cache_file))
+    entry = reloaded.get("en-kjv", "john", 3, 16)
+
+    assert entry["text"] == "For God so loved the world"
+    assert reloaded.validators(entry) == {"If-None-Match": '"abc"'}
+    assert reloaded.get("en-kjv", "john", 3, 17) is None
+    assert reloaded.get_stats()["hits"] == 1
+    assert reloaded.get_stats()["misses"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    """Test the least recently used entry is evicted first."""
+    cache = ResponseCache(str(tmp_path / "cache.json"), max_entries=2)
+    cache.put("en-kjv", "john", 3, 16, "a")
+    cache.put("en-kjv", "john", 3, 17, "b")
+    cache.get("en-kjv", "john", 3, 16)
+    cache.put("en-kjv", "john", 3, 18, "c")
+
+    assert cache.get("en-kjv", "john", 3, 17) is None
+    assert cache.get("en-kjv", "john", 3, 16) is not None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entries_need_revalidation(tmp_path):
+    """Test entries older than max_age are not fresh until revalidated."""
+    cache = ResponseCache(str(tmp_path / "cache.json"), max_age=0)
+    cache.put("en-kjv", "john", 3, 16, "a", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = cache.get("en-kjv", "john", 3, 16)
+
+    assert not cache.is_fresh(entry)
+    assert cache.validators(entry) == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    cache.mark_revalidated("en-kjv", "john", 3, 16)
+    assert cache.get_stats()["revalidations"] == 1
+
+
+def test_missing_references_persist_and_expire(tmp_path):
+    """Test known-missing references are saved alongside responses and expire after the TTL."""
+    cache_file = tmp_path / "cache.json"
+    cache = ResponseCache(str(cache_file), missing_ttl=3600)
+    cache.mark_missing("en-kjv", "john", 3, 99)
+    cache.save()
+
+    reloaded = ResponseCache(str(cache_file))
+    assert reloaded.is_missing("en-kjv", "john", 3, 99)
+    assert not reloaded.is_missing("en-kjv", "john", 3, 16)
+
+    expired = ResponseCache(str(tmp_path / "other.json"), missing_ttl=0)
+    expired.mark_missing("en-kjv", "john", 3, 99)
+    assert not expired.is_missing("en-kjv", "john", 3, 99)
+
+
+def test_missing_entries_are_bounded(tmp_path):
+    """Test the negative cache drops its oldest entries when full."""
+    cache = ResponseCache(str(tmp_path / "cache.json"), max_missing=2)
+    for verse in (97, 98, 99):
+        cache.mark_missing("en-kjv", "john", 3, verse)
+
+    assert not cache.is_missing("en-kjv", "john", 3, 97)
+    assert cache.is_missing("en-kjv", "john", 3, 99)
+
+
+def test_keys_use_canonical_verse_ids(tmp_path):
+    """Test entries are keyed by verse ID and keys from older cache files are upgraded."""
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text(json.dumps({
+        'entries': [["en-kjv/psalms/23/1", {"text": "The LORD is my shepherd", "fetched_at": 0}]],
+        'missing': [["en-kjv/john/3/99", time.time() + 60]]
+    }))
+    cache = ResponseCache(str(cache_file))
+
+    assert cache.make_key("en-kjv", "psalms", 23, 1) == "en-kjv/1251073"
+    assert cache.peek("en-kjv", "Psalm", 23, 1)["text"] == "The LORD is my shepherd"
+    assert cache.is_missing("en-kjv", "john", 3, 99)
+
+
+@pytest.mark.asyncio
+async def test_saves_in_a_loop_are_batched(tmp_path):
+    """Test saves requested from the event loop are written once, in the background."""
+    cache_file = tmp_path / "cache.json"
+    cache = ResponseCache(str(cache_file))
+    cache.SAVE_DELAY = 0.01
+
+    cache.put("en-kjv", "john", 3, 16, "For God so loved the world")
+    cache.schedule_save()
+    cache.put("en-kjv", "john", 3, 17, "For God sent not his Son")
+    cache.schedule_save()
+    assert not cache_file.exists()
+
+    await asyncio.sleep(0.2)
+    reloaded = ResponseCache(str(cache_file))
+    assert reloaded.peek("en-kjv", "john", 3, 17)["text"] == "For God sent not his Son"
@@ -0,0 +1,79 @@
+"""
+Tests for the retry policy.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from src.services.providers import ProviderError
+from src.services.retry import RetryPolicy
+
+
+def test_backoff_is_capped_full_jitter():
+    """Test delays stay within [0, min(max_delay, base * 2^attempt)]."""
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5, rng=random.Random(1))
+
+    for attempt in range(10):
+        for _ in range(20):
+            assert 0 <= policy.backoff(attempt) <= min(0.5, 0.1 * 2 ** attempt)
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_until_success():
+    """Test transient failures are retried and counted."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    outcomes = [ProviderError("reset"), ProviderError("502"), "verse"]
+
+    async def attempt(timeout):
+        assert timeout.connect == policy.connect_timeout
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert await policy.run(attempt) == "verse"
+    assert policy.get_stats() == {
+        "calls": 1, "attempts": 3, "retries": 2, "exhausted": 0, "deadline_exceeded": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_permanent_errors_and_exhaustion_are_raised():
+    """Test non-transient errors are not retried and attempts are bounded."""
+    policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+
+    async def forbidden(timeout):
+        raise ProviderError("403", transient=False)
+
+    async def down(timeout):
+        raise ProviderError("503")
+
+    with pytest.raises(ProviderError):
+        await policy.run(forbidden)
+    assert policy.attempts == 1
+
+    with pytest.raises(ProviderError):
+        await policy.run(down)
+    assert policy.attempts == 3
+    assert policy.exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_total_time():
+    """Test the total budget stops retries and caps per-attempt timeouts."""
+    policy = RetryPolicy(max_attempts=100, base_delay=0.01, max_delay=0.01, deadline=0.05)
+    timeouts = []
+
+    async def slow(timeout):
+        timeouts.append(timeout.total)
+        await asyncio.sleep(0.01)
+        raise ProviderError("timeout")
+
+    with pytest.raises((ProviderError, asyncio.TimeoutError)):
+        await policy.run(slow)
+
+    assert policy.deadline_exceeded == 1
+    assert all(total <= 0.05 for total in timeouts)
+    assert len(timeouts) < 100
@@ -0,0 +1,43 @@
+"""
+Tests for the full-text search index.
+"""
+
+from src.services.bible_api import BibleAPIService
+from src.services.search_index import SearchIndex, get_search_index, stem, tokenize
+
+
+def test_stemming_and_tokenizing():
+    """Test inflected and archaic forms share a stem and stop words keep their positions."""
+    assert {stem(word) for word in ("love", "loved", "loveth", "loving", "loves")} == {"lov"}
+    assert stem("bless") == stem("blessed") == stem("blesseth")
+    assert tokenize("The LORD is my shepherd") == [(1, "lord"), (4, "shepherd")]
+
+
+def test_ranked_and_phrase_search(sample_corpus):
+    """Test BM25 ranking, phrase matching and persistence."""
+    index = SearchIndex.build(sample_corpus, "en-kjv")
+    verse_index = sample_corpus.verse_index("en-kjv")
+
+    def references(query):
+        return [verse_index.locate(ordinal) for ordinal, _ in index.search(query)]
+
+    assert references("loved the world")[0] == ("john", 3, 16)
+    assert set(references("world")) == {("john", 3, 16), ("john", 3, 17)}
+    assert references('"green pastures"') == [("psalms", 23, 2)]
+    assert references('"pastures green"') == []
+    assert references("trusting") == [("proverbs", 3, 5)]
+
+    path = SearchIndex.path_for(sample_corpus, "en-kjv")
+    index.save(path)
+    reloaded = SearchIndex.load(path)
+    assert reloaded.search("shepherd") == index.search("shepherd")
+
+
+def test_service_search(sample_corpus):
+    """Test the service returns verses and the index is persisted next to the corpus."""
+    results = BibleAPIService().search("charity kind", translation="KJV", limit=5)
+
+    assert [verse.reference for verse in results] == ["1 Corinthians 13:4"]
+    assert results[0].text.startswith("Charity suffereth long")
+    assert SearchIndex.path_for(sample_corpus, "en-kjv").exists()
+    assert get_search_index(sample_corpus, "en-missing") is None
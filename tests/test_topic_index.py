@@ -0,0 +1,57 @@
+"""
+Tests for the topic index.
+"""
+
+import random
+
+import pytest
+
+from src.models.bible_books import verse_id_for
+from src.models.topics import TOPIC_REFERENCES
+from src.models.verse import VerseRequest
+from src.services.bible_api import BibleAPIService
+from src.services.reference_parser import VerseRange
+from src.services.topic_index import TopicIndex, topic_index
+
+
+def test_tags_map_to_sorted_verse_ids():
+    """Test passages are stored in canonical order and every covered verse is indexed."""
+    index = TopicIndex({"Trust": ["Proverbs 3:5-6", "Psalms 23:1"]})
+    proverbs = verse_id_for("proverbs", 3, 5)
+
+    assert index.tags() == ["trust"]
+    assert index.passages("trust") == [VerseRange(verse_id_for("psalms", 23, 1), verse_id_for("psalms", 23, 1)),
+                                       VerseRange(proverbs, proverbs + 1)]
+    assert list(index.verse_ids("TRUST")) == sorted(index.verse_ids("trust"))
+    assert index.contains("trust", proverbs + 1) and not index.contains("trust", proverbs + 2)
+    assert index.tags_for(proverbs + 1) == ["trust"]
+
+
+def test_random_passage_draws_from_the_union():
+    """Test picks cover every passage of the tags, counting shared passages once."""
+    rng = random.Random(7)
+    picks = {topic_index.random_passage(["hope", "peace"], rng) for _ in range(2000)}
+
+    expected = set(topic_index.passages("hope")) | set(topic_index.passages("peace"))
+    assert picks == expected
+    assert len(expected) < len(TOPIC_REFERENCES["hope"]) + len(TOPIC_REFERENCES["peace"])
+    assert "hope" in topic_index.tags_for(verse_id_for("romans", 15, 13))
+
+    with pytest.raises(ValueError):
+        topic_index.random_passage(["nonexistent"])
+
+
+@pytest.mark.asyncio
+async def test_service_serves_tagged_verses(sample_corpus):
+    """Test tag requests return a tagged verse from the topic (served from the local corpus)."""
+    service = BibleAPIService()
+    tagged = TopicIndex({"trust": ["Proverbs 3:5-6"], "shepherd": ["Psalm 23:1"]})
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("src.services.bible_api.topic_index", tagged)
+        response = await service.get_verse(VerseRequest(tags=["trust"], translation="KJV"))
+        unknown = await service.get_verse(VerseRequest(tags=["nonexistent"], translation="KJV"))
+
+    assert response.success
+    assert response.verse.reference == "Proverbs 3:5-6"
+    assert response.verse.tags == ["trust"]
+    assert not unknown.success and "nonexistent" in unknown.error
@@ -0,0 +1,37 @@
+"""
+Tests for bitmap verse sets.
+"""
+
+import pytest
+
+from src.models.bible_books import verse_id_for
+from src.services.verse_bitmap import VerseBitmap
+from src.services.verse_index import canonical_index
+
+
+def test_bitmap_set_operations():
+    """Test membership, counting and iteration follow the verse IDs added."""
+    genesis, john, revelation = (verse_id_for("genesis", 1, 1), verse_id_for("john", 3, 16),
+                                 verse_id_for("revelation", 22, 21))
+    bitmap = VerseBitmap([john, revelation, genesis, john])
+
+    assert len(bitmap.to_bytes()) == (canonical_index.total + 7) // 8 < 4096
+    assert len(bitmap) == 3
+    assert john in bitmap and verse_id_for("john", 3, 17) not in bitmap
+    assert list(bitmap) == [genesis, john, revelation]
+    assert not bitmap.isdisjoint([verse_id_for("john", 3, 17), john])
+    assert not bitmap.add(verse_id_for("john", 3, 16) + 200)
+
+    bitmap.clear()
+    assert len(bitmap) == 0 and not bitmap
+
+
+def test_bitmap_encoding():
+    """Test the compressed text form round-trips and rejects other sizes."""
+    bitmap = VerseBitmap(canonical_index.verse_id(ordinal) for ordinal in range(0, canonical_index.total, 85))
+
+    encoded = bitmap.encode()
+    assert len(encoded) < 1024
+    assert VerseBitmap.decode(encoded) == bitmap
+    with pytest.raises(ValueError):
+        VerseBitmap.decode(VerseBitmap(index=type(canonical_index)({"jude": [25]})).encode())
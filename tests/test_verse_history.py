@@ -0,0 +1,185 @@
+"""
+Tests for verse history tracking.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.models.bible_books import verse_id_for
+from src.models.verse import BiblePassage, BibleVerse
+from src.services.similarity import SimilarityFilter
+from src.services.verse_history import VerseHistoryService
+
+
+def make_verse(reference: str, book: str, chapter: int, verse: int) -> BibleVerse:
+    return BibleVerse(reference=reference, text="...", translation="KJV", book=book, chapter=chapter, verse=verse)
+
+
+def test_history_is_keyed_by_verse_id(tmp_path):
+    """Test differently spelled references count as the same sent verse."""
+    history = VerseHistoryService(str(tmp_path / "history.json"))
+    history.set_available_verses([
+        make_verse("Psalm 23:1", "Psalm", 23, 1),
+        make_verse("John 3:16", "John", 3, 16),
+    ])
+
+    history.mark_verse_sent(make_verse("Psalms 23:1", "Psalms", 23, 1), 2025)
+
+    assert history.get_sent_verses_for_year(2025) == {verse_id_for("psalms", 23, 1)}
+    assert [verse.reference for verse in history.get_unused_verses_for_year(2025)] == ["John 3:16"]
+
+
+def test_loads_reference_strings_from_older_files(tmp_path):
+    """Test history files that stored reference strings are converted to verse IDs."""
+    history_file = tmp_path / "history.json"
+    history_file.write_text(json.dumps({'sent_verses_by_year': {"2024": ["Proverbs 3:5-6", "Nowhere 1:1"]}}))
+
+    history = VerseHistoryService(str(history_file))
+    proverbs = [verse_id_for("proverbs", 3, 5), verse_id_for("proverbs", 3, 6)]
+    assert history.get_sent_verses_for_year(2024) == set(proverbs)
+
+    history.save_history()
+    assert json.loads(history_file.read_text()).keys() >= {'sent_bitmaps_by_year'}
+    assert VerseHistoryService(str(history_file)).get_sent_verses_for_year(2024) == set(proverbs)
+
+
+def test_passages_cover_all_their_verses(tmp_path):
+    """Test sending a passage uses up every verse in it, including overlapping entries."""
+    history = VerseHistoryService(str(tmp_path / "history.json"))
+    passage = BiblePassage(reference="Proverbs 3:5-6", text="...", translation="KJV", book="Proverbs",
+                           chapter=3, verse=5, end_chapter=3, end_verse=6)
+    history.set_available_verses([passage, make_verse("Proverbs 3:6", "Proverbs", 3, 6)])
+
+    history.mark_verse_sent(passage, 2025)
+
+    assert history.get_unused_verses_for_year(2025) == []
+    assert history.get_stats(2025)['used_verses'] == 2
+
+
+def test_similar_verses_are_not_sent_back_to_back(tmp_path):
+    """Test candidates nearly identical to a recently sent verse are skipped, and the window persists."""
+    history_file = tmp_path / "history.json"
+    history = VerseHistoryService(str(history_file), similarity=SimilarityFilter(threshold=0.5, window=2))
+    matthew = BibleVerse(reference="Matthew 24:35", text="Heaven and earth shall pass away, but my words shall not pass away.",
+                         translation="KJV", book="Matthew", chapter=24, verse=35)
+    mark = BibleVerse(reference="Mark 13:31", text="Heaven and earth shall pass away: but my words shall not pass away.",
+                      translation="KJV", book="Mark", chapter=13, verse=31)
+    psalm = make_verse("Psalm 23:1", "Psalm", 23, 1)
+    psalm.text = "The LORD is my shepherd; I shall not want."
+    history.set_available_verses([matthew, mark, psalm])
+
+    history.mark_verse_sent(matthew, 2025)
+    assert history.similarity.allowed(history.recent_texts) == [False, False, True]
+    assert history.get_next_verse(2025) is psalm
+
+    reloaded = VerseHistoryService(str(history_file), similarity=SimilarityFilter(threshold=0.5, window=2))
+    assert reloaded.recent_texts == [matthew.text, psalm.text]
+
+
+def test_similarity_scores():
+    """Test hashed embeddings score parallel texts high and unrelated ones low, with or without NumPy."""
+    similarity = SimilarityFilter()
+    similarity.set_candidates(["Blessed are the meek: for they shall inherit the earth.",
+                               "In the beginning God created the heaven and the earth."])
+    near, far = similarity.max_similarities(["Blessed are the meek, for they will inherit the earth."])
+    assert near > 0.6 > far
+
+    if similarity._matrix is not None:
+        similarity._matrix = None
+        assert similarity.max_similarities(["Blessed are the meek, for they will inherit the earth."]) == \
+            pytest.approx([near, far], abs=1e-5)
+
+
+def test_sends_are_journaled_and_compacted(tmp_path):
+    """Test each send is one journal append, replayed on load and compacted into the snapshot."""
+    history_file = tmp_path / "history.json"
+    history = VerseHistoryService(str(history_file), compact_every=3)
+    journal_file = tmp_path / "history.journal"
+
+    history.mark_verse_sent(make_verse("John 3:16", "John", 3, 16), 2025)
+    history.mark_verse_sent(make_verse("John 3:17", "John", 3, 17), 2025)
+    assert not history_file.exists()
+    assert len(journal_file.read_text().splitlines()) == 2
+
+    # A crash mid-append leaves a partial last line, which is skipped
+    with open(journal_file, 'a') as f:
+        f.write('{"seq":3,"year":2025,"ids":[')
+    reloaded = VerseHistoryService(str(history_file), compact_every=4)
+    assert reloaded.get_sent_verses_for_year(2025) == {verse_id_for("john", 3, 16), verse_id_for("john", 3, 17)}
+
+    reloaded.mark_verse_sent(make_verse("Psalm 23:1", "Psalm", 23, 1), 2025)
+    assert json.loads(journal_file.read_text().splitlines()[-1])['seq'] == 3
+    reloaded.mark_verse_sent(make_verse("Psalm 23:2", "Psalm", 23, 2), 2025)
+    assert json.loads(history_file.read_text())['journal_seq'] == 4
+    assert journal_file.read_text() == ""
+
+    # Records already in the snapshot (compaction interrupted before truncating) are not applied twice
+    journal_file.write_text('{"seq":4,"year":2024,"ids":[1]}\n')
+    reloaded = VerseHistoryService(str(history_file))
+    assert reloaded.sent_verses_by_year.keys() == {2025}
+    assert len(reloaded.get_sent_verses_for_year(2025)) == 4
+
+
+def test_selection_resumes_from_persisted_cursor(tmp_path):
+    """Test picks follow a reproducible permutation across restarts and cover the pool before repeating."""
+    pool = [make_verse(f"Psalm 119:{verse}", "Psalm", 119, verse) for verse in range(1, 21)]
+
+    def service(name):
+        history = VerseHistoryService(str(tmp_path / name))
+        history.set_available_verses(pool)
+        return history
+
+    uninterrupted = service("a.json")
+    expected = [uninterrupted.get_next_verse(2025).reference for _ in range(20)]
+    assert sorted(expected) == sorted(verse.reference for verse in pool)
+
+    picks = []
+    for _ in range(4):
+        # A new process every five picks
+        restarted = service("b.json")
+        picks += [restarted.get_next_verse(2025).reference for _ in range(5)]
+    assert picks == expected
+    assert restarted.cursors[2025].position == 20
+
+    # The next cycle starts over with a different order
+    second_cycle = [restarted.get_next_verse(2025).reference for _ in range(20)]
+    assert sorted(second_cycle) == sorted(expected) and second_cycle != expected
+    assert restarted.cursors[2025].cycle == 1
+
+
+@pytest.mark.asyncio
+async def test_sends_in_a_loop_are_written_in_one_batch(tmp_path):
+    """Test sends from the event loop are batched into one background journal write."""
+    history = VerseHistoryService(str(tmp_path / "history.json"), write_delay=60)
+    journal_file = tmp_path / "history.journal"
+    writes = []
+    extend = history.journal.extend
+    history.journal.extend = lambda records: writes.append(len(records)) or extend(records)
+
+    for verse in range(1, 4):
+        history.mark_verse_sent(make_verse(f"John 3:{verse}", "John", 3, verse), 2025)
+    # Recorded in memory at once, written later
+    assert len(history.get_sent_verses_for_year(2025)) == 3
+    assert not journal_file.exists()
+
+    await history.flush()
+    assert writes == [3]
+    reloaded = VerseHistoryService(str(tmp_path / "history.json"))
+    assert len(reloaded.get_sent_verses_for_year(2025)) == 3
+
+
+def test_writes_are_scheduled_again_after_a_loop_ends(tmp_path):
+    """Test a timer left behind by a finished event loop does not block later writes."""
+    history = VerseHistoryService(str(tmp_path / "history.json"), write_delay=0.01)
+    journal_file = tmp_path / "history.journal"
+
+    async def send(verse, wait):
+        history.mark_verse_sent(make_verse(f"John 3:{verse}", "John", 3, verse), 2025)
+        await asyncio.sleep(wait)
+
+    # The loop ends before the timer fires
+    asyncio.run(send(1, 0))
+    asyncio.run(send(2, 0.2))
+    assert len(journal_file.read_text().splitlines()) == 2
@@ -0,0 +1,56 @@
+"""
+Tests for the verse-count index.
+"""
+
+import random
+
+from src.models.bible_books import find_book, format_reference, verse_id_for
+from src.services.verse_index import VerseIndex, canonical_index
+
+
+def test_canonical_totals():
+    """Test the shipped index covers the whole canon."""
+    assert canonical_index.total == 31102
+    assert canonical_index.chapter_count("psalms") == 150
+    assert canonical_index.verse_count("psalms", 119) == 176
+    assert canonical_index.contains("john", 3, 16)
+    assert not canonical_index.contains("john", 3, 37)
+
+
+def test_ordinal_round_trip():
+    """Test ordinals and locations are inverse operations."""
+    assert canonical_index.locate(0) == ("genesis", 1, 1)
+    assert canonical_index.locate(canonical_index.total - 1) == ("revelation", 22, 21)
+
+    for ordinal in (0, 1, 30, 31, 1532, 1533, 23144, 31101):
+        book, chapter, verse = canonical_index.locate(ordinal)
+        assert canonical_index.ordinal(book, chapter, verse) == ordinal
+
+
+def test_verse_ids_follow_canonical_order():
+    """Test verse IDs round-trip through ordinals and sort like the canon."""
+    ids = [canonical_index.verse_id(ordinal) for ordinal in range(canonical_index.total)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == canonical_index.total
+    assert all(canonical_index.ordinal_of(verse_id) == ordinal for ordinal, verse_id in enumerate(ids))
+
+
+def test_book_spellings_share_one_id():
+    """Test different spellings of a reference resolve to the same verse ID."""
+    assert verse_id_for("Psalm", 23, 1) == verse_id_for("psalms", 23, 1) == verse_id_for("PSALMS", 23, 1)
+    assert find_book("Song of Solomon").key == "songofsolomon"
+    assert format_reference(verse_id_for("1corinthians", 13, 4), verse_id_for("1corinthians", 13, 7)) == "1 Corinthians 13:4-7"
+    assert verse_id_for("John", 3, 37) is None
+    assert verse_id_for("Hezekiah", 1, 1) is None
+
+
+def test_random_reference_is_always_valid():
+    """Test every random pick exists in the index."""
+    index = VerseIndex({"jude": [25], "obadiah": [21], "3john": [14]})
+    rng = random.Random(7)
+
+    picks = [index.random_reference(rng) for _ in range(500)]
+
+    assert all(index.contains(*pick) for pick in picks)
+    assert {book for book, _, _ in picks} == {"jude", "obadiah", "3john"}